@@ -1,3 +1,4 @@
+from array import array
 from typing import Iterable, Iterator, Self, TypeVar
 
 from common.utils import some
@@ -122,7 +123,14 @@ class Link[T]:
 
 
 class Circle[T]:
-    def __init__(self, items: Iterable[T]):
+    def __new__(cls, items: Iterable[T], compact: bool = False):
+        # `Circle(items, compact=True)` gives the array-backed implementation with the same API
+        if cls is Circle and compact:
+            return super().__new__(ArrayCircle)
+        return super().__new__(cls)
+
+    # pylint: disable-next=unused-argument
+    def __init__(self, items: Iterable[T], compact: bool = False):
         self.current_link, last_link, self.length = Link.build_chain(items)
         self.current_link.connect_to(prev_link=last_link)
 
@@ -178,3 +186,164 @@ class Circle[T]:
 
     def __len__(self):
         return self.length
+
+
+class ArrayCircle(Circle[int]):
+    """
+    Circle of integers stored in parallel arrays instead of `Link` objects:
+
+        >>> c = Circle([1, 2, 3, 4], compact=True)
+        >>> c
+        ArrayCircle([1, 2, 3, 4])
+        >>> c.current(), c[1], c[-1], len(c)
+        (1, 2, 4, 4)
+        >>> c.insert(1, 5)
+        >>> print(c)
+        5 -> 3 -> 4 -> 1 -> 2 -> ...
+        >>> c.pop(-2)
+        1
+        >>> c.shift_to_value(2)
+        >>> list(c)
+        [2, 5, 3, 4]
+
+    Each element occupies a *slot*: `next_slot[s]`, `prev_slot[s]` and `values[s]`. Slots freed by
+    `pop()` are reused by following `insert()`s, so an element popped and immediately inserted
+    elsewhere keeps its slot:
+
+        >>> slot = c.current_slot
+        >>> c.insert(1, c.pop(0))
+        >>> c.current_slot == slot, list(c)
+        (True, [2, 4, 5, 3])
+
+    The value → slot index used by `shift_to_value()` is built only when first needed, and only
+    when values are unique. Otherwise the circle is scanned like `Circle` does:
+
+        >>> d = Circle([7, 8, 7, 9], compact=True)
+        >>> d.shift(2)
+        >>> d.shift_to_value(7)
+        >>> list(d)
+        [7, 9, 7, 8]
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, items: Iterable[int], compact: bool = True):
+        self.values = array('q', items)
+        self.length = len(self.values)
+        if not self.length:
+            raise ValueError("ArrayCircle() arg is an empty sequence")
+
+        self.next_slot = array('l', range(1, self.length + 1))
+        self.next_slot[-1] = 0
+        self.prev_slot = array('l', range(-1, self.length - 1))
+        self.prev_slot[0] = self.length - 1
+
+        self.current_slot = 0
+        self.free_slots: list[int] = []
+        self._slot_index: dict[int, int] | None = None
+        self._slot_index_usable = True
+
+    def current(self) -> int:
+        return self.values[self.current_slot]
+
+    def _follow_slot(self, steps: int) -> int:
+        steps = steps % self.length
+        if steps > self.length // 2:
+            steps -= self.length
+
+        slot = self.current_slot
+        if steps > 0:
+            next_slot = self.next_slot
+            for _ in range(steps):
+                slot = next_slot[slot]
+        else:
+            prev_slot = self.prev_slot
+            for _ in range(-steps):
+                slot = prev_slot[slot]
+        return slot
+
+    def __getitem__(self, steps: int) -> int:
+        return self.values[self._follow_slot(steps)]
+
+    def shift(self, steps: int):
+        self.current_slot = self._follow_slot(steps)
+
+    def _build_slot_index(self) -> dict[int, int] | None:
+        index = {self.values[slot]: slot for slot in self.slots()}
+        if len(index) != self.length:
+            self._slot_index_usable = False
+            return None
+        return index
+
+    def shift_to_value(self, value: int):
+        if self._slot_index is None and self._slot_index_usable:
+            self._slot_index = self._build_slot_index()
+
+        if self._slot_index is not None:
+            slot = self._slot_index.get(value)
+        else:
+            slot = next((slot for slot in self.slots() if self.values[slot] == value), None)
+
+        if slot is None:
+            raise ValueError(f"{value} is not in the circle")
+        self.current_slot = slot
+
+    def insert(self, steps: int, value: int):
+        prev = self._follow_slot(steps)
+        nxt = self.next_slot[prev]
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.values[slot] = value
+            self.prev_slot[slot] = prev
+            self.next_slot[slot] = nxt
+        else:
+            slot = len(self.values)
+            self.values.append(value)
+            self.prev_slot.append(prev)
+            self.next_slot.append(nxt)
+
+        self.next_slot[prev] = slot
+        self.prev_slot[nxt] = slot
+        self.current_slot = slot
+        self.length += 1
+
+        if self._slot_index is not None:
+            if value in self._slot_index:
+                # duplicate value -> fall back to scanning
+                self._slot_index = None
+                self._slot_index_usable = False
+            else:
+                self._slot_index[value] = slot
+
+    def pop(self, steps: int) -> int:
+        if self.length == 1:
+            raise IndexError("pop from a single-element circle")
+
+        removed = self._follow_slot(steps)
+        prev, nxt = self.prev_slot[removed], self.next_slot[removed]
+        self.next_slot[prev] = nxt
+        self.prev_slot[nxt] = prev
+        self.current_slot = nxt
+        self.free_slots.append(removed)
+        self.length -= 1
+
+        value = self.values[removed]
+        if self._slot_index is not None:
+            del self._slot_index[value]
+        return value
+
+    def slots(self) -> Iterator[int]:
+        slot = self.current_slot
+        next_slot = self.next_slot
+        for _ in range(self.length):
+            yield slot
+            slot = next_slot[slot]
+
+    def links(self) -> Iterator[Link]:
+        raise TypeError(f"{type(self).__name__} has no links, use slots() instead")
+
+    def __iter__(self) -> Iterator[int]:
+        return (self.values[slot] for slot in self.slots())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
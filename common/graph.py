@@ -1,5 +1,5 @@
 import heapq
-from dataclasses import dataclass, field
+from itertools import count
 from typing import Callable, Iterable, TypeVar
 
 from tqdm import tqdm
@@ -19,42 +19,134 @@ def shortest_path(
 ) -> tuple[int, list[Edge]]:
     """
     General Dijkstra's algorithm
+
+        >>> shortest_path(1, 10, edges=lambda n: [(n + 1, '+1', 1), (n * 2, '*2', 1)])
+        (4, ['+1', '*2', '+1', '*2'])
     """
 
-    @dataclass(frozen=True, order=True)
-    class PathInfo:
-        prev_node: Node | None = field(compare=False, default=None)
-        edge: Edge | None = field(compare=False, default=None)
-        total_cost: int = field(compare=True, default=0)
+    # pylint: disable=too-few-public-methods
+    class Unvisited:
+        # heap entry compared by total cost only: among equally cheap paths, the one popped first
+        # wins (examples in several puzzles depend on this order, `a_star` breaks ties LIFO)
+        __slots__ = ('total_cost', 'node', 'prev_node', 'edge')
+
+        def __init__(self, total_cost: int, node: Node, prev_node: Node, edge: Edge):
+            self.total_cost = total_cost
+            self.node = node
+            self.prev_node = prev_node
+            self.edge = edge
 
-    @dataclass(frozen=True, order=True)
-    class NodeInfo:
-        node: Node = field(compare=False)
-        path: PathInfo = field(compare=True)
+        def __lt__(self, other: 'Unvisited') -> bool:
+            return self.total_cost < other.total_cost
 
     if is_callable(target):
         is_target: Callable[[Node], bool] = target
     else:
         is_target = target.__eq__
 
-    # node -> previous edge forming the cheapest path into this node
-    visited_nodes: dict[Node, PathInfo] = {}
+    # node -> total cost of the cheapest path into this node
+    costs: dict[Node, int] = {}
+    # node -> previous node and edge forming the cheapest path into this node
+    came_from: dict[Node, tuple[Node, Edge]] = {}
     # heap of unvisited nodes adjacent to visited nodes
-    unvisited_nodes: list[NodeInfo] = []
+    unvisited_nodes: list[Unvisited] = []
+
+    def visit_node(node: Node, total_cost: int):
+        costs[node] = total_cost
+        for next_node, edge, cost in edges(node):
+            heapq.heappush(unvisited_nodes, Unvisited(total_cost + cost, next_node, node, edge))
+
+    # start by visiting the `start` node
+    visit_node(start, 0)
+    # then visit node by node, until target is reached
+    with tqdm(
+        total=nodes_count,
+        desc=description,
+        initial=1,
+        unit=" nodes",
+        unit_scale=True,
+        delay=1.0,
+    ) as progress:
+        while True:
+
+            if not unvisited_nodes:
+                # TODO: raise more specific error
+                raise ValueError("path not found")
+            # visit cheapest unvisited node
+            entry = heapq.heappop(unvisited_nodes)
+            if entry.node in costs:
+                continue
+            came_from[entry.node] = (entry.prev_node, entry.edge)
+            visit_node(entry.node, entry.total_cost)
+            progress.update()
 
-    def visit_node(node: Node, path: PathInfo):
-        visited_nodes[node] = path
+            if is_target(entry.node):
+                target_node = entry.node
+                break
+
+    return costs[target_node], _backtrack(start, target_node, came_from)
+
+
+def a_star(
+    start: Node,
+    target: Node | Callable[[Node], bool],
+    edges: Callable[[Node], Iterable[tuple[Node, Edge, int]]],
+    heuristic: Callable[[Node], int] | None,
+    description: str = "finding shortest path",
+    nodes_count: int = None
+) -> tuple[int, list[Edge]]:
+    """
+    A* search: Dijkstra's algorithm expanding nodes in order of `cost + heuristic(node)`.
+
+    The heuristic must never overestimate the remaining cost to the target, and must be consistent
+    (not dropping by more than the cost of any edge), like manhattan distance on a grid with
+    unit steps. Without heuristic, this is plain Dijkstra's algorithm.
+
+        >>> def grid_edges(pos):
+        ...     x, y = pos
+        ...     return [((x + dx, y + dy), (dx, dy), 1) for dx, dy in [(1, 0), (-1, 0), (0, 1)]]
+        >>> def manhattan_to_target(pos):
+        ...     return abs(3 - pos[0]) + abs(2 - pos[1])
+        >>> a_star((0, 0), (3, 2), grid_edges, heuristic=manhattan_to_target)
+        (5, [(0, 1), (0, 1), (1, 0), (1, 0), (1, 0)])
+    """
+
+    if is_callable(target):
+        is_target: Callable[[Node], bool] = target
+    else:
+        is_target = target.__eq__
+
+    def estimate(node: Node) -> int:
+        return heuristic(node) if heuristic is not None else 0
+
+    # node -> cheapest known cost of reaching it
+    costs: dict[Node, int] = {start: 0}
+    # node -> previous node and edge forming the cheapest path into this node
+    came_from: dict[Node, tuple[Node, Edge]] = {}
+    # nodes whose cheapest path is already final
+    visited_nodes: set[Node] = set()
+    # heap of (estimated total cost, tie breaker, node) of nodes adjacent to visited nodes;
+    # tie breaker keeps nodes themselves from being compared and prefers the most recently
+    # discovered node among equally promising ones (diving deeper towards the target)
+    counter = count(0, -1)
+    unvisited_nodes: list[tuple[int, int, Node]] = []
+
+    def visit_node(node: Node) -> None:
+        visited_nodes.add(node)
+        node_cost = costs[node]
         for next_node, edge, cost in edges(node):
+            next_cost = node_cost + cost
+            if next_node in visited_nodes or next_cost >= costs.get(next_node, next_cost + 1):
+                continue
+            costs[next_node] = next_cost
+            came_from[next_node] = (node, edge)
             heapq.heappush(
                 unvisited_nodes,
-                NodeInfo(
-                    node=next_node,
-                    path=PathInfo(prev_node=node, edge=edge, total_cost=path.total_cost + cost)
-                )
+                (next_cost + estimate(next_node), next(counter), next_node)
             )
 
     # start by visiting the `start` node
-    visit_node(start, PathInfo())
+    visit_node(start)
     # then visit node by node, until target is reached
     with tqdm(
         total=nodes_count,
@@ -70,23 +162,176 @@ def shortest_path(
                 # TODO: raise more specific error
                 raise ValueError("path not found")
             # visit cheapest unvisited node
-            node_info = heapq.heappop(unvisited_nodes)
-            if node_info.node in visited_nodes:
+            _, _, node = heapq.heappop(unvisited_nodes)
+            if node in visited_nodes:
                 continue
-            visit_node(node_info.node, node_info.path)
+            visit_node(node)
             progress.update()
 
-            if is_target(node_info.node):
-                target_node = node_info.node
+            if is_target(node):
+                target_node = node
                 break
 
-    # reconstruct the whole path by backtracking
-    def backtrack(node: Node) -> Iterable[Edge]:
-        while node != start:
-            path = visited_nodes[node]
-            yield some(path.edge)
-            node = some(path.prev_node)
+    return costs[target_node], _backtrack(start, target_node, came_from)
 
-    final_cost = visited_nodes[target_node].total_cost
-    final_edges = list(backtrack(target_node))[::-1]
-    return final_cost, final_edges
+
+# pylint: disable=too-many-locals
+def bidirectional_search(
+    start: Node,
+    target: Node,
+    edges: Callable[[Node], Iterable[tuple[Node, Edge, int]]],
+    reverse_edges: Callable[[Node], Iterable[tuple[Node, Edge, int]]],
+    description: str = "finding shortest path",
+    nodes_count: int = None
+) -> tuple[int, list[Edge]]:
+    """
+    Dijkstra's algorithm searching from both `start` and `target` at once, until the two searches
+    meet. Both endpoints must be known nodes.
+
+    `reverse_edges(node)` yields `(prev_node, edge, cost)` for each edge leading from `prev_node`
+    into `node`.
+
+        >>> def forward_edges(n):
+        ...     return [(n + 1, '+1', 1), (n * 2, '*2', 1)]
+        >>> def backward_edges(n):
+        ...     yield n - 1, '+1', 1
+        ...     if n % 2 == 0:
+        ...         yield n // 2, '*2', 1
+        >>> bidirectional_search(1, 10, forward_edges, backward_edges)
+        (4, ['+1', '*2', '+1', '*2'])
+        >>> bidirectional_search(1, 1000, forward_edges, backward_edges)
+        (14, ['+1', '+1', '*2', '+1', '*2', '+1', '*2', '+1', '*2', '*2', '+1', '*2', '*2', '*2'])
+    """
+
+    if start == target:
+        return 0, []
+
+    # index 0: forward search from `start`, index 1: backward search from `target`
+    costs: tuple[dict[Node, int], dict[Node, int]] = ({start: 0}, {target: 0})
+    came_from: tuple[dict[Node, tuple[Node, Edge]], dict[Node, tuple[Node, Edge]]] = ({}, {})
+    visited_nodes: tuple[set[Node], set[Node]] = (set(), set())
+    counter = count()
+    unvisited_nodes: tuple[list[tuple[int, int, Node]], list[tuple[int, int, Node]]] = (
+        [(0, next(counter), start)],
+        [(0, next(counter), target)],
+    )
+    direction_edges = (edges, reverse_edges)
+
+    # cheapest path found so far, going through `meeting_node`
+    best_cost: int | None = None
+    meeting_node: Node | None = None
+
+    with tqdm(
+        total=nodes_count,
+        desc=description,
+        unit=" nodes",
+        unit_scale=True,
+        delay=1.0,
+    ) as progress:
+        while unvisited_nodes[0] and unvisited_nodes[1]:
+            # no path through unvisited nodes can be cheaper than the best one found so far
+            lower_bound = unvisited_nodes[0][0][0] + unvisited_nodes[1][0][0]
+            if best_cost is not None and lower_bound >= best_cost:
+                break
+
+            # expand the direction with the smaller frontier
+            side = 0 if len(unvisited_nodes[0]) <= len(unvisited_nodes[1]) else 1
+            node_cost, _, node = heapq.heappop(unvisited_nodes[side])
+            if node in visited_nodes[side] or node_cost > costs[side][node]:
+                continue
+            visited_nodes[side].add(node)
+            progress.update()
+
+            for next_node, edge, cost in direction_edges[side](node):
+                next_cost = node_cost + cost
+                if next_cost >= costs[side].get(next_node, next_cost + 1):
+                    continue
+                costs[side][next_node] = next_cost
+                came_from[side][next_node] = (node, edge)
+                heapq.heappush(unvisited_nodes[side], (next_cost, next(counter), next_node))
+
+                if (other_cost := costs[1 - side].get(next_node)) is not None:
+                    if best_cost is None or next_cost + other_cost < best_cost:
+                        best_cost = next_cost + other_cost
+                        meeting_node = next_node
+
+    if best_cost is None:
+        raise ValueError("path not found")
+
+    # forward half is backtracked as usual, backward half leads from the meeting node to target
+    forward_edges = _backtrack(start, some(meeting_node), came_from[0])
+    backward_edges = _backtrack(target, some(meeting_node), came_from[1])[::-1]
+    return best_cost, forward_edges + backward_edges
+
+
+# pylint: disable=too-few-public-methods
+class DistanceField:
+    """
+    Distances of nodes (numbered `0..n-1`) to the closest target node, computed by a single BFS
+    from all the targets at once, never entering `blocked` nodes. Each node also keeps its closest
+    target with the lowest number, so that a step can be chosen without any paths being stored:
+
+        >>> path = [[1], [0, 2], [1, 3], [2, 4], [3]]
+        >>> field = DistanceField(targets=[0, 4], adjacent=path, blocked=set())
+        >>> field.distance, field.target
+        ([0, 1, 2, 1, 0], [0, 0, 0, 4, 4])
+        >>> field.best_step([1, 3])
+        1
+        >>> DistanceField(targets=[0], adjacent=path, blocked={1}).best_step([3])
+    """
+
+    def __init__(self, targets: Iterable[int], adjacent: list[list[int]], blocked: set[int]):
+        self.distance: list[int] = [-1] * len(adjacent)
+        self.target: list[int] = [-1] * len(adjacent)
+
+        layer = list(targets)
+        for target in layer:
+            self.distance[target] = 0
+            self.target[target] = target
+
+        distance = 0
+        while layer:
+            distance += 1
+            next_layer: list[int] = []
+            for node in layer:
+                target = self.target[node]
+                for neighbor in adjacent[node]:
+                    if neighbor in blocked:
+                        continue
+                    if self.distance[neighbor] < 0:
+                        self.distance[neighbor] = distance
+                        self.target[neighbor] = target
+                        next_layer.append(neighbor)
+                    elif self.distance[neighbor] == distance and target < self.target[neighbor]:
+                        self.target[neighbor] = target
+            layer = next_layer
+
+    def best_step(self, steps: Iterable[int]) -> int | None:
+        # closest target first, then the lowest numbered one, then the lowest numbered step
+        reachable = [step for step in steps if self.distance[step] >= 0]
+        if not reachable:
+            return None
+        return min(reachable, key=lambda step: (self.distance[step], self.target[step], step))
+
+
+def manhattan_distance(pos_1: tuple[int, ...], pos_2: tuple[int, ...]) -> int:
+    """
+    Typical A* heuristic for grids, where each step costs at least 1:
+
+        >>> manhattan_distance((1, 2), (4, -2))
+        7
+    """
+    return sum(abs(v_1 - v_2) for v_1, v_2 in zip(pos_1, pos_2))
+
+
+def _backtrack(
+    start: Node,
+    node: Node,
+    came_from: dict[Node, tuple[Node, Edge]],
+) -> list[Edge]:
+    # reconstruct the whole path from `start` to `node`
+    path_edges: list[Edge] = []
+    while node != start:
+        node, edge = came_from[node]
+        path_edges.append(edge)
+    return path_edges[::-1]
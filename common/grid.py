@@ -0,0 +1,320 @@
+from functools import lru_cache
+from typing import Iterable, Iterator, Self
+
+from common.canvas import Canvas
+from common.rect import Rect
+
+
+Pos = tuple[int, int]
+
+# cells are stored as single bytes, so any character up to U+00FF (incl. '·') can be used
+ENCODING = 'latin-1'
+
+
+# pylint: disable=too-many-public-methods
+class DenseGrid:
+    """
+    Dense rectangular grid of characters, backed by a flat `bytearray` (row by row):
+
+        >>> g = DenseGrid.from_text('''
+        ...     #..#
+        ...     .##.
+        ...     ..#.
+        ... ''')
+        >>> g
+        DenseGrid(4, 3, origin=(0, 0))
+        >>> print(g)
+        #..#
+        .##.
+        ..#.
+        >>> g.bounds
+        Rect((0, 0), (3, 2))
+        >>> g[1, 1], g[0, 2]
+        ('#', '.')
+        >>> g.count('#')
+        5
+        >>> list(g.find_all('#'))
+        [(0, 0), (3, 0), (1, 1), (2, 1), (2, 2)]
+
+    Positions map to flat indexes and back in O(1):
+
+        >>> g.index((2, 1)), g.pos(6)
+        (6, (2, 1))
+        >>> (4, 0) in g, (3, 2) in g
+        (False, True)
+        >>> g[4, 0]
+        Traceback (most recent call last):
+        ...
+        IndexError: (4, 0) is not in DenseGrid(4, 3, origin=(0, 0))
+
+    Whole rows and columns can be read and written at once:
+
+        >>> g.row(1), g.column(2)
+        ('.##.', '.##')
+        >>> g.set_column(0, 'O.O')
+        >>> g[3, 2] = 'X'
+        >>> print(g)
+        O..#
+        .##.
+        O.#X
+        >>> list(g.columns())
+        ['O.O', '.#.', '.##', '#.X']
+
+    Grid doesn't need to start at origin:
+
+        >>> h = DenseGrid.from_rect(Rect((-1, 5), (1, 6)), fill='·')
+        >>> h[-1, 5] = '+'
+        >>> print(h)
+        +··
+        ···
+        >>> h.index((0, 6)), h.pos(4), h.row(6)
+        (4, (0, 6), '···')
+    """
+
+    __slots__ = ['width', 'height', 'origin', 'cells']
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fill: str = '.',
+        origin: Pos = (0, 0),
+        cells: bytes | bytearray | None = None,
+    ):
+        if width <= 0 or height <= 0:
+            raise ValueError(f"grid must not be empty (got {width}x{height})")
+
+        self.width = width
+        self.height = height
+        self.origin = origin
+
+        if cells is None:
+            self.cells = bytearray(_encode_char(fill) * (width * height))
+        elif len(cells) == width * height:
+            self.cells = bytearray(cells)
+        else:
+            raise ValueError(f"expected {width * height} cells (got {len(cells)})")
+
+    @classmethod
+    def from_rect(cls, rect: Rect, fill: str = '.') -> Self:
+        return cls(rect.width, rect.height, fill=fill, origin=rect.top_left)
+
+    @classmethod
+    def from_text(cls, text: str, origin: Pos = (0, 0)) -> Self:
+        return cls.from_lines(text.strip().splitlines(), origin=origin)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], origin: Pos = (0, 0)) -> Self:
+        rows = [line.strip() for line in lines]
+        if not rows:
+            raise ValueError("no lines")
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError("all lines must have the same length")
+
+        return cls(
+            width=len(rows[0]),
+            height=len(rows),
+            origin=origin,
+            cells=''.join(rows).encode(ENCODING),
+        )
+
+    @classmethod
+    def from_canvas(cls, canvas: Canvas, empty_char: str = ' ', bounds: Rect | None = None) -> Self:
+        """
+            >>> c = Canvas({(2, 1): 'A', (4, 2): 'B'})
+            >>> print(DenseGrid.from_canvas(c, empty_char='.'))
+            A..
+            ..B
+        """
+        # pylint: disable=protected-access
+        grid = cls.from_rect(canvas._effective_bounds(bounds), fill=empty_char)
+        for pos, char in canvas.chars.items():
+            if pos in grid:
+                grid[pos] = char
+        return grid
+
+    def to_canvas(self, empty_char: str | None = None) -> Canvas:
+        """
+            >>> g = DenseGrid.from_text('''
+            ...     ..#
+            ...     #..
+            ... ''', origin=(10, 20))
+            >>> c = g.to_canvas(empty_char='.')
+            >>> c.chars
+            {(12, 20): '#', (10, 21): '#'}
+            >>> c.bounds
+            Rect((10, 20), (12, 21))
+        """
+        canvas = Canvas(bounds=self.bounds)
+        canvas.draw_many(
+            (pos, char)
+            for pos, char in self.items()
+            if char != empty_char
+        )
+        return canvas
+
+    @property
+    def bounds(self) -> Rect:
+        x0, y0 = self.origin
+        return Rect((x0, y0), (x0 + self.width - 1, y0 + self.height - 1))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def index(self, pos: Pos) -> int:
+        x, y = pos
+        x0, y0 = self.origin
+        dx, dy = x - x0, y - y0
+        if not (0 <= dx < self.width and 0 <= dy < self.height):
+            raise IndexError(f"{pos!r} is not in {self!r}")
+        return dy * self.width + dx
+
+    def pos(self, index: int) -> Pos:
+        dy, dx = divmod(index, self.width)
+        x0, y0 = self.origin
+        return x0 + dx, y0 + dy
+
+    def __contains__(self, pos: Pos) -> bool:
+        x, y = pos
+        x0, y0 = self.origin
+        return 0 <= x - x0 < self.width and 0 <= y - y0 < self.height
+
+    def __getitem__(self, pos: Pos) -> str:
+        return chr(self.cells[self.index(pos)])
+
+    def __setitem__(self, pos: Pos, char: str) -> None:
+        self.cells[self.index(pos)] = ord(_encode_char(char))
+
+    def get(self, pos: Pos, default: str | None = None) -> str | None:
+        return chr(self.cells[self.index(pos)]) if pos in self else default
+
+    def items(self) -> Iterator[tuple[Pos, str]]:
+        x0, y0 = self.origin
+        width = self.width
+        return (
+            ((x0 + index % width, y0 + index // width), chr(code))
+            for index, code in enumerate(self.cells)
+        )
+
+    def count(self, char: str) -> int:
+        return self.cells.count(_encode_char(char))
+
+    def find_all(self, char: str) -> Iterator[Pos]:
+        code = _encode_char(char)
+        index = self.cells.find(code)
+        while index >= 0:
+            yield self.pos(index)
+            index = self.cells.find(code, index + 1)
+
+    def neighbor_offsets(self, diagonal: bool = True) -> tuple[int, ...]:
+        """
+        Index offsets of neighbors of a cell, in row order. Valid only for cells not on the border.
+
+            >>> DenseGrid(10, 5).neighbor_offsets()
+            (-11, -10, -9, -1, 1, 9, 10, 11)
+            >>> DenseGrid(10, 5).neighbor_offsets(diagonal=False)
+            (-10, -1, 1, 10)
+        """
+        return tuple(
+            dy * self.width + dx
+            for dx, dy in _neighbor_deltas(diagonal)
+        )
+
+    def neighbors_table(self, diagonal: bool = True) -> tuple[tuple[int, ...], ...]:
+        """
+        Indexes of neighbors of every cell (clipped at the borders). The table is immutable,
+        so it can be shared by all grids of the same shape:
+
+            >>> table = DenseGrid(3, 2).neighbors_table()
+            >>> table[0]
+            (1, 3, 4)
+            >>> table[4]
+            (0, 1, 2, 3, 5)
+            >>> table is DenseGrid(3, 2, fill='#').neighbors_table()
+            True
+        """
+        return _neighbors_table(self.width, self.height, diagonal)
+
+    def _row_start(self, y: int) -> int:
+        if not 0 <= (dy := y - self.origin[1]) < self.height:
+            raise IndexError(f"row {y} is not in {self!r}")
+        return dy * self.width
+
+    def _column_start(self, x: int) -> int:
+        if not 0 <= (dx := x - self.origin[0]) < self.width:
+            raise IndexError(f"column {x} is not in {self!r}")
+        return dx
+
+    def row(self, y: int) -> str:
+        start = self._row_start(y)
+        return self.cells[start:start + self.width].decode(ENCODING)
+
+    def set_row(self, y: int, text: str) -> None:
+        start = self._row_start(y)
+        self.cells[start:start + self.width] = _encode_line(text, self.width)
+
+    def column(self, x: int) -> str:
+        return self.cells[self._column_start(x)::self.width].decode(ENCODING)
+
+    def set_column(self, x: int, text: str) -> None:
+        self.cells[self._column_start(x)::self.width] = _encode_line(text, self.height)
+
+    def rows(self) -> Iterator[str]:
+        return (self.row(y) for y in self.bounds.range_y())
+
+    def columns(self) -> Iterator[str]:
+        return (self.column(x) for x in self.bounds.range_x())
+
+    def copy(self) -> Self:
+        return type(self)(self.width, self.height, origin=self.origin, cells=self.cells)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, type(self))
+            and (self.width, self.height, self.origin) == (other.width, other.height, other.origin)
+            and self.cells == other.cells
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.origin, bytes(self.cells)))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.width!r}, {self.height!r}, origin={self.origin!r})'
+
+    def __str__(self) -> str:
+        return '\n'.join(self.rows())
+
+
+def _encode_char(char: str) -> bytes:
+    if len(char) != 1:
+        raise ValueError(f"expected single character (got {char!r})")
+    return char.encode(ENCODING)
+
+
+def _encode_line(text: str, length: int) -> bytes:
+    if len(text) != length:
+        raise ValueError(f"expected {length} characters (got {len(text)})")
+    return text.encode(ENCODING)
+
+
+def _neighbor_deltas(diagonal: bool) -> list[Pos]:
+    return [
+        (dx, dy)
+        for dy in (-1, 0, +1)
+        for dx in (-1, 0, +1)
+        if (dx or dy) and (diagonal or not (dx and dy))
+    ]
+
+
+@lru_cache(maxsize=16)
+def _neighbors_table(width: int, height: int, diagonal: bool) -> tuple[tuple[int, ...], ...]:
+    deltas = _neighbor_deltas(diagonal)
+    return tuple(
+        tuple(
+            (y + dy) * width + (x + dx)
+            for dx, dy in deltas
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        )
+        for y in range(height)
+        for x in range(width)
+    )
@@ -1,7 +1,7 @@
 import itertools
 from collections import Counter
-from collections.abc import Sized
-from typing import Any, Callable, Generator, Iterable, Iterator, TypeVar
+from collections.abc import Hashable, Sized
+from typing import Any, Callable, Generator, Iterable, Iterator, NamedTuple, TypeVar
 
 from common.utils import some
 
@@ -623,15 +623,30 @@ def first_repeat(values: Iterable[T]) -> T | None:
     return None
 
 
+def iterate(function: Callable[[T], T], initial: T) -> Iterator[T]:
+    """
+    Yields `initial`, `function(initial)`, `function(function(initial))`, ...
+
+        >>> list(itertools.islice(iterate(lambda x: x * 3, 1), 5))
+        [1, 3, 9, 27, 81]
+    """
+    value = initial
+    while True:
+        yield value
+        value = function(value)
+
+
 def detect_cycle(initial: T, function: Callable[[T], T]) -> tuple[list[T], list[T]]:
     """
-    TODO: parameter for longer cycle section
-    TODO: utilize in puzzles
+    Returns all states before the cycle and all states of the cycle:
 
         >>> detect_cycle(0, lambda x: (x + 4) % 7)
         ([], [0, 4, 1, 5, 2, 6, 3])
         >>> detect_cycle(10, lambda n: n // 2 if n % 2 == 0 else 3 * n + 1)
         ([10, 5, 16, 8], [4, 2, 1])
+
+    This keeps every state alive. See `cycle_brent()` and `cycle_floyd()` for O(1) memory, or
+    `cycle_by_key()`, `state_at()` and `metric_at()` for storing only compact keys.
     """
 
     seen: dict[T, int] = {}
@@ -649,6 +664,182 @@ def detect_cycle(initial: T, function: Callable[[T], T]) -> tuple[list[T], list[
         index, value = index + 1, function(value)
 
 
+class Cycle(NamedTuple):
+    # index of the first state in the cycle
+    start: int
+    # number of states in the cycle
+    length: int
+
+    def step_within(self, step: int) -> int:
+        """
+        Earliest step with the same state as given step:
+
+            >>> Cycle(start=4, length=3).step_within(2)
+            2
+            >>> Cycle(start=4, length=3).step_within(1_000_000_000_000)
+            4
+        """
+        if step < self.start:
+            return step
+        return self.start + (step - self.start) % self.length
+
+
+def cycle_floyd(initial: T, function: Callable[[T], T]) -> Cycle:
+    """
+    Floyd's tortoise and hare, O(1) memory:
+
+        >>> cycle_floyd(10, lambda n: n // 2 if n % 2 == 0 else 3 * n + 1)
+        Cycle(start=4, length=3)
+        >>> cycle_floyd(0, lambda x: (x + 4) % 7)
+        Cycle(start=0, length=7)
+    """
+
+    tortoise, hare = function(initial), function(function(initial))
+    while tortoise != hare:
+        tortoise, hare = function(tortoise), function(function(hare))
+
+    start, tortoise = 0, initial
+    while tortoise != hare:
+        tortoise, hare = function(tortoise), function(hare)
+        start += 1
+
+    length, hare = 1, function(tortoise)
+    while tortoise != hare:
+        hare = function(hare)
+        length += 1
+
+    return Cycle(start, length)
+
+
+def cycle_brent(initial: T, function: Callable[[T], T]) -> Cycle:
+    """
+    Brent's algorithm, O(1) memory and fewer function calls than Floyd's:
+
+        >>> cycle_brent(10, lambda n: n // 2 if n % 2 == 0 else 3 * n + 1)
+        Cycle(start=4, length=3)
+        >>> cycle_brent(0, lambda x: (x + 4) % 7)
+        Cycle(start=0, length=7)
+    """
+
+    power = length = 1
+    tortoise, hare = initial, function(initial)
+    while tortoise != hare:
+        if power == length:
+            tortoise, power, length = hare, power * 2, 0
+        hare = function(hare)
+        length += 1
+
+    tortoise = hare = initial
+    for _ in range(length):
+        hare = function(hare)
+
+    start = 0
+    while tortoise != hare:
+        tortoise, hare = function(tortoise), function(hare)
+        start += 1
+
+    return Cycle(start, length)
+
+
+def cycle_by_key(states: Iterable[T], key: Callable[[T], Hashable]) -> Cycle:
+    """
+    Fingerprint mode: only `key(state)` and its step index are stored, not the states themselves.
+    The key must determine all following states (e.g. a 64-bit hash of the state):
+
+        >>> cycle_by_key(['a', 'b', 'c', 'd', 'e', 'c'], key=str)
+        Cycle(start=2, length=3)
+        >>> cycle_by_key(itertools.count(5), key=lambda n: n % 4)
+        Cycle(start=0, length=4)
+    """
+
+    cycle, _ = _find_repeat(iter(states), key)
+    return some(cycle)  # without `stop_step`, only a repeat ends the search
+
+
+def state_at(states: Iterable[T], step: int, key: Callable[[T], Hashable]) -> T:
+    """
+    State at given step (counted from zero) of a periodic sequence of states, found by storing only
+    their keys (see `cycle_by_key()`). Once the cycle is found, only the remainder of the last cycle
+    is iterated:
+
+        >>> state_at(itertools.cycle('abc'), 10**12, key=str)
+        'b'
+        >>> state_at('xyzabcabc', 7, key=str)
+        'b'
+        >>> state_at('xyzabcabc', 1, key=str)
+        'y'
+    """
+
+    states_it = iter(states)
+    cycle, repeated = _find_repeat(states_it, key, stop_step=step)
+    if cycle is None:
+        return repeated
+
+    repeat_step = cycle.start + cycle.length
+    return nth(itertools.chain([repeated], states_it), (step - repeat_step) % cycle.length)
+
+
+def metric_at(
+    states: Iterable[T],
+    step: int,
+    key: Callable[[T], Hashable],
+    metric: Callable[[T], int],
+) -> int:
+    """
+    Metric of the state at given step, when the metric grows by the same amount each cycle
+    (e.g. height of a growing tower, whose top part is described by the key):
+
+        >>> metric_at(itertools.count(), 10**12, key=lambda n: n % 7, metric=lambda n: n)
+        1000000000000
+        >>> towers = ((n, n // 3 * 10 + n % 3) for n in itertools.count())
+        >>> metric_at(towers, 10**12 + 2, key=lambda t: t[0] % 3, metric=lambda t: t[1])
+        3333333333340
+    """
+
+    states_it = iter(states)
+    seen_metrics: dict[int, int] = {}
+
+    def remembered_metric(state: T) -> int:
+        seen_metrics[len(seen_metrics)] = value = metric(state)
+        return value
+
+    # metrics are remembered only for the states before the first repeat
+    cycle, repeated = _find_repeat(states_it, key, stop_step=step, on_new=remembered_metric)
+    if cycle is None:
+        return metric(repeated)
+
+    repeat_step = cycle.start + cycle.length
+    per_cycle = metric(repeated) - seen_metrics[cycle.start]
+    full_cycles, remainder = divmod(step - repeat_step, cycle.length)
+    final_state = nth(itertools.chain([repeated], states_it), remainder)
+    return metric(final_state) + full_cycles * per_cycle
+
+
+def _find_repeat(
+    states: Iterator[T],
+    key: Callable[[T], Hashable],
+    stop_step: int | None = None,
+    on_new: Callable[[T], Any] | None = None,
+) -> tuple[Cycle | None, T]:
+    # iterates states until a key repeats -> (cycle, state at `cycle.start + cycle.length`)
+    # or until `stop_step` is reached first -> (None, state at `stop_step`)
+    seen: dict[Hashable, int] = {}
+
+    for step, state in enumerate(states):
+        if step == stop_step:
+            return None, state
+
+        state_key = key(state)
+        if (start := seen.get(state_key)) is not None:
+            return Cycle(start, step - start), state
+
+        seen[state_key] = step
+        if on_new:
+            on_new(state)
+
+    raise ValueError("states ended before repeating")
+
+
 def unique(values: Iterable[T]) -> Iterable[T]:
     """
     Like set, but retains order:
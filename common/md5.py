@@ -1,5 +1,12 @@
+from binascii import hexlify
+from functools import partial
+from itertools import count
+from typing import Callable, Generator
+
 import _md5
 
+from common.parallel import parallel_map
+
 
 def md5(val: str) -> str:
     """
@@ -8,3 +15,122 @@ def md5(val: str) -> str:
     """
     # pylint: disable=unexpected-keyword-arg
     return _md5.md5(val.encode(), usedforsecurity=False).hexdigest()
+
+
+# predicate on raw digest bytes (must be picklable to be used with more than one job)
+DigestPredicate = Callable[[bytes], bool]
+
+DEFAULT_CHUNK_SIZE = 10_000
+# md5 processes input in 64-byte blocks: only a salt filling a whole block can be pre-hashed
+SALT_BLOCK_SIZE = 64
+
+
+class HexPrefix:
+    """
+    Tests whether the hex digest starts with given prefix, without converting the digest to hex:
+
+        >>> starts_with_000 = HexPrefix('000')
+        >>> starts_with_000(bytes.fromhex('000fffff'))
+        True
+        >>> starts_with_000(bytes.fromhex('0010ffff'))
+        False
+        >>> HexPrefix('abc')(bytes.fromhex('abcdef'))
+        True
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        # whole bytes are compared directly, odd trailing hex digit by the high nibble of next byte
+        self.prefix_bytes = bytes.fromhex(prefix[:len(prefix) // 2 * 2])
+        self.nibble = int(prefix[-1], 16) if len(prefix) % 2 else None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.prefix!r})'
+
+    def __call__(self, digest: bytes) -> bool:
+        if not digest.startswith(self.prefix_bytes):
+            return False
+        return self.nibble is None or digest[len(self.prefix_bytes)] >> 4 == self.nibble
+
+
+def mine(
+    salt: str,
+    predicate: DigestPredicate,
+    *,
+    start: int = 0,
+    stop: int | None = None,
+    stretch: int = 0,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    description: str = "mining",
+) -> Generator[tuple[int, bytes], None, None]:
+    """
+    Yields `(index, digest)` for each index in `range(start, stop)` (or `count(start)`),
+    whose raw digest of `salt + str(index)` satisfies the predicate. Results come in index order,
+    even when the index chunks are hashed by a pool of `jobs` processes.
+
+        >>> found = mine('abc', HexPrefix('00000'), start=3_000_000, stop=5_100_000)
+        >>> [(index, digest.hex()[:8]) for index, digest in found]
+        [(3231929, '00000155'), (5017308, '000008f8')]
+
+    With `stretch`, each digest is hashed that many more times (its hex digest is hashed again)
+    before being tested:
+
+        >>> found = mine('abc', HexPrefix('7'), stop=10, stretch=2)
+        >>> [(index, digest.hex()[:8]) for index, digest in found]
+        [(2, '722fb58c'), (3, '775f0d13')]
+        >>> md5(md5(md5('abc3')))
+        '775f0d133bb44c90a14fdcfaef43cc3c'
+    """
+
+    chunk_starts = range(start, stop, chunk_size) if stop is not None else count(start, chunk_size)
+
+    def chunk_stop(chunk_start: int) -> int:
+        return min(chunk_start + chunk_size, stop) if stop is not None else chunk_start + chunk_size
+
+    chunks = (range(chunk_start, chunk_stop(chunk_start)) for chunk_start in chunk_starts)
+    mine_chunk = partial(_mine_chunk, salt, predicate, stretch=stretch)
+    for found in parallel_map(mine_chunk, chunks, jobs=jobs, chunk_size=1, description=description):
+        yield from found
+
+
+def _mine_chunk(
+    salt: str,
+    predicate: DigestPredicate,
+    indexes: range,
+    stretch: int = 0,
+) -> list[tuple[int, bytes]]:
+    # pylint: disable=unexpected-keyword-arg
+    salt_bytes = salt.encode()
+    found: list[tuple[int, bytes]] = []
+    # cheap pre-filter, so that the predicate is called only for candidates
+    prefix_bytes: bytes = getattr(predicate, 'prefix_bytes', b'')
+
+    if stretch:
+        new_md5 = _md5.md5
+        for index in indexes:
+            digest = new_md5(b'%b%d' % (salt_bytes, index), usedforsecurity=False).digest()
+            for _ in range(stretch):
+                digest = new_md5(hexlify(digest), usedforsecurity=False).digest()
+            if digest.startswith(prefix_bytes) and predicate(digest):
+                found.append((index, digest))
+
+    elif len(salt_bytes) >= SALT_BLOCK_SIZE:
+        # long salt is hashed only once, then the context is copied for each index
+        salted = _md5.md5(salt_bytes, usedforsecurity=False)
+        for index in indexes:
+            context = salted.copy()
+            context.update(b'%d' % index)
+            digest = context.digest()
+            if digest.startswith(prefix_bytes) and predicate(digest):
+                found.append((index, digest))
+
+    else:
+        # short salt fits into a single block with the index -> copying the context doesn't pay off
+        new_md5 = _md5.md5
+        for index in indexes:
+            digest = new_md5(b'%b%d' % (salt_bytes, index), usedforsecurity=False).digest()
+            if digest.startswith(prefix_bytes) and predicate(digest):
+                found.append((index, digest))
+
+    return found
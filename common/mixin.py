@@ -3,15 +3,22 @@ from typing import Iterator
 
 
 class Orderable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def __iter__(self) -> Iterator:
         ...
 
+    def _key(self) -> tuple:
+        # values used for hashing and comparison;
+        # subclasses should return a plain tuple of their attributes (much faster than iterating)
+        return tuple(self)
+
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash(self._key())
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, type(self)) and tuple(self) == tuple(other)
+        return isinstance(other, type(self)) and self._key() == other._key()
 
     def __gt__(self, other) -> bool:
-        return isinstance(other, type(self)) and tuple(self) > tuple(other)
+        return isinstance(other, type(self)) and self._key() > other._key()
@@ -0,0 +1,161 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from tqdm import tqdm
+
+
+C = TypeVar('C')
+R = TypeVar('R')
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+def parallel_map(
+    fn: Callable[[C], R],
+    candidates: Iterable[C],
+    *,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    description: str = "evaluating",
+) -> Iterator[R]:
+    """
+    Yields `fn(candidate)` for each candidate, in candidate order, even when the candidates are
+    evaluated in chunks by a pool of `jobs` processes (`fn` and candidates must be picklable then).
+    Candidates can be an infinite stream, they are taken only as needed.
+
+        >>> list(parallel_map(abs, [3, -1, 4, -1, -5], chunk_size=2))
+        [3, 1, 4, 1, 5]
+    """
+
+    for _, results in _evaluated_chunks(fn, candidates, jobs, chunk_size, description, False):
+        yield from results
+
+
+def first_hit(
+    fn: Callable[[C], R | None],
+    candidates: Iterable[C],
+    *,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    description: str = "searching",
+) -> tuple[C, R]:
+    """
+    Returns the first candidate (lowest index) for which `fn` returns anything but `None`, together
+    with that result. Candidates are evaluated like in `parallel_map()`, and once the lowest hit is
+    known, chunks still pending are cancelled.
+
+        >>> from itertools import count
+        >>> first_hit(_square_root, count(2))
+        (4, 2)
+        >>> first_hit(_square_root, range(50, 150), chunk_size=5)
+        (64, 8)
+        >>> first_hit(_square_root, [2, 3, 5])
+        Traceback (most recent call last):
+        ...
+        ValueError: no hit among candidates
+    """
+
+    for chunk, results in _evaluated_chunks(fn, candidates, jobs, chunk_size, description, True):
+        for candidate, result in zip(chunk, results):
+            if result is not None:
+                return candidate, result
+
+    raise ValueError("no hit among candidates")
+
+
+def first_passing(
+    predicate: Callable[[C], bool],
+    candidates: Iterable[C],
+    *,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    description: str = "searching",
+) -> C:
+    """
+    Returns the first candidate satisfying the predicate, searched like in `first_hit()`:
+
+        >>> first_passing(_is_odd, [4, 2, 7, 9, 8])
+        7
+    """
+
+    candidate, _ = first_hit(
+        partial(_hit_if, predicate), candidates,
+        jobs=jobs, chunk_size=chunk_size, description=description,
+    )
+    return candidate
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def _evaluated_chunks(
+    fn: Callable[[C], R],
+    candidates: Iterable[C],
+    jobs: int,
+    chunk_size: int,
+    description: str,
+    stop_on_hit: bool,
+) -> Iterator[tuple[list[C], list[R]]]:
+    candidates_it = iter(candidates)
+
+    def next_chunk() -> list[C] | None:
+        return list(islice(candidates_it, chunk_size)) or None
+
+    with tqdm(desc=description, unit=" candidates", unit_scale=True, delay=1.0) as progress:
+        if jobs == 1:
+            while (chunk := next_chunk()) is not None:
+                results = _evaluate_chunk(fn, chunk, stop_on_hit)
+                progress.update(len(results))
+                yield chunk, results
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # chunks being evaluated, in candidate order
+            pending: deque[tuple[list[C], Future[list[R]]]] = deque()
+
+            def submit_next() -> None:
+                if (chunk := next_chunk()) is not None:
+                    pending.append((chunk, pool.submit(_evaluate_chunk, fn, chunk, stop_on_hit)))
+
+            # keep every worker busy with one extra chunk queued
+            for _ in range(2 * jobs):
+                submit_next()
+
+            try:
+                while pending:
+                    chunk, future = pending.popleft()
+                    submit_next()
+                    results = future.result()
+                    progress.update(len(results))
+                    yield chunk, results
+            finally:
+                # consumer is done (e.g. found what it needed) -> don't wait for the rest
+                for _, future in pending:
+                    future.cancel()
+
+
+def _evaluate_chunk(fn: Callable[[C], R], chunk: list[C], stop_on_hit: bool) -> list[R]:
+    # executed in a worker process; with `stop_on_hit`, the rest of the chunk after a hit is skipped
+    results: list[R] = []
+    for candidate in chunk:
+        results.append(result := fn(candidate))
+        if stop_on_hit and result is not None:
+            break
+    return results
+
+
+def _square_root(number: int) -> int | None:
+    # used in doctests
+    root = int(number ** 0.5)
+    return root if root * root == number else None
+
+
+def _hit_if(predicate: Callable[[C], bool], candidate: C) -> bool | None:
+    # module-level, so that it can be sent to worker processes
+    return True if predicate(candidate) else None
+
+
+def _is_odd(number: int) -> bool:
+    # used in doctests
+    return number % 2 == 1
@@ -0,0 +1,404 @@
+import itertools
+import operator
+from math import prod
+from typing import Callable, Iterable, Iterator, Literal, Self, Sequence
+
+from common.rect import HyperCuboid
+
+# numpy is optional: without it, the same computation runs in pure python (`map` over list slices)
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+
+Pos = tuple[int, ...]
+Offset = tuple[int, ...]
+# neighbor offset -> weight of its state in the neighborhood sum
+Kernel = dict[Offset, int]
+# (current state, neighborhood sum) -> next state
+Rule = Callable[[int, int], int]
+# fixed:    everything outside of the box is background forever, the box doesn't grow
+# wrap:     the box is a torus, opposite edges are neighbors
+# infinite: the box grows with each step, background evolves by the rule as well
+Border = Literal['fixed', 'wrap', 'infinite']
+
+
+def moore_kernel(dimensions: int = 2) -> Kernel:
+    """
+    All cells in distance 1 (incl. diagonals):
+
+        >>> list(moore_kernel(2))
+        [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        >>> len(moore_kernel(4))
+        80
+    """
+    return {
+        offset: 1
+        for offset in itertools.product((-1, 0, +1), repeat=dimensions)
+        if any(offset)
+    }
+
+
+def von_neumann_kernel(dimensions: int = 2) -> Kernel:
+    """
+    Cells in distance 1 along a single axis:
+
+        >>> list(von_neumann_kernel(2))
+        [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    """
+    return {
+        tuple(delta if axis == moved_axis else 0 for axis in range(dimensions)): 1
+        for moved_axis in range(dimensions)
+        for delta in (-1, +1)
+    }
+
+
+def binary_window_kernel(size: int = 3) -> Kernel:
+    """
+    Square 2D window incl. the center, where each cell is one bit of the sum (read left to right,
+    top to bottom, first being the most significant):
+
+        >>> k = binary_window_kernel(3)
+        >>> k[(-1, -1)], k[(0, -1)], k[(0, 0)], k[(1, 1)]
+        (256, 128, 16, 1)
+    """
+    radius = size // 2
+    return {
+        (dx, dy): 1 << (size * size - 1 - (size * (dy + radius) + dx + radius))
+        for dy in range(-radius, radius + 1)
+        for dx in range(-radius, radius + 1)
+    }
+
+
+def life_rule(state: int, neighbors: int) -> int:
+    # Conway's game of life: B3/S23
+    return int(neighbors in (2, 3) if state else neighbors == 3)
+
+
+class Cells:
+    """
+    N-dimensional box of cell states (small non-negative ints), stored flat with the last axis
+    contiguous. All cells outside of the box have the `background` state.
+
+        >>> c = Cells.from_positions([(1, 5), (3, 6), (2, 7)])
+        >>> c
+        Cells(shape=(3, 3), origin=(1, 5), background=0)
+        >>> c[1, 5], c[2, 5], c[100, 100]
+        (1, 0, 0)
+        >>> c.count(), sorted(c.positions())
+        (3, [(1, 5), (2, 7), (3, 6)])
+        >>> c.bounds
+        HyperCuboid((1, 5), (3, 7))
+    """
+
+    def __init__(
+        self,
+        shape: Sequence[int],
+        values: Iterable[int] | None = None,
+        origin: Pos | None = None,
+        background: int = 0,
+    ):
+        self.shape = tuple(shape)
+        self.origin = origin if origin is not None else tuple(0 for _ in self.shape)
+        self.background = background
+
+        size = prod(self.shape)
+        self.values = list(values) if values is not None else [background] * size
+        if len(self.values) != size:
+            raise ValueError(
+                f"expected {size} values for shape {self.shape} (got {len(self.values)})"
+            )
+        if len(self.origin) != len(self.shape):
+            raise ValueError("origin and shape must have the same number of dimensions")
+
+        self.strides = tuple(prod(self.shape[axis + 1:]) for axis in range(len(self.shape)))
+
+    @classmethod
+    def from_positions(
+        cls,
+        positions: Iterable[Pos],
+        state: int = 1,
+        background: int = 0,
+        bounds: HyperCuboid | None = None,
+    ) -> Self:
+        positions = list(positions)
+        if bounds is None:
+            bounds = HyperCuboid.with_all(positions)
+
+        cells = cls(shape=bounds.shape, origin=bounds.corner_min, background=background)
+        for pos in positions:
+            cells[pos] = state
+        return cells
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}('
+            f'shape={self.shape!r}, origin={self.origin!r}, background={self.background!r})'
+        )
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, type(self))
+            and self.shape == other.shape
+            and self.origin == other.origin
+            and self.background == other.background
+            and self.values == other.values
+        )
+
+    @property
+    def dimensions(self) -> int:
+        return len(self.shape)
+
+    @property
+    def bounds(self) -> HyperCuboid:
+        return HyperCuboid(
+            self.origin,
+            tuple(start + length - 1 for start, length in zip(self.origin, self.shape))
+        )
+
+    def _index(self, pos: Pos) -> int | None:
+        index = 0
+        for value, start, length, stride in zip(pos, self.origin, self.shape, self.strides):
+            if not 0 <= value - start < length:
+                return None
+            index += (value - start) * stride
+        return index
+
+    def _pos(self, index: int) -> Pos:
+        return tuple(
+            start + index // stride % length
+            for start, length, stride in zip(self.origin, self.shape, self.strides)
+        )
+
+    def __getitem__(self, pos: Pos) -> int:
+        index = self._index(pos)
+        return self.values[index] if index is not None else self.background
+
+    def __setitem__(self, pos: Pos, state: int) -> None:
+        if (index := self._index(pos)) is None:
+            raise IndexError(f"{pos!r} is out of bounds of {self!r}")
+        self.values[index] = state
+
+    def items(self) -> Iterator[tuple[Pos, int]]:
+        return ((self._pos(index), state) for index, state in enumerate(self.values))
+
+    def positions(self, state: int = 1) -> Iterator[Pos]:
+        return (self._pos(index) for index, value in enumerate(self.values) if value == state)
+
+    def count(self, state: int = 1) -> int:
+        if state == self.background:
+            raise ValueError(f"infinite number of cells is in state {state}")
+        return self.values.count(state)
+
+
+class Stencil:
+    """
+    Cellular automaton on `Cells`: in each step, the next state of every cell is given by the rule
+    from its current state and the weighted sum of its neighbors' states (`kernel`).
+    States contribute to the sums by their values, or by `contributions[state]` if given.
+
+    The rule is evaluated only once per each possible (state, sum) combination and the results are
+    looked up afterwards, so the whole step runs as array operations (numpy, if available).
+
+        >>> blinker = Cells.from_positions(
+        ...     [(1, 0), (1, 1), (1, 2)],
+        ...     bounds=HyperCuboid.at_origin((3, 3)),
+        ... )
+        >>> life = Stencil(moore_kernel(2), life_rule)
+        >>> sorted(life.step(blinker).positions())
+        [(0, 1), (1, 1), (2, 1)]
+        >>> life.run(blinker, steps=2) == blinker
+        True
+
+    With `border='infinite'`, the box grows so that no cells fall out of it:
+
+        >>> glider = Cells.from_positions([(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)])
+        >>> infinite_life = Stencil(moore_kernel(2), life_rule, border='infinite')
+        >>> (g4 := infinite_life.run(glider, steps=4))
+        Cells(shape=(11, 11), origin=(-4, -4), background=0)
+        >>> sorted(g4.positions())
+        [(1, 3), (2, 1), (2, 3), (3, 2), (3, 3)]
+
+    With `border='wrap'`, cells moving out of the box reappear on the other side:
+
+        >>> torus_life = Stencil(moore_kernel(2), life_rule, border='wrap')
+        >>> g_torus = Cells.from_positions(glider.positions(), bounds=HyperCuboid.at_origin((5, 5)))
+        >>> g_torus = torus_life.run(g_torus, steps=12)
+        >>> sorted(g_torus.positions())
+        [(0, 0), (0, 4), (3, 0), (4, 0), (4, 3)]
+
+    Pure python fallback gives the same results:
+
+        >>> infinite_life.run(glider, steps=4, use_numpy=False) == g4
+        True
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        kernel: Kernel,
+        rule: Rule,
+        states: int = 2,
+        border: Border = 'fixed',
+        contributions: Sequence[int] | None = None,
+    ):
+        if not kernel:
+            raise ValueError("empty kernel")
+        if border not in ('fixed', 'wrap', 'infinite'):
+            raise ValueError(f"unknown border {border!r}")
+
+        self.kernel = dict(kernel)
+        self.states = states
+        self.border = border
+        self.contributions = list(range(states)) if contributions is None else list(contributions)
+        self.radius = max(abs(delta) for offset in self.kernel for delta in offset)
+
+        if len(self.contributions) != states:
+            raise ValueError(f"expected {states} contributions (got {len(self.contributions)})")
+
+        # range of all possible neighborhood sums
+        self.sum_min = sum(min(w * c for c in self.contributions) for w in self.kernel.values())
+        self.sum_max = sum(max(w * c for c in self.contributions) for w in self.kernel.values())
+
+        # rule lookup table: table[state][sum - sum_min]
+        self.table = [
+            [rule(state, total) for total in range(self.sum_min, self.sum_max + 1)]
+            for state in range(states)
+        ]
+        if any(not 0 <= new_state < states for row in self.table for new_state in row):
+            raise ValueError(f"rule must produce states in range 0..{states - 1}")
+
+    def run(self, cells: Cells, steps: int, use_numpy: bool = HAS_NUMPY) -> Cells:
+        for _ in range(steps):
+            cells = self.step(cells, use_numpy=use_numpy)
+        return cells
+
+    def step(self, cells: Cells, use_numpy: bool = HAS_NUMPY) -> Cells:
+        if any(offset_len != cells.dimensions for offset_len in map(len, self.kernel)):
+            raise ValueError(f"kernel dimensions don't match {cells!r}")
+        if use_numpy and not HAS_NUMPY:
+            raise ValueError("numpy is not available")
+
+        # infinite border: box grows by radius, so padding must cover the neighbors of new cells too
+        grow = self.radius if self.border == 'infinite' else 0
+        out_shape = tuple(length + 2 * grow for length in cells.shape)
+        step_fn = self._step_numpy if use_numpy else self._step_python
+        values = step_fn(cells, self.radius + grow, out_shape)
+
+        if self.border == 'infinite':
+            background_sum = self.contributions[cells.background] * sum(self.kernel.values())
+            background = self.table[cells.background][background_sum - self.sum_min]
+        else:
+            background = cells.background
+
+        return Cells(
+            shape=out_shape,
+            values=values,
+            origin=tuple(start - grow for start in cells.origin),
+            background=background,
+        )
+
+    def _step_numpy(self, cells: Cells, pad: int, out_shape: Pos) -> list[int]:
+        array = np.array(cells.values, dtype=np.int64).reshape(cells.shape)
+        if self.border == 'wrap':
+            padded = np.pad(array, pad, mode='wrap')
+        else:
+            padded = np.pad(array, pad, mode='constant', constant_values=cells.background)
+
+        contributed = np.asarray(self.contributions, dtype=np.int64)[padded]
+        # output cell at `index` is at `index + radius` in the padded array
+        radius = self.radius
+        sums = np.zeros(out_shape, dtype=np.int64)
+        for offset, weight in self.kernel.items():
+            window = tuple(
+                slice(radius + delta, radius + delta + length)
+                for delta, length in zip(offset, out_shape)
+            )
+            sums += weight * contributed[window]
+
+        states = padded[tuple(slice(radius, radius + length) for length in out_shape)]
+        table = np.asarray(self.table, dtype=np.int64)
+        return table[states, sums - self.sum_min].ravel().tolist()
+
+    def _step_python(self, cells: Cells, pad: int, out_shape: Pos) -> list[int]:
+        padded_shape = tuple(length + 2 * pad for length in cells.shape)
+        strides = tuple(prod(padded_shape[axis + 1:]) for axis in range(len(padded_shape)))
+        padded = self._padded_values(cells, pad, padded_shape)
+
+        # sums are computed for the whole flat range spanning all output cells,
+        # output cell at `index` being at `index + radius` in the padded array
+        radius = self.radius
+        lo = sum(radius * stride for stride in strides)
+        hi = sum((radius + length - 1) * stride for length, stride in zip(out_shape, strides)) + 1
+        sums = self._sums_python(padded, strides, lo, hi)
+
+        # look up next states in the flattened table: key = state * span + (sum - sum_min)
+        span = self.sum_max - self.sum_min + 1
+        flat_table = [new_state for row in self.table for new_state in row]
+        keys = map(operator.add, map(operator.mul, padded[lo:hi], itertools.repeat(span)), sums)
+        next_states = list(map(flat_table.__getitem__, keys))
+
+        # pick output cells row by row (last axis)
+        row_length = out_shape[-1]
+        values: list[int] = []
+        for row_pos in itertools.product(*(range(length) for length in out_shape[:-1])):
+            start = sum((radius + index) * stride for index, stride in zip(row_pos, strides))
+            start += radius - lo
+            values.extend(next_states[start:start + row_length])
+        return values
+
+    def _sums_python(self, padded: list[int], strides: Pos, lo: int, hi: int) -> Iterable[int]:
+        # neighborhood sums (shifted by -sum_min) of flat range `lo..hi` of the padded array,
+        # each kernel offset being a constant shift of the flat index
+        if self.contributions != list(range(self.states)):
+            contributed = list(map(self.contributions.__getitem__, padded))
+        else:
+            contributed = padded
+
+        offsets_by_weight: dict[int, list[int]] = {}
+        for offset, weight in self.kernel.items():
+            flat_offset = sum(delta * stride for delta, stride in zip(offset, strides))
+            offsets_by_weight.setdefault(weight, []).append(flat_offset)
+
+        # lazy map chain, materialized only once by the caller
+        sums: Iterable[int] = itertools.repeat(-self.sum_min, hi - lo)
+        for weight, flat_offsets in offsets_by_weight.items():
+            shifted = [contributed[lo + offset:hi + offset] for offset in flat_offsets]
+            weighted_sums = shifted[0] if len(shifted) == 1 else map(sum, zip(*shifted))
+            if weight != 1:
+                weighted_sums = map(operator.mul, weighted_sums, itertools.repeat(weight))
+            sums = map(operator.add, sums, weighted_sums)
+
+        return sums
+
+    def _padded_values(self, cells: Cells, pad: int, padded_shape: Pos) -> list[int]:
+        row_length = cells.shape[-1]
+        background_row = [cells.background] * padded_shape[-1]
+        padded: list[int] = []
+
+        for padded_row_pos in itertools.product(*(range(length) for length in padded_shape[:-1])):
+            source_start = 0
+            for index, length, stride in zip(padded_row_pos, cells.shape, cells.strides):
+                source_index = index - pad
+                if self.border == 'wrap':
+                    source_index %= length
+                elif not 0 <= source_index < length:
+                    padded.extend(background_row)
+                    break
+                source_start += source_index * stride
+            else:
+                row = cells.values[source_start:source_start + row_length]
+                if self.border == 'wrap':
+                    padded.extend(
+                        row[(index - pad) % row_length]
+                        for index in range(len(background_row))
+                    )
+                else:
+                    padded.extend(background_row[:pad])
+                    padded.extend(row)
+                    padded.extend(background_row[:pad])
+
+        return padded
@@ -19,6 +19,9 @@ class XY(Orderable):
         yield self.x
         yield self.y
 
+    def _key(self) -> tuple[int, int]:
+        return self.x, self.y
+
 
 class Vector(XY):
     def __str__(self) -> str:
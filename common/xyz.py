@@ -4,6 +4,8 @@ from common.mixin import Orderable
 
 
 class XYZ(Orderable):
+    __slots__ = ['x', 'y', 'z']
+
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -17,6 +19,9 @@ class XYZ(Orderable):
         yield self.y
         yield self.z
 
+    def _key(self) -> tuple[int, int, int]:
+        return self.x, self.y, self.z
+
     def __bool__(self) -> bool:
         return any(v for v in self)
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+import csv
+import importlib
+import io
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict
+from typing import Any, Iterable
+
+import click
+from click.exceptions import Exit
+from tabulate import tabulate
+
+from meta.measure import Measurement, measuring, measuring_parts, TOTAL
+from meta.run import import_day, parse_day_paths, parse_year_dirs
+
+
+def bench_day_runs(
+    day_path: str,
+    input_path: str | None = None,
+    runs: int = 3,
+    warmup: int = 1,
+) -> list[dict[str, Measurement]]:
+    # executed in a fresh worker process, so that nothing leaks between days; within the day,
+    # warmup runs load the imports and the input into this interpreter, and the day module is
+    # reloaded before each run, so that its own caches don't carry over into the next run
+    module = import_day(day_path)
+    args = (input_path,) if input_path else ()
+    samples: list[dict[str, Measurement]] = []
+
+    for run_index in range(warmup + runs):
+        if run_index > 0:
+            module = importlib.reload(module)
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            with measuring_parts(module) as measurements:
+                with measuring() as measurement:
+                    module.main(*args)
+        if run_index >= warmup:
+            samples.append(measurements | {TOTAL: measurement()})
+
+    return samples
+
+
+Results = dict[str, dict[str, Measurement]]
+
+
+def bench_day(
+    day_path: str,
+    input_path: str | None = None,
+    runs: int = 3,
+    warmup: int = 1,
+) -> dict[str, Measurement]:
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        samples = pool.submit(bench_day_runs, day_path, input_path, runs, warmup).result()
+
+    return {
+        key: Measurement.aggregate(sample[key] for sample in samples)
+        for key in samples[0]
+    }
+
+
+def save_results(results: Results, path: str) -> None:
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['day', 'part', 'wall', 'cpu', 'rss'])
+            for day_path, day_results in results.items():
+                for part, m in day_results.items():
+                    writer.writerow([day_path, part, m.wall, m.cpu, m.rss])
+
+    else:
+        with open(path, 'w') as file:
+            json.dump(
+                {
+                    day_path: {part: asdict(m) for part, m in day_results.items()}
+                    for day_path, day_results in results.items()
+                },
+                file,
+                indent=2,
+            )
+
+
+def load_results(path: str) -> Results:
+    results: Results = {}
+
+    if path.endswith('.csv'):
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                results.setdefault(row['day'], {})[row['part']] = Measurement(
+                    wall=float(row['wall']), cpu=float(row['cpu']), rss=int(row['rss'])
+                )
+
+    else:
+        with open(path) as file:
+            for day_path, day_results in json.load(file).items():
+                results[day_path] = {
+                    part: Measurement(**m_dict) for part, m_dict in day_results.items()
+                }
+
+    return results
+
+
+def find_regressions(
+    results: Results,
+    baseline: Results,
+    threshold: float = 0.1,
+    min_time: float = 0.01,
+) -> Iterable[tuple[str, str, float]]:
+    """
+    Yields `(day, part, ratio)` for each part whose wall time grew by more than `threshold`
+    (relative) compared to the baseline. Parts faster than `min_time` seconds in both are ignored
+    as noise.
+
+        >>> base = {'day01.py': {'part_1': Measurement(1.0, 1.0, 10),
+        ...                      'part_2': Measurement(2.0, 2.0, 10)},
+        ...         'day02.py': {'part_1': Measurement(0.001, 0.001, 10)}}
+        >>> new = {'day01.py': {'part_1': Measurement(1.05, 1.0, 10),
+        ...                     'part_2': Measurement(3.0, 3.0, 10)},
+        ...        'day02.py': {'part_1': Measurement(0.005, 0.005, 10)},
+        ...        'day03.py': {'part_1': Measurement(5.0, 5.0, 10)}}
+        >>> list(find_regressions(new, base))
+        [('day01.py', 'part_2', 1.5)]
+        >>> list(find_regressions(new, base, threshold=0.01))
+        [('day01.py', 'part_1', 1.05), ('day01.py', 'part_2', 1.5)]
+    """
+
+    for day_path, day_results in results.items():
+        for part, measurement in day_results.items():
+            if (base_measurement := baseline.get(day_path, {}).get(part)) is None:
+                continue
+            if max(measurement.wall, base_measurement.wall) < min_time:
+                continue
+            ratio = measurement.wall / max(base_measurement.wall, 1e-9)
+            if ratio > 1 + threshold:
+                yield day_path, part, ratio
+
+
+def report_rows(results: Results, baseline: Results | None) -> Iterable[list[Any]]:
+    for day_path, day_results in results.items():
+        for part, m in day_results.items():
+            row: list[Any] = [day_path, part, f"{m.wall:.3f}", f"{m.cpu:.3f}", m.rss // 1024]
+            if baseline is not None:
+                base_m = baseline.get(day_path, {}).get(part)
+                row.append(f"{m.wall / max(base_m.wall, 1e-9):.2f}x" if base_m else "-")
+            yield row
+
+
+@click.command()
+@click.option(
+    '--year', '-y', type=click.UNPROCESSED, callback=parse_year_dirs, required=True,
+    expose_value=False, help="year number or 'all'"
+)
+@click.option(
+    '--day', '-d', 'day_paths', type=click.UNPROCESSED, callback=parse_day_paths, required=True,
+    help="day number or 'all'"
+)
+@click.option(
+    '--input', '-i', 'input_path', type=click.Path(exists=True), help="override default input path"
+)
+@click.option(
+    '--runs', '-n', type=click.IntRange(min=1), default=3, help="measured runs per day"
+)
+@click.option(
+    '--warmup', '-w', type=click.IntRange(min=0), default=1,
+    help="discarded runs per day, made in the same process before the measured ones"
+)
+@click.option(
+    '--output', '-o', 'output_path', type=click.Path(dir_okay=False),
+    help="write results into a .json or .csv file"
+)
+@click.option(
+    '--baseline', '-b', 'baseline_path', type=click.Path(exists=True, dir_okay=False),
+    help="compare results against a previously written .json or .csv file"
+)
+@click.option(
+    '--threshold', '-t', type=click.FloatRange(min=0), default=0.1,
+    help="relative slowdown considered a regression (0.1 = 10%)"
+)
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def bench(
+    day_paths: list[str],
+    input_path: str | None,
+    runs: int,
+    warmup: int,
+    output_path: str | None,
+    baseline_path: str | None,
+    threshold: float,
+):
+    results: Results = {}
+    failed_paths: list[str] = []
+
+    for day_path in day_paths:
+        click.echo(f">> benchmarking {day_path} ({warmup} warmup + {runs} runs)", err=True)
+        try:
+            results[day_path] = bench_day(day_path, input_path, runs=runs, warmup=warmup)
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            click.echo(f">> {day_path} failed:\n{traceback.format_exc()}", err=True, nl=False)
+            failed_paths.append(day_path)
+
+    baseline = load_results(baseline_path) if baseline_path else None
+
+    headers = ['day', 'part', 'wall [s]', 'cpu [s]', 'peak rss [MB]']
+    if baseline is not None:
+        headers.append('vs baseline')
+    click.echo(tabulate(report_rows(results, baseline), headers=headers))
+
+    if output_path:
+        save_results(results, output_path)
+        click.echo(f">> results written to {output_path}", err=True)
+
+    if failed_paths:
+        click.echo(f">> {len(failed_paths)} day(s) failed: {', '.join(failed_paths)}", err=True)
+
+    if baseline is not None:
+        regressions = list(find_regressions(results, baseline, threshold=threshold))
+        for day_path, part, ratio in regressions:
+            click.echo(f">> regression: {day_path} {part} is {ratio:.2f}x slower", err=True)
+        if regressions:
+            raise Exit(1)
+
+    if failed_paths:
+        raise Exit(1)
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    bench()
@@ -0,0 +1,160 @@
+import cProfile
+import resource
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from types import ModuleType
+from typing import Any, Callable, Iterable, Iterator, Self
+
+
+PARTS = ('part_1', 'part_2')
+TOTAL = 'total'
+
+
+@dataclass(frozen=True)
+class Measurement:
+    # wall-clock time in seconds
+    wall: float
+    # cpu time of the process in seconds
+    cpu: float
+    # peak resident set size in kB during the measurement (on Linux, otherwise peak of the process)
+    rss: int
+
+    def __add__(self, other: Self) -> Self:
+        return type(self)(
+            wall=self.wall + other.wall,
+            cpu=self.cpu + other.cpu,
+            rss=max(self.rss, other.rss),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.wall:.3f} s (cpu {self.cpu:.3f} s, peak rss {self.rss // 1024} MB)"
+
+    @classmethod
+    def aggregate(cls, samples: Iterable[Self]) -> Self:
+        """
+        Median times and maximum RSS of the given samples:
+
+            >>> Measurement.aggregate([
+            ...     Measurement(wall=1.5, cpu=1.0, rss=100),
+            ...     Measurement(wall=1.0, cpu=0.5, rss=300),
+            ...     Measurement(wall=3.0, cpu=2.5, rss=200),
+            ... ])
+            Measurement(wall=1.5, cpu=1.0, rss=300)
+        """
+        samples = list(samples)
+        return cls(
+            wall=statistics.median(s.wall for s in samples),
+            cpu=statistics.median(s.cpu for s in samples),
+            rss=max(s.rss for s in samples),
+        )
+
+
+def peak_rss() -> int:
+    # VmHWM can be reset (see `reset_peak_rss()`), unlike `ru_maxrss`
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_peak_rss() -> None:
+    # Linux only, elsewhere the peak stays the one of the whole process
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+
+# peaks reached so far by the measurements in progress, kept across resets by nested measurements
+_running_peaks: list[list[int]] = []
+
+
+@contextmanager
+def measuring() -> Iterator[Callable[[], Measurement]]:
+    # usage:
+    #   with measuring() as measurement:
+    #       ...
+    #   print(measurement())
+    current_peak = peak_rss()
+    for running_peak in _running_peaks:
+        running_peak[0] = max(running_peak[0], current_peak)
+    reset_peak_rss()
+    own_peak = [0]
+    _running_peaks.append(own_peak)
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result: list[Measurement] = []
+    try:
+        yield lambda: result[0]
+    finally:
+        _running_peaks.remove(own_peak)
+        result.append(Measurement(
+            wall=time.perf_counter() - wall_start,
+            cpu=time.process_time() - cpu_start,
+            rss=max(peak_rss(), own_peak[0]),
+        ))
+
+
+@contextmanager
+def profiling(profiler: cProfile.Profile | None) -> Iterator[None]:
+    # enables the profiler (if any) for the duration of the block
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+
+def has_parts(module: ModuleType) -> bool:
+    return any(hasattr(module, part_name) for part_name in PARTS)
+
+
+@contextmanager
+def measuring_parts(
+    module: ModuleType,
+    profiler: cProfile.Profile | None = None,
+) -> Iterator[dict[str, Measurement]]:
+    """
+    Temporarily wraps `part_1` and `part_2` of a day module, so that each call made by its `main()`
+    is measured separately. Measurements are collected into the yielded dict, keyed by part name.
+    If a profiler is given, it is enabled only for the duration of the part calls.
+    """
+
+    measurements: dict[str, Measurement] = {}
+    originals: dict[str, Callable] = {
+        part_name: getattr(module, part_name)
+        for part_name in PARTS
+        if hasattr(module, part_name)
+    }
+
+    def measured(part_name: str, part_fn: Callable) -> Callable:
+        @wraps(part_fn)
+        def wrapper(*args, **kwargs) -> Any:
+            with measuring() as measurement, profiling(profiler):
+                result = part_fn(*args, **kwargs)
+
+            if part_name in measurements:
+                measurements[part_name] += measurement()
+            else:
+                measurements[part_name] = measurement()
+            return result
+
+        return wrapper
+
+    for part_name, part_fn in originals.items():
+        setattr(module, part_name, measured(part_name, part_fn))
+    try:
+        yield measurements
+    finally:
+        for part_name, part_fn in originals.items():
+            setattr(module, part_name, part_fn)
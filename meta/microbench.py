@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import timeit
+from array import array
+from typing import Callable, Iterable
+
+import click
+from tabulate import tabulate
+
+from common.xy import XY
+from common.xyz import XYZ
+from y2020.day15_memory_game import memory_game
+from y2020.day23_cups import Cups, play_successors
+
+
+# name -> function yielding rows: (case, engine, operations per run, callable running them once)
+Microbenchmark = Callable[[], Iterable[tuple[str, str, int, Callable[[], object]]]]
+MICROBENCHMARKS: dict[str, Microbenchmark] = {}
+
+
+def microbenchmark(fn: Microbenchmark) -> Microbenchmark:
+    MICROBENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def throughput(operations: int, run: Callable[[], object], repeat: int = 5) -> float:
+    # best of `repeat` runs, in operations per second
+    best_time = min(timeit.repeat(run, number=1, repeat=repeat))
+    return operations / best_time
+
+
+@microbenchmark
+def orderable() -> Iterable[tuple[str, str, int, Callable[[], object]]]:
+    # hash/eq of `Orderable` before (repr-based hash, tuple-building eq) and after (slot values)
+
+    class ReprHashedXY(XY):
+        __slots__ = ()
+
+        def __hash__(self) -> int:
+            return hash(repr(self))
+
+        def __eq__(self, other) -> bool:
+            return isinstance(other, type(self)) and tuple(self) == tuple(other)
+
+    class ReprHashedXYZ(XYZ):
+        __slots__ = ()
+
+        def __hash__(self) -> int:
+            return hash(repr(self))
+
+        def __eq__(self, other) -> bool:
+            return isinstance(other, type(self)) and tuple(self) == tuple(other)
+
+    size = 100
+    coords = [(x, y, (x * y) % 7) for x in range(size) for y in range(size)]
+
+    for engine, xy_cls, xyz_cls in [
+        ('before', ReprHashedXY, ReprHashedXYZ),
+        ('after', XY, XYZ),
+    ]:
+        xys = [xy_cls(x, y) for x, y, _ in coords]
+        xys_copies = [xy_cls(x, y) for x, y, _ in coords]
+        xy_dict = dict.fromkeys(xys, 0)
+        xyzs = [xyz_cls(x, y, z) for x, y, z in coords]
+        xyzs_copies = [xyz_cls(x, y, z) for x, y, z in coords]
+        xyz_dict = dict.fromkeys(xyzs, 0)
+
+        # pylint: disable=cell-var-from-loop
+        yield 'XY set insert', engine, len(xys), lambda: set(xys)
+        yield 'XY dict lookup', engine, len(xys), lambda: sum(xy_dict[p] for p in xys_copies)
+        yield 'XYZ set insert', engine, len(xyzs), lambda: set(xyzs)
+        yield 'XYZ dict lookup', engine, len(xyzs), lambda: sum(xyz_dict[p] for p in xyzs_copies)
+
+
+@microbenchmark
+def integer_games() -> Iterable[tuple[str, str, int, Callable[[], object]]]:
+    # 2020 day 15 memory game and day 23 cups: dict-based (before) and array-based (after) engines
+    turns = 300_000
+    moves = 300_000
+
+    for engine, fast in [('dict', False), ('array', True)]:
+        # pylint: disable=cell-var-from-loop
+        yield 'memory game turns', engine, turns, lambda: memory_game([0, 3, 6], turns, fast=fast)
+
+    # both cup games just keep going with each run, successor table is built only once
+    cups = Cups.from_line('389125467').grown_to(1_000_000)
+    yield 'cups moves', 'dict', moves, lambda: cups.play(moves, fast=False)
+    successors = array('I', bytes(4 * (len(cups) + 1)))
+    for label, next_label in cups.next.items():
+        successors[label] = next_label
+    yield 'cups moves', 'array', moves, lambda: play_successors(successors, cups.current, moves)
+
+
+@click.command()
+@click.argument('names', nargs=-1, type=click.Choice(sorted(MICROBENCHMARKS)))
+def run_microbenchmarks(names: tuple[str, ...]):
+    for name in names or sorted(MICROBENCHMARKS):
+        rows = [
+            (case, engine, f"{throughput(operations, run):,.0f}")
+            for case, engine, operations, run in MICROBENCHMARKS[name]()
+        ]
+        click.echo(f">> {name}")
+        headers = ['case', 'engine', 'ops/s']
+        click.echo(tabulate(rows, headers=headers, colalign=('left', 'left', 'right')))
+        click.echo()
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    run_microbenchmarks()
@@ -1,78 +1,284 @@
 #!/usr/bin/env python3
 
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
 from importlib import import_module
+from types import ModuleType
 
 import click
 from click.exceptions import Exit
 
 from meta.aoc_tools import day_files, DayDescription, year_dirs
+from meta.measure import has_parts, Measurement, measuring, measuring_parts, profiling, TOTAL
 
 
 # pylint: disable=unused-argument
-def parse_year_dir(ctx: click.Context, param, value: int) -> str:
+def parse_year_dirs(ctx: click.Context, param, value: str) -> list[str]:
+    ctx.ensure_object(dict)
+
+    if value == 'all':
+        ctx.obj['year_dirs'] = [y_dir for _, y_dir in year_dirs()]
+        return ctx.obj['year_dirs']
+
+    year = int(value)
     try:
-        year_dir = next(y_dir for y, y_dir in year_dirs() if y == value)
-        ctx.ensure_object(dict)
-        ctx.obj['year_dir'] = year_dir
-        return year_dir
+        year_dir = next(y_dir for y, y_dir in year_dirs() if y == year)
+        ctx.obj['year_dirs'] = [year_dir]
+        return ctx.obj['year_dirs']
 
     except StopIteration as stop:
-        click.echo(f">> year {value} not found", err=True)
+        click.echo(f">> year {year} not found", err=True)
         raise Exit(1) from stop
 
 
 # pylint: disable=unused-argument
 def parse_day_paths(ctx: click.Context, param, value) -> list[str]:
-    year_dir = ctx.obj['year_dir']
+    year_dirs_: list[str] = ctx.obj['year_dirs']
 
     if value == 'all':
-        return [d_filename for _, d_filename in day_files(year_dir)]
+        return [d_filename for year_dir in year_dirs_ for _, d_filename in day_files(year_dir)]
 
     day = int(value)
+    day_paths = [
+        d_filename
+        for year_dir in year_dirs_
+        for d, d_filename in day_files(year_dir)
+        if d == day
+    ]
+    if not day_paths:
+        click.echo(f">> day {day} not found in {', '.join(year_dirs_)}", err=True)
+        raise Exit(1)
+
+    return day_paths
+
+
+def import_day(day_path: str) -> ModuleType:
+    return import_module(day_path.removesuffix('.py').replace('/', '.'))
+
+
+def profile_path_for(profile_dir: str, day_path: str) -> str:
+    # y2015/day01_floors.py -> {profile_dir}/y2015-day01_floors.pstats
+    return os.path.join(profile_dir, day_path.removesuffix('.py').replace('/', '-') + '.pstats')
+
+
+def run_day(
+    day_path: str,
+    input_path: str | None = None,
+    profile_path: str | None = None,
+    jobs: int = 1,
+) -> dict[str, Measurement]:
+    """
+    Runs `main()` of given day, measuring each part separately.
+    If `profile_path` is given, the parts are also profiled and stats are dumped there.
+    Days without parts are measured (and profiled) as a whole.
+    Days whose `main()` takes `jobs` can spread their work over that many processes.
+    """
+    module = import_day(day_path)
+    args = (input_path,) if input_path else ()
+    kwargs = {'jobs': jobs} if jobs > 1 and accepts_jobs(module) else {}
+    profiler = cProfile.Profile() if profile_path else None
+    main_profiler = profiler if not has_parts(module) else None
+
+    with measuring_parts(module, profiler=profiler) as measurements:
+        with measuring() as measurement, profiling(main_profiler):
+            module.main(*args, **kwargs)
+
+    if profiler is not None and profile_path:
+        profiler.dump_stats(profile_path)
+
+    return measurements | {TOTAL: measurement()}
+
+
+def accepts_jobs(module: ModuleType) -> bool:
+    return 'jobs' in inspect.signature(module.main).parameters
+
+
+@dataclass(frozen=True)
+class DayRun:
+    day_path: str
+    output: str
+    measurements: dict[str, Measurement] = field(default_factory=dict)
+    error: str | None = None
+
+
+def run_day_captured(
+    day_path: str,
+    input_path: str | None = None,
+    profile_path: str | None = None,
+) -> DayRun:
+    # executed in a worker process:
+    # stdout is collected to be printed later in order, stderr (progress bars) is discarded
+    stdout, stderr = io.StringIO(), io.StringIO()
+
     try:
-        return [next(d_filename for d, d_filename in day_files(year_dir) if d == day)]
-    except StopIteration as stop:
-        click.echo(f">> day {day} not found in {year_dir}", err=True)
-        raise Exit(1) from stop
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            measurements = run_day(day_path, input_path, profile_path)
+    # pylint: disable=broad-exception-caught
+    except Exception:
+        return DayRun(day_path, stdout.getvalue(), error=traceback.format_exc())
 
+    return DayRun(day_path, stdout.getvalue(), measurements)
 
-@click.command()
-@click.option(
-    '--year', '-y', 'year_dir', type=int, callback=parse_year_dir, required=True
-)
-@click.option(
-    '--day', '-d', 'day_paths', type=click.UNPROCESSED, callback=parse_day_paths, required=True
-)
-@click.option(
-    '--input', '-i', 'input_path', type=click.Path(exists=True), help="override default input path"
-)
-@click.option(
-    '--show-description/--no-show-description', default=True
-)
-def run(year_dir: str, day_paths: list[str], input_path: str, show_description: bool):
 
-    for day_path in day_paths:
-        module_name = day_path.removesuffix('.py').replace('/', '.')
-        module = import_module(module_name)
+def echo_measurements(measurements: dict[str, Measurement]) -> None:
+    for key, measurement in measurements.items():
+        click.echo(f">> {key}: {measurement}", err=True)
+
+
+def echo_profile_summary(profile_paths: list[str], top: int) -> None:
+    # hot functions aggregated across all profiled days, by time spent in the function itself
+    if not (existing_paths := [path for path in profile_paths if os.path.exists(path)]):
+        return
+
+    click.echo(f">> top {top} functions across {len(existing_paths)} profiled day(s):", err=True)
+    stats = pstats.Stats(*existing_paths, stream=sys.stderr)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
 
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def run_sequential(
+    day_paths: list[str],
+    input_path: str | None,
+    show_description: bool,
+    show_time: bool,
+    profile_paths: list[str | None],
+    jobs: int = 1,
+) -> None:
+    for day_path, profile_path in zip(day_paths, profile_paths):
         if show_description:
             day_description = DayDescription.from_file(day_path)
             click.echo(f">> running {day_description}", err=True)
 
         try:
-            if not input_path:
-                module.main()
-            else:
-                module.main(input_path)
+            measurements = run_day(day_path, input_path, profile_path, jobs)
 
         except AttributeError as exc:
             click.echo(f">> {exc}", err=True)
             raise Exit(1) from exc
 
+        if show_time:
+            echo_measurements(measurements)
+
         if show_description and len(day_paths) > 1:
             click.echo("", err=True)
 
 
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def run_parallel(
+    day_paths: list[str],
+    input_path: str | None,
+    show_description: bool,
+    show_time: bool,
+    profile_paths: list[str | None],
+    jobs: int,
+) -> None:
+    failed_paths: list[str] = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(run_day_captured, day_path, input_path, profile_path)
+            for day_path, profile_path in zip(day_paths, profile_paths)
+        ]
+
+        # results are printed in the original order, regardless of which day finishes first
+        for day_path, future in zip(day_paths, futures):
+            try:
+                day_run = future.result()
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                # e.g. worker process killed -> only this day is reported as failed
+                day_run = DayRun(day_path, output="", error=traceback.format_exc())
+
+            if show_description:
+                day_description = DayDescription.from_file(day_path)
+                click.echo(f">> running {day_description}", err=True)
+
+            click.echo(day_run.output, nl=False)
+
+            if show_time:
+                echo_measurements(day_run.measurements)
+
+            if day_run.error:
+                click.echo(f">> {day_path} failed:\n{day_run.error}", err=True, nl=False)
+                failed_paths.append(day_path)
+
+            if show_description and len(day_paths) > 1:
+                click.echo("", err=True)
+
+    if failed_paths:
+        click.echo(f">> {len(failed_paths)} day(s) failed: {', '.join(failed_paths)}", err=True)
+        raise Exit(1)
+
+
+@click.command()
+@click.option(
+    '--year', '-y', type=click.UNPROCESSED, callback=parse_year_dirs, required=True,
+    expose_value=False, help="year number or 'all'"
+)
+@click.option(
+    '--day', '-d', 'day_paths', type=click.UNPROCESSED, callback=parse_day_paths, required=True,
+    help="day number or 'all'"
+)
+@click.option(
+    '--input', '-i', 'input_path', type=click.Path(exists=True), help="override default input path"
+)
+@click.option(
+    '--show-description/--no-show-description', default=True
+)
+@click.option(
+    '--jobs', '-j', type=click.IntRange(min=1), default=1,
+    help="number of days to run in parallel (output is still printed in order); "
+         "a single day gets the processes to itself, if it can use them"
+)
+@click.option(
+    '--time', '-t', 'show_time', is_flag=True, help="report time and memory used by each part"
+)
+@click.option(
+    '--profile', '-p', 'profile_dir', type=click.Path(file_okay=False),
+    help="profile each part and dump pstats files per day into given directory"
+)
+@click.option(
+    '--top', type=click.IntRange(min=1), default=20,
+    help="number of hot functions listed in the profile summary"
+)
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def run(
+    day_paths: list[str],
+    input_path: str,
+    show_description: bool,
+    jobs: int,
+    show_time: bool,
+    profile_dir: str | None,
+    top: int,
+):
+    profile_paths: list[str | None]
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        profile_paths = [profile_path_for(profile_dir, day_path) for day_path in day_paths]
+    else:
+        profile_paths = [None] * len(day_paths)
+
+    try:
+        if jobs == 1 or len(day_paths) == 1:
+            run_sequential(
+                day_paths, input_path, show_description, show_time, profile_paths, jobs
+            )
+        else:
+            run_parallel(day_paths, input_path, show_description, show_time, profile_paths, jobs)
+
+    finally:
+        if profile_dir:
+            echo_profile_summary([path for path in profile_paths if path], top)
+
+
 if __name__ == '__main__':
     # pylint: disable=no-value-for-parameter
     run()
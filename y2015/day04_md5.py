@@ -4,15 +4,15 @@ Day 4: The Ideal Stocking Stuffer
 https://adventofcode.com/2015/day/4
 """
 
-from itertools import count
-
-from tqdm import tqdm
-
+from common.iteration import first
+from common.md5 import HexPrefix, mine as md5_mine
+# only used in doctests
+# pylint: disable=unused-import
 from common.md5 import md5
 from meta.aoc_tools import data_path
 
 
-def part_1(key: str) -> int:
+def part_1(key: str, jobs: int = 1) -> int:
     """
     Santa needs help mining some AdventCoins (very similar to bitcoins) to use as gifts for all the
     economically forward-thinking little girls and boys.
@@ -48,12 +48,12 @@ def part_1(key: str) -> int:
         181349
     """
 
-    result = mine(key, target='0' * 5)
+    result = mine(key, target='0' * 5, jobs=jobs)
     print(f"part 1: coin mined with number {result}")
     return result
 
 
-def part_2(key: str) -> int:
+def part_2(key: str, jobs: int = 1) -> int:
     """
     Now find one that starts with **six zeroes**.
 
@@ -62,33 +62,25 @@ def part_2(key: str) -> int:
         8218955
     """
 
-    result = mine(key, target='0' * 6)
+    result = mine(key, target='0' * 6, jobs=jobs)
     print(f"part 2: coin mined with number {result}")
     return result
 
 
-def mine(key: str, target: str = '00000') -> int:
-    return next(
-        k
-        for k in tqdm(
-            count(1),
-            desc=f"mining for {target}",
-            unit=" hashes",
-            unit_scale=True,
-            delay=1.0
-        )
-        if md5(key + str(k)).startswith(target)
-    )
+def mine(key: str, target: str = '00000', jobs: int = 1) -> int:
+    mined = md5_mine(key, HexPrefix(target), start=1, jobs=jobs, description=f"mining for {target}")
+    index, _ = first(mined)
+    return index
 
 
 def key_from_file(fn: str) -> str:
     return open(fn).readline().strip()
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     key = key_from_file(input_path)
-    result_1 = part_1(key)
-    result_2 = part_2(key)
+    result_1 = part_1(key, jobs=jobs)
+    result_2 = part_2(key, jobs=jobs)
     return result_1, result_2
 
 
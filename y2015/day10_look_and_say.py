@@ -4,14 +4,17 @@ Day 10: Elves Look, Elves Say
 https://adventofcode.com/2015/day/10
 """
 
+from collections import Counter
 from itertools import groupby
 from typing import Iterable
 
+# only used in doctests
+# pylint: disable=unused-import
 from common.iteration import last
 from meta.aoc_tools import data_path
 
 
-def part_1(starting_number: str, iterations: int = 40) -> str:
+def part_1(starting_number: str, iterations: int = 40) -> int:
     """
     Today, the Elves are playing a game called **look-and-say**. They take turns making sequences by
     reading aloud the previous sequence and using that reading as the next sequence.
@@ -33,32 +36,29 @@ def part_1(starting_number: str, iterations: int = 40) -> str:
     Starting with the digits in your puzzle input, apply this process **40 times**.
     What is the length of the result?
 
-        >>> part_1('1')  # doctest: +ELLIPSIS
+        >>> part_1('1')
         part 1: after 40 iterations, sequence has length 82350
-        '111312211312111322212321121113121112131112132112311321322112111312212321121113122112131...'
+        82350
     """
 
-    seq = last(las_sequence(starting_number, iterations))
-    result = len(seq)
+    result = las_length(starting_number, iterations)
     print(f"part 1: after {iterations} iterations, sequence has length {result}")
-    return seq
+    return result
 
 
-def part_2(starting_number: str, iterations: int = 50) -> str:
+def part_2(starting_number: str, iterations: int = 50) -> int:
     """
     Now, starting again with the digits in your puzzle input, apply this process **50 times**.
     What is the length of the new result?
 
-        >>> part_2('1')  # doctest: +ELLIPSIS
+        >>> part_2('1')
         part 2: after 50 iterations, sequence has length 1166642
-        '311311222113111231133211121312211231131112311211133112111312211213211312111322211231131...'
+        1166642
     """
 
-    seq = last(las_sequence(starting_number, iterations))
-    result = len(seq)
-    more = " more" if len(starting_number) >= 100 else ""
-    print(f"part 2: after {iterations}{more} iterations, sequence has length {result}")
-    return seq
+    result = las_length(starting_number, iterations)
+    print(f"part 2: after {iterations} iterations, sequence has length {result}")
+    return result
 
 
 def las(number: str) -> str:
@@ -77,14 +77,225 @@ def las_sequence(starting_number: str, iterations: int) -> Iterable[str]:
         yield number
 
 
+# Conway's 92 elements: name, digits, elements its look-and-say decays into
+ELEMENTS_TABLE = """
+    H   22                                          H
+    He  13112221133211322112211213322112            Hf Pa H Ca Li
+    Li  312211322212221121123222112                 He
+    Be  111312211312113221133211322112211213322112  Ge Ca Li
+    B   1321132122211322212221121123222112          Be
+    C   3113112211322112211213322112                B
+    N   111312212221121123222112                    C
+    O   132112211213322112                          N
+    F   31121123222112                              O
+    Ne  111213322112                                F
+    Na  123222112                                   Ne
+    Mg  3113322112                                  Pm Na
+    Al  1113222112                                  Mg
+    Si  1322112                                     Al
+    P   311311222112                                Ho Si
+    S   1113122112                                  P
+    Cl  132112                                      S
+    Ar  3112                                        Cl
+    K   1112                                        Ar
+    Ca  12                                          K
+    Sc  3113112221133112                            Ho Pa H Ca Co
+    Ti  11131221131112                              Sc
+    V   13211312                                    Ti
+    Cr  31132                                       V
+    Mn  111311222112                                Cr Si
+    Fe  13122112                                    Mn
+    Co  32112                                       Fe
+    Ni  11133112                                    Zn Co
+    Cu  131112                                      Ni
+    Zn  312                                         Cu
+    Ga  13221133122211332                           Eu Ca Ac H Ca Zn
+    Ge  31131122211311122113222                     Ho Ga
+    As  11131221131211322113322112                  Ge Na
+    Se  13211321222113222112                        As
+    Br  3113112211322112                            Se
+    Kr  11131221222112                              Br
+    Rb  1321122112                                  Kr
+    Sr  3112112                                     Rb
+    Y   1112133                                     Sr U
+    Zr  12322211331222113112211                     Y H Ca Tc
+    Nb  1113122113322113111221131221                Er Zr
+    Mo  13211322211312113211                        Nb
+    Tc  311322113212221                             Mo
+    Ru  132211331222113112211                       Eu Ca Tc
+    Rh  311311222113111221131221                    Ho Ru
+    Pd  111312211312113211                          Rh
+    Ag  132113212221                                Pd
+    Cd  3113112211                                  Ag
+    In  11131221                                    Cd
+    Sn  13211                                       In
+    Sb  3112221                                     Pm Sn
+    Te  1322113312211                               Eu Ca Sb
+    I   311311222113111221                          Ho Te
+    Xe  11131221131211                              I
+    Cs  13211321                                    Xe
+    Ba  311311                                      Cs
+    La  11131                                       Ba
+    Ce  1321133112                                  La H Ca Co
+    Pr  31131112                                    Ce
+    Nd  111312                                      Pr
+    Pm  132                                         Nd
+    Sm  311332                                      Pm Ca Zn
+    Eu  1113222                                     Sm
+    Gd  13221133112                                 Eu Ca Co
+    Tb  3113112221131112                            Ho Gd
+    Dy  111312211312                                Tb
+    Ho  1321132                                     Dy
+    Er  311311222                                   Ho Pm
+    Tm  11131221133112                              Er Ca Co
+    Yb  1321131112                                  Tm
+    Lu  311312                                      Yb
+    Hf  11132                                       Lu
+    Ta  13112221133211322112211213322113            Hf Pa H Ca W
+    W   312211322212221121123222113                 Ta
+    Re  111312211312113221133211322112211213322113  Ge Ca W
+    Os  1321132122211322212221121123222113          Re
+    Ir  3113112211322112211213322113                Os
+    Pt  111312212221121123222113                    Ir
+    Au  132112211213322113                          Pt
+    Hg  31121123222113                              Au
+    Tl  111213322113                                Hg
+    Pb  123222113                                   Tl
+    Bi  3113322113                                  Pm Pb
+    Po  1113222113                                  Bi
+    At  1322113                                     Po
+    Rn  311311222113                                Ho At
+    Fr  1113122113                                  Rn
+    Ra  132113                                      Fr
+    Ac  3113                                        Ra
+    Th  1113                                        Ac
+    Pa  13                                          Th
+    U   3                                           Pa
+"""
+
+
+def _parse_elements(table: str) -> tuple[dict[str, str], dict[str, tuple[str, ...]]]:
+    digits: dict[str, str] = {}
+    decays: dict[str, tuple[str, ...]] = {}
+    for line in table.strip().splitlines():
+        name, element_digits, *decay = line.split()
+        digits[name] = element_digits
+        decays[name] = tuple(decay)
+    return digits, decays
+
+
+ELEMENT_DIGITS, ELEMENT_DECAYS = _parse_elements(ELEMENTS_TABLE)
+
+
+def splits(left_digit: str, right_element: str) -> bool:
+    """
+    Element `right_element` following a sequence ending with `left_digit` evolves independently of
+    it forever, iff the first digit of its decay never becomes `left_digit` (the last digit of
+    a sequence never changes). All decays split into independently evolving elements:
+
+        >>> splits('3', 'H'), splits('2', 'H'), splits('2', 'Ca'), splits('3', 'Ca')
+        (True, False, True, False)
+        >>> all(
+        ...     las(ELEMENT_DIGITS[name]) == ''.join(ELEMENT_DIGITS[d] for d in decay)
+        ...     and all(splits(ELEMENT_DIGITS[e1][-1], e2) for e1, e2 in zip(decay, decay[1:]))
+        ...     for name, decay in ELEMENT_DECAYS.items()
+        ... )
+        True
+    """
+    element: str | None = right_element
+    seen: set[str] = set()
+    while element is not None and element not in seen:
+        if ELEMENT_DIGITS[element][0] == left_digit:
+            return False
+        seen.add(element)
+        element = ELEMENT_DECAYS[element][0]
+    return True
+
+
+def split_elements(number: str) -> list[str] | None:
+    """
+    Splits the number into independently evolving elements, if possible:
+
+        >>> split_elements('3113322113')
+        ['Bi']
+        >>> split_elements('311311222113111221131221')
+        ['Rh']
+        >>> split_elements('1321123')
+        ['Cl', 'U']
+        >>> split_elements('33') is None
+        True
+    """
+    # start index -> possible first element of the rest -> next element (None at the end)
+    suffixes: list[dict[str, str | None]] = [{} for _ in range(len(number) + 1)]
+    for start in reversed(range(len(number))):
+        for name, digits in ELEMENT_DIGITS.items():
+            if not number.startswith(digits, start):
+                continue
+            stop = start + len(digits)
+            if stop == len(number):
+                suffixes[start][name] = None
+            elif next_name := next(
+                (nn for nn in suffixes[stop] if splits(digits[-1], nn)),
+                None
+            ):
+                suffixes[start][name] = next_name
+
+    if not suffixes[0]:
+        return None
+
+    elements: list[str] = []
+    element: str | None = next(iter(suffixes[0]))
+    start = 0
+    while element is not None:
+        elements.append(element)
+        next_element = suffixes[start][element]
+        start += len(ELEMENT_DIGITS[element])
+        element = next_element
+    return elements
+
+
+def las_length(starting_number: str, iterations: int) -> int:
+    """
+    Length of the sequence after given number of iterations, computed by counting Conway's
+    elements instead of building the sequence. Numbers not splitting into elements are iterated
+    as strings until they do:
+
+        >>> las_length('1', 40), las_length('1', 50)
+        (82350, 1166642)
+        >>> las_length('3113322113', 40) == len(last(las_sequence('3113322113', 40)))
+        True
+        >>> las_length('44', 8)
+        28
+        >>> len(str(las_length('1', 5000)))
+        576
+    """
+    number = starting_number
+    for step in range(iterations):
+        if (elements := split_elements(number)) is not None:
+            return elements_length(Counter(elements), iterations - step)
+        number = las(number)
+    return len(number)
+
+
+def elements_length(elements: Counter[str], iterations: int) -> int:
+    for _ in range(iterations):
+        decayed: Counter[str] = Counter()
+        for element, element_count in elements.items():
+            for decayed_element in ELEMENT_DECAYS[element]:
+                decayed[decayed_element] += element_count
+        elements = decayed
+
+    return sum(len(ELEMENT_DIGITS[element]) * count for element, count in elements.items())
+
+
 def number_from_file(fn: str) -> str:
     return open(fn).readline().strip()
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[str, str]:
+def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
     starting_number = number_from_file(input_path)
     result_1 = part_1(starting_number)
-    result_2 = part_2(result_1, iterations=10)
+    result_2 = part_2(starting_number)
     return result_1, result_2
 
 
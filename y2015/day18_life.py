@@ -4,12 +4,12 @@ Day 18: Like a GIF For Your Yard
 https://adventofcode.com/2015/day/18
 """
 
-from collections import Counter
 from typing import Iterable, Self
 
 from tqdm import tqdm
 
-from common.rect import Rect
+from common.rect import HyperCuboid, Rect
+from common.stencil import Cells, life_rule, moore_kernel, Stencil
 from meta.aoc_tools import data_path
 
 
@@ -190,6 +190,8 @@ def part_2(grid: 'Grid', steps: int = 100) -> int:
 
 
 Pos = tuple[int, int]
+# lights on the edge have fewer neighbors: the missing ones always count as "off"
+LIFE = Stencil(moore_kernel(2), life_rule, border='fixed')
 
 
 class Grid:
@@ -206,9 +208,11 @@ class Grid:
 
         self.bounds = Rect.at_origin(width, height)
         self.lights_stuck_on = set(lights_stuck_on)
-        self.lights_on = set(lights_on) | self.lights_stuck_on
+        self.cells = Cells.from_positions(
+            set(lights_on) | self.lights_stuck_on,
+            bounds=HyperCuboid.at_origin((width, height)),
+        )
 
-        assert all(pos in self.bounds for pos in self.lights_on)
         assert all(pos in self.bounds for pos in self.lights_stuck_on)
 
     def __repr__(self) -> str:
@@ -218,7 +222,7 @@ class Grid:
 
     def __str__(self) -> str:
         return '\n'.join(
-            ''.join('#' if (x, y) in self.lights_on else '·' for x in self.bounds.range_x())
+            ''.join('#' if self.cells[x, y] else '·' for x in self.bounds.range_x())
             for y in self.bounds.range_y()
         )
 
@@ -231,25 +235,19 @@ class Grid:
         return self.bounds.height
 
     @property
-    def on_count(self):
-        return len(self.lights_on)
-
-    def neighbors(self, pos: Pos) -> Iterable[Pos]:
-        x, y = pos
-        return (
-            npos
-            for dx in (-1, 0, +1)
-            for dy in (-1, 0, +1)
-            if dx != 0 or dy != 0
-            if (npos := (x + dx, y + dy)) in self.bounds
-        )
+    def lights_on(self) -> set[Pos]:
+        # unpacking narrows the cells' N-dimensional positions to 2D
+        # pylint: disable=unnecessary-comprehension
+        return {(x, y) for x, y in self.cells.positions()}
+
+    @property
+    def on_count(self) -> int:
+        return self.cells.count()
 
     def step(self) -> None:
-        def rule(lives: bool, adjc: int) -> bool:
-            return adjc in (2, 3) if lives else adjc == 3
-        adjs = Counter(neighbor for pos in self.lights_on for neighbor in self.neighbors(pos))
-        self.lights_on = {pos for pos, count in adjs.items() if rule(pos in self.lights_on, count)}
-        self.lights_on.update(self.lights_stuck_on)
+        self.cells = LIFE.step(self.cells)
+        for pos in self.lights_stuck_on:
+            self.cells[pos] = 1
 
     @classmethod
     def from_file(cls, fn: str) -> Self:
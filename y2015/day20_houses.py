@@ -5,6 +5,7 @@ https://adventofcode.com/2015/day/20
 """
 
 import math
+from array import array
 from itertools import count
 from typing import Callable, Iterable
 
@@ -12,6 +13,14 @@ from tqdm import tqdm
 
 from meta.aoc_tools import data_path
 
+# numpy is optional: without it, the sieve adds presents in a pure python loop
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
 
 def part_1(target_gifts: int) -> int:
     """
@@ -53,7 +62,7 @@ def part_1(target_gifts: int) -> int:
         8
     """
 
-    house, received = first_house_to_receive(target_gifts, gifts)
+    house, received = sieve_first_house(target_gifts, gifts_per_elf=10)
     print(
         f"part 1: the first house to receive at least {target_gifts} gifts ({received}) "
         f"is house no. {house}"
@@ -75,7 +84,7 @@ def part_2(target_gifts: int) -> int:
         36
     """
 
-    house, received = first_house_to_receive(target_gifts, gifts2)
+    house, received = sieve_first_house(target_gifts, gifts_per_elf=11, max_houses=50)
     print(
         f"part 2: the first house to receive at least {target_gifts} gifts ({received}) "
         f"is house no. {house}"
@@ -143,6 +152,132 @@ def first_house_to_receive(
     assert False
 
 
+# houses sieved at once: blocks grow from min to max size, which bounds the memory used
+MIN_BLOCK_SIZE = 1 << 12
+MAX_BLOCK_SIZE = 1 << 20
+
+
+def sieve_first_house(
+    target_gifts: int,
+    gifts_per_elf: int,
+    max_houses: int | None = None,
+    use_numpy: bool = HAS_NUMPY,
+) -> tuple[int, int]:
+    """
+    Finds the first house to receive at least `target_gifts` presents by letting each elf deliver
+    to its houses in a block of houses at once (instead of summing divisors of each house).
+    Each elf delivers `gifts_per_elf` times its number, and visits at most `max_houses` houses:
+
+        >>> sieve_first_house(140, gifts_per_elf=10)
+        (8, 150)
+        >>> sieve_first_house(1000, gifts_per_elf=11, max_houses=50)
+        (36, 1001)
+        >>> sieve_first_house(70_000, gifts_per_elf=10, use_numpy=False)
+        (2160, 74400)
+        >>> first_house_to_receive(70_000, gifts)
+        (2160, 74400)
+    """
+
+    if use_numpy and not HAS_NUMPY:
+        raise ValueError("numpy is not available")
+
+    # elf no. N alone delivers enough presents to house no. N -> that house is the last to check
+    last_house = max(1, -(-target_gifts // gifts_per_elf))
+    max_gifts = 0
+    block_start, block_size = 1, MIN_BLOCK_SIZE
+
+    with tqdm(total=target_gifts, unit="gifts", delay=1.0) as progress:
+        while block_start <= last_house:
+            block_stop = min(block_start + block_size, last_house + 1)
+            sieve_block = _sieve_block_numpy if use_numpy else _sieve_block_python
+            house, block_max_gifts = sieve_block(
+                block_start, block_stop, target_gifts, gifts_per_elf, max_houses
+            )
+            if block_max_gifts > max_gifts:
+                progress.update(min(block_max_gifts, target_gifts) - max_gifts)
+                max_gifts = block_max_gifts
+            if house is not None:
+                return house, block_max_gifts
+
+            block_start = block_stop
+            block_size = min(2 * block_size, MAX_BLOCK_SIZE)
+
+    # unreachable
+    assert False
+
+
+def _block_elves(
+    block_start: int,
+    block_stop: int,
+    max_houses: int | None,
+) -> Iterable[tuple[int, int, int]]:
+    # yields (elf, first house offset, stop house offset) for each elf visiting houses in block
+    first_elf = 1 if max_houses is None else max(1, -(-block_start // max_houses))
+    for elf in range(first_elf, block_stop):
+        first_house = max(elf, -(-block_start // elf) * elf)
+        stop_house = block_stop if max_houses is None else min(block_stop, elf * max_houses + 1)
+        if first_house < stop_house:
+            yield elf, first_house - block_start, stop_house - block_start
+
+
+def _sieve_block_python(
+    block_start: int,
+    block_stop: int,
+    target_gifts: int,
+    gifts_per_elf: int,
+    max_houses: int | None,
+) -> tuple[int | None, int]:
+    # returns the first house in block reaching target (if any) with its gifts,
+    # or just max gifts received in the block
+    presents = array('Q', bytes(8 * (block_stop - block_start)))
+    for elf, first_offset, stop_offset in _block_elves(block_start, block_stop, max_houses):
+        elf_gifts = elf * gifts_per_elf
+        for offset in range(first_offset, stop_offset, elf):
+            presents[offset] += elf_gifts
+
+    for offset, house_gifts in enumerate(presents):
+        if house_gifts >= target_gifts:
+            return block_start + offset, house_gifts
+    return None, max(presents)
+
+
+def _sieve_block_numpy(
+    block_start: int,
+    block_stop: int,
+    target_gifts: int,
+    gifts_per_elf: int,
+    max_houses: int | None,
+) -> tuple[int | None, int]:
+    presents = np.zeros(block_stop - block_start, dtype=np.uint64)
+
+    # elves with small numbers visit many houses in block -> one slice per elf
+    split_elf = math.isqrt(block_stop) + 1
+    for elf, first_offset, stop_offset in _block_elves(block_start, block_stop, max_houses):
+        if elf >= split_elf:
+            break
+        presents[first_offset:stop_offset:elf] += elf * gifts_per_elf
+
+    # elves with large numbers visit few houses -> their n-th visits are added at once
+    # (n-th houses of different elves are distinct, so plain fancy indexing works)
+    if split_elf < block_stop:
+        elves = np.arange(split_elf, block_stop, dtype=np.uint64)
+        max_visit = (block_stop - 1) // split_elf
+        if max_houses is not None:
+            max_visit = min(max_visit, max_houses)
+        for visit in range(1, max_visit + 1):
+            # elves whose `visit`-th house falls into the block
+            first_ix = max(0, -(-block_start // visit) - split_elf)
+            stop_ix = -(-block_stop // visit) - split_elf
+            visiting = elves[first_ix:stop_ix]
+            presents[visiting * visit - block_start] += visiting * gifts_per_elf
+
+    reaching = np.flatnonzero(presents >= target_gifts)
+    if len(reaching):
+        offset = int(reaching[0])
+        return block_start + offset, int(presents[offset])
+    return None, int(presents.max())
+
+
 def target_gifts_from_file(fn: str) -> int:
     return int(open(fn).readline().strip())
 
@@ -4,17 +4,22 @@ Day 5: How About a Nice Game of Chess?
 https://adventofcode.com/2016/day/5
 """
 
+from contextlib import closing
 from functools import lru_cache
-from itertools import count
-from typing import Iterable
+from itertools import islice, tee
+from typing import Generator, Iterable
 
 from tqdm import tqdm
 
+from common.iteration import first
+from common.md5 import HexPrefix, mine
+# only used in doctests
+# pylint: disable=unused-import
 from common.md5 import md5
 from meta.aoc_tools import data_path
 
 
-def part_1(door_id: str) -> str:
+def part_1(door_id: str, hashes: Iterable[tuple[str, int]] | None = None) -> str:
     """
     You are faced with a security door designed by Easter Bunny engineers that seem to have acquired
     most of their security knowledge by watching hacking movies.
@@ -59,12 +64,14 @@ def part_1(door_id: str) -> str:
         '18f47a30'
     """
 
-    password = create_password(door_id)
+    if hashes is None:
+        hashes = door_hashes(door_id)
+    password = create_password(hashes)
     print(f"part 1: password v1 for door ID {door_id!r} is {password!r}")
     return password
 
 
-def part_2(door_id: str) -> str:
+def part_2(door_id: str, hashes: Iterable[tuple[str, int]] | None = None) -> str:
     """
     As the door slides open, you are presented with a second door that uses a slightly more inspired
     security mechanism. Clearly unimpressed by the last version (in what movie is the password
@@ -111,19 +118,20 @@ def part_2(door_id: str) -> str:
         '05ace8e3'
     """
 
-    password = create_password_v2(door_id)
+    if hashes is None:
+        hashes = door_hashes(door_id)
+    password = create_password_v2(hashes)
     print(f"part 2: password v2 for door ID {door_id!r} is {password!r}")
     return password
 
 
-def create_password(door_id: str, length: int = 8, strength: int = 5) -> str:
-    def password_digits() -> Iterable[str]:
-        index = -1
-        for _ in tqdm(range(length), desc="password v1", total=length, unit="digits"):
-            digit, index = next_digit(door_id, start_at=index + 1, strength=strength)
-            yield digit
-
-    return ''.join(password_digits())
+def create_password(
+    hashes: Iterable[tuple[str, int]],
+    length: int = 8,
+    strength: int = 5,
+) -> str:
+    password_hashes = tqdm(islice(hashes, length), desc="password v1", total=length, unit="digits")
+    return ''.join(hash_[strength] for hash_, _ in password_hashes)
 
 
 def next_digit(door_id: str, start_at: int = 0, strength: int = 5) -> tuple[str, int]:
@@ -131,19 +139,23 @@ def next_digit(door_id: str, start_at: int = 0, strength: int = 5) -> tuple[str,
     return hash_[strength], index
 
 
-def create_password_v2(door_id: str, length: int = 8, strength: int = 5) -> str:
+def create_password_v2(
+    hashes: Iterable[tuple[str, int]],
+    length: int = 8,
+    strength: int = 5,
+) -> str:
     assert 1 <= length <= 16
 
     digits_found: list[str] = ['_'] * length
-
-    index = -1
     remaining_count = length
+    hashes_it = iter(hashes)
 
     with tqdm(desc="password v2", total=length, unit="digits") as progress:
         while remaining_count > 0:
-            digit, pos, index = next_digit_v2(door_id, index + 1, length, strength)
-            if digits_found[pos] == '_':
-                digits_found[pos] = digit
+            hash_, _ = next(hashes_it)
+            pos = int(hash_[strength], 16)
+            if pos < length and digits_found[pos] == '_':
+                digits_found[pos] = hash_[strength + 1]
                 remaining_count -= 1
                 progress.update()
 
@@ -168,21 +180,34 @@ def next_digit_v2(
 @lru_cache()
 def next_hash(salt: str, start_at: int, prefix: str) -> tuple[str, int]:
     assert len(prefix) <= 16
-    return next(
-        (digest, index)
-        for index in count(start_at)
-        if (digest := md5(salt + str(index))).startswith(prefix)
-    )
+    index, digest = first(mine(salt, HexPrefix(prefix), start=start_at))
+    return digest.hex(), index
+
+
+def door_hashes(
+    door_id: str,
+    strength: int = 5,
+    jobs: int = 1,
+) -> Generator[tuple[str, int], None, None]:
+    # hashes starting with `strength` zeros (and their indexes), in index order
+    prefix = HexPrefix('0' * strength)
+    mined = mine(door_id, prefix, jobs=jobs, description="mining password hashes")
+    with closing(mined):
+        for index, digest in mined:
+            yield digest.hex(), index
 
 
 def door_id_from_file(fn: str) -> str:
     return open(fn).readline().strip()
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[str, str]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[str, str]:
     door_id = door_id_from_file(input_path)
-    result_1 = part_1(door_id)
-    result_2 = part_2(door_id)
+    # both passwords are made of the same hashes -> they are mined only once
+    with closing(door_hashes(door_id, jobs=jobs)) as hashes:
+        hashes_1, hashes_2 = tee(hashes)
+        result_1 = part_1(door_id, hashes_1)
+        result_2 = part_2(door_id, hashes_2)
     return result_1, result_2
 
 
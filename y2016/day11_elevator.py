@@ -7,7 +7,7 @@ https://adventofcode.com/2016/day/11
 from itertools import combinations
 from typing import Iterable, Self
 
-from common.graph import shortest_path
+from common.graph import bidirectional_search
 from common.text import abc_rot, parse_line
 from meta.aoc_tools import data_path
 
@@ -488,11 +488,19 @@ def following_states(state: State) -> Iterable[tuple[State, Move, int]]:
             pass
 
 
+def preceding_states(state: State) -> Iterable[tuple[State, Move, int]]:
+    # all moves are reversible: carrying the same items back leads to the preceding state
+    for prev_state, (direction, carried_items), cost in following_states(state):
+        yield prev_state, (-direction, carried_items), cost
+
+
 def search(initial_state: State) -> tuple[int, list[Move]]:
-    return shortest_path(
+    # both ends are known -> search from both of them at once
+    return bidirectional_search(
         start=initial_state,
         target=final_state(initial_state),
-        edges=following_states
+        edges=following_states,
+        reverse_edges=preceding_states,
     )
 
 
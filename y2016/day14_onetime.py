@@ -4,18 +4,20 @@ Day 14: One-Time Pad
 https://adventofcode.com/2016/day/14
 """
 
-from functools import lru_cache
-from itertools import count, islice
-from typing import Callable, Iterable
+import re
+from collections import defaultdict, deque
+from itertools import islice
+from typing import Iterable, Iterator, Self
 
 from tqdm import tqdm
 
-from common.iteration import last
-from common.md5 import md5 as plain_md5
+from common.iteration import first, last
+from common.md5 import md5 as plain_md5, mine
+from common.utils import some
 from meta.aoc_tools import data_path
 
 
-def part_1(salt: str, nth: int = 64) -> int:
+def part_1(salt: str, nth: int = 64, jobs: int = 1) -> int:
     """
     In order to communicate securely with Santa while you're on this mission, you've been using
     a one-time pad that you generate using a pre-agreed algorithm. Unfortunately, you've run out of
@@ -82,12 +84,13 @@ def part_1(salt: str, nth: int = 64) -> int:
         part 1: 64th key is generated at index 22728
         22728
     """
-    result, _ = generate_nth_key(salt, md5, nth)
+    with HashWindow(salt, jobs=jobs) as window:
+        result, _ = generate_nth_key(window, nth)
     print(f"part 1: {nth}th key is generated at index {result}")
     return result
 
 
-def part_2(salt: str, nth: int = 64) -> int:
+def part_2(salt: str, nth: int = 64, jobs: int = 1) -> int:
     """
     Of course, in order to make this process even more secure, you've also implemented key
     stretching.
@@ -139,12 +142,12 @@ def part_2(salt: str, nth: int = 64) -> int:
       - The second triple (`eee`, at index `10`) has a matching `eeeee` at index `89`, and so it is
         the first key:
 
-        >>> next_key('abc', md5x2017)  # doctest: +ELLIPSIS
+        >>> next_key('abc', stretch=STRETCH)  # doctest: +ELLIPSIS
         (10, '...eee...', 89, '...eeeee...')
 
       - Eventually, index `22551` produces the 64th key:
 
-        >>> next_key('abc', md5x2017, start=22551)  # doctest: +ELLIPSIS
+        >>> next_key('abc', stretch=STRETCH, start=22551)  # doctest: +ELLIPSIS
         (22551, '...fff', 22859, '...fffff...')
 
     Given the actual salt in your puzzle input and using `2016` extra MD5 calls of key stretching,
@@ -155,7 +158,8 @@ def part_2(salt: str, nth: int = 64) -> int:
         22551
     """
 
-    result, _ = generate_nth_key(salt, md5x2017, nth)
+    with HashWindow(salt, STRETCH, jobs=jobs) as window:
+        result, _ = generate_nth_key(window, nth)
     print(f"part 2: {nth}th key is generated at index {result}")
     return result
 
@@ -189,55 +193,133 @@ def find_repeating(string: str, length: int) -> tuple[int, str] | None:
         return None
 
 
-@lru_cache(maxsize=2048)
 def md5(salt: str, index: int) -> str:
     return plain_md5(salt + str(index))
 
 
-@lru_cache(maxsize=2048)
+# additional hashings of key stretching
+STRETCH = 2016
+
+
 def md5x2017(salt: str, index: int) -> str:
     val = salt + str(index)
-    for _ in range(2017):
+    for _ in range(STRETCH + 1):
         val = plain_md5(val)
     return val
 
 
-Hasher = Callable[[str, int], str]
+TRIPLE_RE = re.compile(r'(.)\1\1')
+QUINTUPLE_RE = re.compile(r'(.)\1{4}')
+
+# how far after a triple its quintuple is looked for
+LOOKAHEAD = 1000
+# indexes hashed at once (by a single worker when hashing in parallel)
+BLOCK_SIZE = 1000
 
 
-# pylint: disable=inconsistent-return-statements
-def next_key(salt: str, hasher: Hasher = md5, start: int = 0) -> tuple[int, str, int, str]:
-    for index in count(start):
-        digest = hasher(salt, index)
+def has_triple(digest: bytes) -> bool:
+    # every quintuple is also a triple, so hashes without a triple are never needed
+    return TRIPLE_RE.search(digest.hex()) is not None
 
-        triple = find_repeating(digest, 3)
-        if triple is None:
-            continue
 
-        expected_substring = triple[1][0] * 5
-        matching_quintuples = (
-            (qix, qdig)
-            for n in range(1, 1001)
-            if expected_substring in (qdig := hasher(salt, qix := index + n))
+class HashWindow:
+    """
+    Stream of hashes containing a triple, hashed ahead in blocks (in parallel with `jobs` > 1).
+    Hashes up to `LOOKAHEAD` indexes past the current one are kept in the window, indexed by the
+    characters of their quintuples. Closing the window (or leaving its `with` block) shuts down
+    the hashing processes:
+
+        >>> window = HashWindow('abc')
+        >>> index, digest = next(iter(window))
+        >>> index, digest
+        (18, '0034e0923cc38887a57bd7b1d4f953df')
+        >>> window.find_quintuple('8') is None
+        True
+        >>> index, digest = next(iter(window))
+        >>> index, digest[:8]
+        (39, '347dac6e')
+        >>> window.find_quintuple('e')
+        (816, '3aeeeee1367614f3061d165a5fe3cac3')
+        >>> window.close()
+    """
+
+    def __init__(
+        self,
+        salt: str,
+        stretch: int = 0,
+        start: int = 0,
+        jobs: int = 1,
+    ):
+        self.stretch = stretch
+        self.candidates = mine(
+            salt,
+            has_triple,
+            start=start,
+            stretch=stretch,
+            jobs=jobs,
+            chunk_size=BLOCK_SIZE,
+            description=f"hashing with {stretch} stretches",
         )
-        quintuple = next(matching_quintuples, None)
-        if quintuple:
-            return (index, digest) + quintuple
+        self.current_index = start - 1
+        # upcoming hashes containing a triple, in index order
+        self.upcoming: deque[tuple[int, str]] = deque()
+        # char -> upcoming hashes containing a quintuple of this char, in index order
+        self.quintuples: dict[str, deque[tuple[int, str]]] = defaultdict(deque)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.candidates.close()
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        while True:
+            self._fill()
+            self.current_index, digest = self.upcoming.popleft()
+            self._fill()
+            yield self.current_index, digest
+
+    def _fill(self) -> None:
+        # make sure the whole lookahead is hashed (one hash past it is fine)
+        while not self.upcoming or self.upcoming[-1][0] <= self.current_index + LOOKAHEAD:
+            index, raw_digest = next(self.candidates)
+            digest = raw_digest.hex()
+            self.upcoming.append((index, digest))
+            for char in set(match[1] for match in QUINTUPLE_RE.finditer(digest)):
+                self.quintuples[char].append((index, digest))
+
+    def find_quintuple(self, char: str) -> tuple[int, str] | None:
+        # first hash within lookahead from the current index containing quintuple of `char`
+        quintuples = self.quintuples[char]
+        while quintuples and quintuples[0][0] <= self.current_index:
+            quintuples.popleft()
+        if quintuples and quintuples[0][0] <= self.current_index + LOOKAHEAD:
+            return quintuples[0]
+        return None
+
+
+def find_keys(window: HashWindow) -> Iterator[tuple[int, str, int, str]]:
+    for index, digest in window:
+        triple_char = some(TRIPLE_RE.search(digest))[1]
+        if (quintuple := window.find_quintuple(triple_char)) is not None:
+            yield (index, digest) + quintuple
+
 
-    # unreachable
-    assert False
+def next_key(salt: str, stretch: int = 0, start: int = 0) -> tuple[int, str, int, str]:
+    with HashWindow(salt, stretch, start) as window:
+        return first(find_keys(window))
 
 
-def generate_keys(salt: str, hasher: Hasher) -> Iterable[tuple[int, str]]:
-    index = -1
-    while True:
-        index, key, _, _ = next_key(salt, hasher, index + 1)
-        yield index, key
+def generate_keys(window: HashWindow) -> Iterable[tuple[int, str]]:
+    return ((index, key) for index, key, _, _ in find_keys(window))
 
 
-def generate_nth_key(salt: str, hasher: Hasher, nth: int) -> tuple[int, str]:
-    keys = islice(generate_keys(salt, hasher), nth)
-    desc = f"generating keys with {hasher.__name__}"
+def generate_nth_key(window: HashWindow, nth: int) -> tuple[int, str]:
+    keys = islice(generate_keys(window), nth)
+    desc = f"generating keys with {window.stretch} stretches"
     return last(tqdm(keys, desc=desc, total=nth, unit=" keys", delay=1.0))
 
 
@@ -245,10 +327,10 @@ def salt_from_file(fn: str) -> str:
     return open(fn).readline().strip()
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     salt = salt_from_file(input_path)
-    result_1 = part_1(salt)
-    result_2 = part_2(salt)
+    result_1 = part_1(salt, jobs=jobs)
+    result_2 = part_2(salt, jobs=jobs)
     return result_1, result_2
 
 
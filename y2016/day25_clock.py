@@ -4,16 +4,16 @@ Day 25: Clock Signal
 https://adventofcode.com/2016/day/25
 """
 
+from functools import partial
 from itertools import count
 from typing import Iterator
 
-from tqdm import tqdm
-
+from common.parallel import first_hit
 from meta.aoc_tools import data_path
 from y2016 import assembunny
 
 
-def part_1(tape: assembunny.Tape):
+def part_1(tape: assembunny.Tape, jobs: int = 1):
     """
     You open the door and find yourself on the roof. The city sprawls away from you for miles and
     miles.
@@ -70,21 +70,25 @@ def part_1(tape: assembunny.Tape):
         2
     """
 
-    result = find_init_a(assembunny.optimized_tape(tape), 100)
+    result = find_init_a(assembunny.optimized_tape(tape), 100, jobs=jobs)
     print(f"part 1: initialize a={result}")
     return result
 
 
-# pylint: disable=inconsistent-return-statements
-def find_init_a(tape: assembunny.Tape, target_signal_length: int = 100) -> int:
-    for a in tqdm(count(1), desc="finding init a", unit=" runs", delay=0.5):
-        signal = assembunny.run_out(tape, a=a)
-        length = clock_length(signal, target_signal_length)
-        if length == target_signal_length:
-            return a
+def find_init_a(tape: assembunny.Tape, target_signal_length: int = 100, jobs: int = 1) -> int:
+    init_a, _ = first_hit(
+        partial(_clock_init_a, tape, target_signal_length),
+        count(1),
+        jobs=jobs,
+        chunk_size=8,
+        description="finding init a",
+    )
+    return init_a
+
 
-    # unreachable
-    assert False
+def _clock_init_a(tape: assembunny.Tape, target_signal_length: int, a: int) -> int | None:
+    signal = assembunny.run_out(tape, a=a)
+    return a if clock_length(signal, target_signal_length) == target_signal_length else None
 
 
 def clock_length(signal: Iterator[int], test_length: int) -> int:
@@ -103,9 +107,9 @@ def clock_length(signal: Iterator[int], test_length: int) -> int:
     return max_tick
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int]:
     tape = assembunny.Tape.from_file(input_path)
-    result_1 = part_1(tape)
+    result_1 = part_1(tape, jobs=jobs)
     return (result_1,)
 
 
@@ -11,6 +11,14 @@ from tqdm import tqdm
 from common.text import parse_line
 from meta.aoc_tools import data_path
 
+# numpy is optional: without it, the judge compares pairs one by one from `gen()`
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
 
 def part_1(init_a: int, init_b: int, tests_count: int = 40_000_000) -> int:
     r"""
@@ -81,7 +89,7 @@ def part_1(init_a: int, init_b: int, tests_count: int = 40_000_000) -> int:
         588
     """
 
-    matches = count_matches(*gen_pair(init_a, init_b), tests_count=tests_count)
+    matches = judge(init_a, init_b, tests_count)
     print(f"part 1: {matches} matches")
     return matches
 
@@ -162,7 +170,7 @@ def part_2(init_a: int, init_b: int, tests_count: int = 5_000_000) -> int:
         309
     """
 
-    matches = count_matches(*gen_pair(init_a, init_b, only_divisible=True), tests_count=tests_count)
+    matches = judge(init_a, init_b, tests_count, only_divisible=True)
     print(f"part 2: {matches} matches using divisibility")
     return matches
 
@@ -173,6 +181,9 @@ FACTOR_A = 16807
 FACTOR_B = 48271
 DIV_A = 4
 DIV_B = 8
+MODULUS = 0x7fffffff
+# small enough for the block arrays to stay in cache
+BLOCK_SIZE = 1 << 16
 
 
 def gen_pair(init_a: int, init_b, only_divisible: bool = False) -> tuple[Gen, Gen]:
@@ -185,7 +196,7 @@ def gen_pair(init_a: int, init_b, only_divisible: bool = False) -> tuple[Gen, Ge
 def gen(init_value: int, factor: int, divisible: int = None) -> Gen:
     value = init_value
     while True:
-        value = (value * factor) % 0x7fffffff
+        value = (value * factor) % MODULUS
         if not divisible or value % divisible == 0:
             yield value
 
@@ -201,6 +212,122 @@ def count_matches(gen_a: Gen, gen_b: Gen, tests_count: int) -> int:
     return matches
 
 
+def judge(
+    init_a: int,
+    init_b: int,
+    tests_count: int,
+    only_divisible: bool = False,
+    use_numpy: bool = HAS_NUMPY,
+) -> int:
+    """
+    Counts matching pairs, either one by one, or in blocks (with numpy):
+
+        >>> judge(65, 8921, tests_count=100_000, use_numpy=False)
+        3
+        >>> judge(65, 8921, tests_count=100_000)
+        3
+        >>> judge(65, 8921, tests_count=100_000, only_divisible=True, use_numpy=False)
+        7
+        >>> judge(65, 8921, tests_count=100_000, only_divisible=True)
+        7
+    """
+
+    if not use_numpy:
+        return count_matches(*gen_pair(init_a, init_b, only_divisible), tests_count=tests_count)
+
+    blocks_a = gen_blocks(init_a, FACTOR_A, DIV_A if only_divisible else None)
+    blocks_b = gen_blocks(init_b, FACTOR_B, DIV_B if only_divisible else None)
+    return sum(block_matches(blocks_a, blocks_b, tests_count))
+
+
+def factor_powers(factor: int, count: int) -> 'np.ndarray':
+    """
+    Jump-ahead multipliers `factor**1 .. factor**count` (mod `MODULUS`), built by doubling.
+    """
+
+    powers = np.empty(count, dtype=np.uint64)
+    powers[0] = factor
+    filled = 1
+    while filled < count:
+        step = min(filled, count - filled)
+        # products of two values < 2**31 fit into uint64
+        powers[filled:filled + step] = powers[:step] * powers[filled - 1] % MODULUS
+        filled += step
+    return powers
+
+
+def gen_blocks(
+    init_value: int,
+    factor: int,
+    divisible: int | None = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator['np.ndarray']:
+    """
+    Lowest 16 bits of the same values as `gen()` (all that the judge looks at), in blocks of up to
+    `block_size` values (filtered blocks are shorter). Each block is computed at once as
+    `last value * factor**k` for `k = 1 .. block_size`.
+    """
+
+    powers = factor_powers(factor, block_size)
+    products = np.empty_like(powers)
+    values = np.empty_like(powers)
+    value = init_value
+    # divisibility by powers of two up to 2**16 can be checked on the low bits alone
+    low_bits_divisible = (
+        divisible is not None and divisible & (divisible - 1) == 0 and divisible <= 1 << 16
+    )
+
+    while True:
+        np.multiply(powers, np.uint64(value), out=products)
+        # `MODULUS` is 2**31 - 1, so `x % MODULUS` can be computed by folding the high bits onto
+        # the low ones, twice for products < 2**62 (generator values are never 0 or `MODULUS`)
+        np.bitwise_and(products, MODULUS, out=values)
+        np.right_shift(products, 31, out=products)
+        values += products
+        np.right_shift(values, 31, out=products)
+        values &= MODULUS
+        values += products
+        value = int(values[-1])
+
+        if not divisible:
+            yield values.astype(np.uint16)
+        elif low_bits_divisible:
+            low_bits = values.astype(np.uint16)
+            yield np.compress(low_bits & (divisible - 1) == 0, low_bits)
+        else:
+            yield np.compress(values % divisible == 0, values).astype(np.uint16)
+
+
+def block_matches(
+    blocks_a: Iterator['np.ndarray'],
+    blocks_b: Iterator['np.ndarray'],
+    tests_count: int,
+) -> Iterator[int]:
+    """
+    Pairs values from two streams of low-bits blocks in order and yields the count of matches for
+    each compared block.
+    """
+
+    empty = np.empty(0, dtype=np.uint16)
+    buffer_a, buffer_b = empty, empty
+    remaining = tests_count
+
+    with tqdm(desc="counting matches", total=tests_count, unit_scale=True, delay=0.5) as progress:
+        while remaining > 0:
+            # both block streams are infinite
+            if buffer_a.size == 0:
+                buffer_a = next(blocks_a)  # pylint: disable=stop-iteration-return
+            if buffer_b.size == 0:
+                buffer_b = next(blocks_b)  # pylint: disable=stop-iteration-return
+
+            compared = min(len(buffer_a), len(buffer_b), remaining)
+            yield int(np.count_nonzero(buffer_a[:compared] == buffer_b[:compared]))
+
+            buffer_a, buffer_b = buffer_a[compared:], buffer_b[compared:]
+            remaining -= compared
+            progress.update(compared)
+
+
 def print_binary(values: Iterable[tuple[int, int]]) -> None:
     separator = "\n--------------------------------\n"
     print(separator.join(f"{a:032b}\n{b:032b}" for a, b in values))
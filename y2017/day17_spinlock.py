@@ -4,11 +4,13 @@ Day 17: Spinlock
 https://adventofcode.com/2017/day/17
 """
 
-from typing import Iterator
+from functools import partial
+from typing import Iterable, Iterator
 
 from tqdm import tqdm
 
 from common.iteration import last
+from common.parallel import parallel_map
 from common.utils import some
 from meta.aoc_tools import data_path
 
@@ -140,7 +142,52 @@ def spinlock(step_size: int, rounds: int) -> Iterator[SpinState]:
         yield head, buffer
 
 
-def spinlock_optimized(step_size: int, rounds: int) -> int:
+def spinlock_optimized(step_size: int, rounds: int, skip_ahead: bool = True) -> int:
+    """
+    Value after `0` once `rounds` values have been inserted, computed without the buffer:
+
+        >>> spinlock_optimized(step_size=3, rounds=9, skip_ahead=False)
+        9
+        >>> spinlock_optimized(step_size=3, rounds=9)
+        9
+        >>> spinlock_optimized(step_size=3, rounds=10**12)
+        910429504490
+
+    With `skip_ahead`, insertions that don't wrap around the end of the buffer are skipped in bulk.
+    They move the head by `step_size + 1` each and can't land right after `0`, so only wrapping
+    insertions need to be simulated.
+    """
+
+    if not skip_ahead:
+        return _spinlock_stepping(step_size, rounds)
+
+    if rounds < 1:
+        raise ValueError("at least one value must be inserted")
+
+    # first value is always inserted after 0, head is then never at 0 again
+    head, next_value, last_value_at_1 = 1, 2, 1
+
+    while next_value <= rounds:
+        # number of following insertions with `head + step_size < len(buffer)`
+        if step_size > 0:
+            skip = max(0, (next_value - head - 1) // step_size)
+        else:
+            skip = rounds - next_value + 1
+        skip = min(skip, rounds - next_value + 1)
+        head += skip * (step_size + 1)
+        next_value += skip
+
+        if next_value <= rounds:
+            # wrapping insertion
+            head = ((head + step_size) % next_value) + 1
+            if head == 1:
+                last_value_at_1 = next_value
+            next_value += 1
+
+    return last_value_at_1
+
+
+def _spinlock_stepping(step_size: int, rounds: int) -> int:
     head = 0
     last_value_at_1: int | None = None
 
@@ -153,6 +200,29 @@ def spinlock_optimized(step_size: int, rounds: int) -> int:
     return some(last_value_at_1)
 
 
+def spinlock_sweep(
+    step_sizes: Iterable[int],
+    rounds: int,
+    jobs: int = 1,
+) -> dict[int, int]:
+    """
+    Values after `0` for many step sizes at once, evaluated by a pool of `jobs` processes:
+
+        >>> spinlock_sweep([3, 301, 386], rounds=50_000_000)
+        {3: 1222153, 301: 33601318, 386: 46038988}
+    """
+
+    step_sizes = list(step_sizes)
+    evaluate = partial(_spinlock_for_step_size, rounds=rounds)
+    values = parallel_map(evaluate, step_sizes, jobs=jobs, chunk_size=1, description="sweeping")
+    return dict(zip(step_sizes, values))
+
+
+def _spinlock_for_step_size(step_size: int, rounds: int) -> int:
+    # module-level, so that it can be sent to worker processes
+    return spinlock_optimized(step_size, rounds)
+
+
 def print_spin(spin: SpinState, context: int = None) -> None:
     head, buffer = spin
     if context:
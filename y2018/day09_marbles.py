@@ -121,7 +121,8 @@ def part_2(players_count: int, last_marble: int) -> int:
 def game(players_count: int, last_marble: int, log: bool | int = False) -> int:
     player_scores = {p: 0 for p in range(players_count)}
 
-    marbles = Circle([0])
+    # array-backed circle keeps millions of marbles in a few flat arrays instead of Link objects
+    marbles = Circle([0], compact=True)
     current_player = 0
 
     if log:
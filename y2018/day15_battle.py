@@ -5,9 +5,12 @@ https://adventofcode.com/2018/day/15
 """
 
 from collections import Counter
+from functools import partial
 from itertools import count
 from typing import Iterable, Optional, Self
 
+from common.graph import DistanceField
+from common.parallel import first_passing
 from common.utils import ro, some
 from meta.aoc_tools import data_path
 
@@ -435,7 +438,7 @@ def part_1(battle: 'Battle') -> int:
     return some(battle.final_score())
 
 
-def part_2(battle: 'Battle') -> int:
+def part_2(battle: 'Battle', jobs: int = 1) -> int:
     """
     According to your calculations, the Elves are going to lose badly. Surely, you won't mess up the
     timeline too much if you give them just a little advanced technology, right?
@@ -570,7 +573,7 @@ def part_2(battle: 'Battle') -> int:
         1140
     """
 
-    elves_attack = lowest_elf_attack_without_losses(battle)
+    elves_attack = lowest_elf_attack_without_losses(battle, jobs=jobs)
     print(f"part 2: increasing the Elves' attack to {elves_attack} saves them all:")
     modified_battle = battle.with_attack('E', elves_attack)
     modified_battle.finish(print_map=False, result_padding=4)
@@ -578,7 +581,6 @@ def part_2(battle: 'Battle') -> int:
 
 
 Pos = tuple[int, int]
-Path = list[Pos]
 
 
 class Team:
@@ -661,6 +663,13 @@ class Battle:
         self.teams: dict[str, Team] = {team.code: team for team in teams}
         self.floors: set[Pos] = set(floors)
         self.units_by_pos: dict[Pos, Unit] = {unit.pos: unit for unit in units}
+        # floor neighbors of each square, numbered `y * width + x` (i.e. in reading order)
+        self.adjacent: list[list[int]] = [[] for _ in range(self.width * self.height)]
+        for pos in self.floors:
+            neighbors = self.neighbors(pos, include_units=True)
+            self.adjacent[self.square(pos)] = [self.square(npos) for npos in neighbors]
+        # shared by all units of a team until a unit moves or dies
+        self.distance_fields: dict[str, DistanceField] = {}
 
         self.round = 0
         self.full_rounds_completed = 0
@@ -745,13 +754,12 @@ class Battle:
             # already in range to an enemy, no need to move
             return None
 
-        path = self.path_to_closest_enemy(unit)
-        if not path:
+        target_pos = self.step_to_closest_enemy(unit)
+        if not target_pos:
             # no path to an enemy found
             return None
 
         # move!
-        target_pos = path[0]
         self.move_unit(unit, target_pos)
         return target_pos
 
@@ -783,32 +791,27 @@ class Battle:
             default=None
         )
 
-    def path_to_closest_enemy(self, unit: Unit) -> Optional[Path]:
-        # TODO: common.graph.shortest_path
-        path_to: dict[Pos, Path] = {unit.pos: []}
-        layer: list[Pos] = [unit.pos]
-        seen: set[Pos] = {unit.pos}
-
-        while layer:
-            next_layer: set[Pos] = set()
-            for pos in layer:
-                for npos in self.neighbors(pos, include_units=True):
-                    if npos in seen:
-                        continue
-                    seen.add(npos)
-                    if npos in self.units_by_pos:
-                        # unit found! return path to it if enemy
-                        target_unit = self.units_by_pos[npos]
-                        if target_unit.code != unit.code:
-                            return path_to[pos] + [npos]
-                    else:
-                        # floor only
-                        path_to[npos] = path_to[pos] + [npos]
-                        next_layer.add(npos)
-            layer = sorted(next_layer, key=ro)
-        else:
-            # no enemy found
+    def step_to_closest_enemy(self, unit: Unit) -> Optional[Pos]:
+        occupied = {self.square(pos) for pos in self.units_by_pos}
+        if unit.code not in self.distance_fields:
+            # free squares in range of any enemy
+            targets = {
+                neighbor
+                for pos, enemy in self.units_by_pos.items() if enemy.code != unit.code
+                for neighbor in self.adjacent[self.square(pos)] if neighbor not in occupied
+            }
+            self.distance_fields[unit.code] = DistanceField(targets, self.adjacent, occupied)
+
+        # occupied squares are never reached by the field, so they can't be chosen as the step
+        step = self.distance_fields[unit.code].best_step(self.adjacent[self.square(unit.pos)])
+        if step is None:
             return None
+        y, x = divmod(step, self.width)
+        return x, y
+
+    def square(self, pos: Pos) -> int:
+        x, y = pos
+        return y * self.width + x
 
     def move_unit(self, unit: Unit, target_pos: Pos):
         assert unit.is_alive()
@@ -819,6 +822,7 @@ class Battle:
         del self.units_by_pos[unit.pos]
         unit.pos = target_pos
         self.units_by_pos[unit.pos] = unit
+        self.distance_fields.clear()
 
     def attack_unit(self, attacker: Unit, target: Unit):
         assert attacker.is_alive()
@@ -833,6 +837,7 @@ class Battle:
     def kill_unit(self, unit: Unit) -> Optional[Team]:
         assert not unit.is_alive()
         del self.units_by_pos[unit.pos]
+        self.distance_fields.clear()
         self.teams_unit_count[unit.code] -= 1
         active_teams = [t for t in self.teams.values() if self.teams_unit_count[t.code] > 0]
         assert len(active_teams) >= 1
@@ -965,32 +970,29 @@ class Battle:
             print(padding + f"Outcome: {rounds} * {winning_hps} = {self.final_score()}")
 
 
-def lowest_elf_attack_without_losses(battle: Battle) -> int:
-    for attack_power in count(4):
-        modified_battle = battle.with_attack('E', attack_power)
-        initial_elves_count = modified_battle.teams_unit_count['E']
-        while True:
-            if modified_battle.teams_unit_count['E'] < initial_elves_count:
-                # an elf died -> this attack power is not enough
-                break
+def lowest_elf_attack_without_losses(battle: Battle, jobs: int = 1) -> int:
+    # each attack power is a separate battle, so they can be fought in parallel
+    elves_win = partial(_elves_win_without_losses, battle)
+    return first_passing(elves_win, count(4), jobs=jobs, chunk_size=1)
 
-            elif modified_battle.winning_team:
-                assert modified_battle.winning_team.code == 'E'
-                # elves won!
-                return attack_power
-
-            else:
-                # battle still on with all elves standing ...
-                modified_battle.do_round()
 
-    # unreachable
-    assert False
+def _elves_win_without_losses(battle: Battle, attack_power: int) -> bool:
+    modified_battle = battle.with_attack('E', attack_power)
+    initial_elves_count = modified_battle.teams_unit_count['E']
+    while not modified_battle.winning_team:
+        modified_battle.do_round()
+        if modified_battle.teams_unit_count['E'] < initial_elves_count:
+            # an elf died -> this attack power is not enough
+            return False
+    # elves won with all of them standing!
+    assert modified_battle.winning_team.code == 'E'
+    return True
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     battle = Battle.from_file(input_path)
     result_1 = part_1(battle)
-    result_2 = part_2(battle)
+    result_2 = part_2(battle, jobs=jobs)
     return result_1, result_2
 
 
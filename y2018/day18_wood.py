@@ -1,10 +1,8 @@
 from collections import Counter
-from itertools import count
-from typing import Iterable, Optional
+from typing import Iterable, Iterator
 
-from common.iteration import single_value
+from common.iteration import single_value, state_at
 from common.rect import Rect
-from common.utils import some
 
 Pos = tuple[int, int]
 Board = dict[Pos, str]
@@ -22,11 +20,6 @@ class State:
 
         self.minute = 0
 
-        self.hash_to_board: dict[int, Board] = {}
-        self.next_hash: dict[int, int] = {}
-        self.current_hash: int | None = None
-        self._capture_history()
-
     @classmethod
     def load(cls, fn: str):
         with open(fn) as file:
@@ -44,28 +37,12 @@ class State:
 
         return cls(board, Rect.at_origin(width, height))
 
-    def _capture_history(self):
-        previous_hash = self.current_hash
-        self.current_hash = hash(''.join(
-            self.board[(x, y)]
+    def _fingerprint(self, board: Board) -> int:
+        return hash(''.join(
+            board[(x, y)]
             for x in self.bounds.range_x()
             for y in self.bounds.range_y()
         ))
-        if previous_hash is not None:
-            self.next_hash[previous_hash] = self.current_hash
-        self.hash_to_board[self.current_hash] = self.board
-
-    def _detect_cycle(self) -> Optional[int]:
-        hash_ = self.current_hash
-        for step in count(1):
-            hash_ = self.next_hash.get(some(hash_))
-            if hash_ is None:
-                return None
-            elif hash_ == self.current_hash:
-                return step
-
-        # unreachable
-        assert False
 
     def current_score(self) -> int:
         """
@@ -86,11 +63,6 @@ class State:
     def step(self):
         self.minute += 1
 
-        if self.current_hash in self.next_hash:
-            self.current_hash = self.next_hash[self.current_hash]
-            self.board = self.hash_to_board[self.current_hash]
-            return True
-
         def new_acre(current_acre: str, neighbors: Iterable[str]) -> str:
             neighbors_count = Counter(neighbors)
 
@@ -131,27 +103,27 @@ class State:
             for y in self.bounds.range_y()
         }
 
-        self._capture_history()
-        return False
-
     def run(self, minutes: int, draw_each: int = 0, detect_cycles: bool = True):
+        if detect_cycles:
+            # only fingerprints of the boards are kept while looking for the cycle
+            self.board = state_at(self._boards(draw_each), minutes - self.minute, self._fingerprint)
+            self.minute = minutes
+            return self
+
         while self.minute < minutes:
-            cycling = self.step()
+            self.step()
             if draw_each > 0 and self.minute % draw_each == 0:
                 self.draw()
 
-            if detect_cycles and cycling:
-                cycle_length = self._detect_cycle()
-                assert cycle_length is not None
-                for _ in range((minutes - self.minute) % cycle_length):
-                    self.current_hash = self.next_hash[some(self.current_hash)]
-
-                self.board = self.hash_to_board[some(self.current_hash)]
-                self.minute = minutes
-                break
-
         return self
 
+    def _boards(self, draw_each: int = 0) -> Iterator[Board]:
+        while True:
+            yield self.board
+            self.step()
+            if draw_each > 0 and self.minute % draw_each == 0:
+                self.draw()
+
     def draw(self):
         print(f"{self.current_description()}:")
         for y in self.bounds.range_y():
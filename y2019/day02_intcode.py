@@ -4,10 +4,11 @@ Day 2: 1202 Program Alarm
 https://adventofcode.com/2019/day/2
 """
 
+from functools import partial
+from itertools import product
 from typing import Optional
 
-from tqdm import tqdm
-
+from common.parallel import first_hit
 from meta.aoc_tools import data_path
 from y2019.intcode import load_tape
 from y2019.intcode import Machine
@@ -130,7 +131,7 @@ def part_1(tape: Tape) -> int:
     return result
 
 
-def part_2(tape: Tape) -> int:
+def part_2(tape: Tape, jobs: int = 1) -> int:
     """
     "Good, the new computer seems to be working correctly! **Keep it nearby** during this mission -
     you'll probably use it again. Real Intcode computers support many more features than your new
@@ -179,7 +180,7 @@ def part_2(tape: Tape) -> int:
         96
     """
 
-    noun, verb = find_noun_verb(tape)
+    noun, verb = find_noun_verb(tape, jobs=jobs)
     result = noun * verb
 
     print(f"part 2: noun={noun}, verb={verb} -> {result}")
@@ -190,19 +191,34 @@ def adjusted_tape(tape: Tape, noun: int = 12, verb: int = 2) -> Tape:
     return tape[:1] + [noun, verb] + tape[3:]
 
 
-def find_noun_verb(tape: Tape, target_value: int = 19690720) -> Optional[tuple[int, int]]:
-    return next(
-        (noun, verb)
-        for noun in tqdm(range(100), delay=1.0)
-        for verb in range(100)
-        if Machine(adjusted_tape(tape, noun, verb)).run_through()[0] == target_value
-    )
+def find_noun_verb(
+    tape: Tape,
+    target_value: int = 19690720,
+    jobs: int = 1,
+) -> Optional[tuple[int, int]]:
+    try:
+        noun_verb, _ = first_hit(
+            partial(_output_if_target, tape, target_value),
+            product(range(100), range(100)),
+            jobs=jobs,
+            chunk_size=100,
+            description="finding noun and verb",
+        )
+    except ValueError:
+        return None
+
+    return noun_verb
+
+
+def _output_if_target(tape: Tape, target_value: int, noun_verb: tuple[int, int]) -> int | None:
+    output = Machine(adjusted_tape(tape, *noun_verb)).run_through()[0]
+    return output if output == target_value else None
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     tape = load_tape(input_path)
     result_1 = part_1(tape)
-    result_2 = part_2(tape)
+    result_2 = part_2(tape, jobs=jobs)
     return result_1, result_2
 
 
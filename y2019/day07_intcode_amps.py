@@ -9,6 +9,7 @@ from itertools import permutations
 
 from meta.aoc_tools import data_path
 from y2019.intcode import load_tape, Machine, Tape
+from y2019.intcode_network import Network
 
 
 def part_1(tape: Tape) -> int:
@@ -186,20 +187,23 @@ def max_thruster_signal(tape: Tape, phases_range: range = range(5)) -> int:
 
 
 def max_thruster_signal_feedback_loop(tape: Tape, phases_range: range = range(5, 10)) -> int:
-    amps = [Machine(tape) for _ in phases_range]
-
-    def run_loop(phases: list[int]) -> int:
-        amp_funcs = [
-            amp.as_function_scalar(init=[phase], restarting=False)
-            for amp, phase in zip(amps, phases)
-        ]
-
-        signal = 0
-        while True:
-            try:
-                signal = reduce((lambda sig, amp_func: amp_func(sig)), amp_funcs, signal)
-            except StopIteration:
-                return signal
+
+    def run_loop(phases: tuple[int, ...]) -> int:
+        thruster_signals: list[int] = []
+
+        def route(network: Network, address: int, packet: tuple[int, ...]) -> None:
+            if address == len(network) - 1:
+                # output of the last amp goes to thrusters ... and back to the first amp
+                thruster_signals.extend(packet)
+            network.send((address + 1) % len(network), packet)
+
+        network = Network((Machine(tape) for _ in phases), route)
+        for address, phase in enumerate(phases):
+            network.send(address, [phase])
+        network.send(0, [0])
+        network.run()
+
+        return thruster_signals[-1]
 
     return max(run_loop(phases) for phases in permutations(phases_range))
 
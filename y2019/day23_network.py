@@ -1,91 +1,79 @@
-from typing import Optional
-
-from y2019.intcode import IOState
-from y2019.intcode import load_tape
-from y2019.intcode import Machine
-from y2019.intcode import MachineIO
-
-
-class Packet:
-    def __init__(self, address: int, x: int, y: int):
-        self.address = address
-        self.x = x
-        self.y = y
-
-    def __repr__(self):
-        return f'{type(self).__name__}({self.address}, {self.x}, {self.y})'
-
-    def __str__(self):
-        return f"[{self.x}:{self.y} @ M{self.address:02}]"
-
-    def __iter__(self):
-        yield self.x
-        yield self.y
-
-
-def run_network() -> int:
-    tape = load_tape("data/23-program.txt")
-
-    def create_network_io(address: int, debug: bool = False) -> MachineIO:
-        machine = Machine(tape, name=f"M{address:02}", debug=debug)
-        io = machine.run_io()
-        # this is your address
-        io.write_single(address)
-        # and queue is empty
-        io.write_single(-1)
-        return io
-
-    network: list[MachineIO] = [create_network_io(address) for address in range(50)]
-    queue: list[Packet] = []
-    nat_packet: Optional[Packet] = None
-    nat_sent_history: list[Packet] = []
-
-    # initialize queue
-    for address, io in enumerate(network):
-        while io.state == IOState.OUTPUT:
-            packet_out = Packet(*io.read(3))
-            queue.append(packet_out)
-            print(f"M{address:02}:{len(queue):02} queued {packet_out}")
-
-    while True:
-        # process queue until it's empty
-        while queue:
-            packet = queue.pop()
-            address = packet.address
-
-            if address == 255:
-                nat_packet = packet
-                print(f"NAT:{len(queue):02} receiving {packet}")
-                continue
-
-            io = network[address]
-            assert io.state == IOState.INPUT
-            io.write(packet)
-            print(f"M{address:02}:{len(queue):02} receiving {packet}")
-
-            while io.state == IOState.OUTPUT:
-                packet_out = Packet(*io.read(3))
-                queue.append(packet_out)
-                print(f"M{address:02}:{len(queue):02} queued {packet_out}")
-
-        if nat_packet:
-            if nat_sent_history:
-                previous_nat_packet = nat_sent_history[-1]
-                if nat_packet.y == previous_nat_packet.y:
-                    print(
-                        f"NAT:{len(queue):02} repeating NAT packet Y detected: "
-                        f"now={nat_packet}, prev={previous_nat_packet}"
-                    )
-                    return nat_packet.y
-            nat_packet.address = 0
-            print(f"NAT:{len(queue):02} queue is empty, queueing {nat_packet} to M00")
-            queue.append(nat_packet)
-            nat_sent_history.append(nat_packet)
-            nat_packet = None
+"""
+Advent of Code 2019
+Day 23: Category Six
+https://adventofcode.com/2019/day/23
+"""
+
+from meta.aoc_tools import data_path
+from y2019.intcode import load_tape, Machine, Tape
+from y2019.intcode_network import Network
+
+
+NAT_ADDRESS = 255
+
+
+def part_1(tape: Tape, computers: int = 50) -> int:
+    nat = NAT(tape, computers)
+    nat.network.run()
+    result = nat.received[0][1]
+
+    print(f"part 1: Y value of the first packet sent to address {NAT_ADDRESS} is {result}")
+    return result
+
+
+def part_2(tape: Tape, computers: int = 50) -> int:
+    result = NAT(tape, computers).first_repeated_y()
+
+    print(f"part 2: first Y value delivered by the NAT twice in a row is {result}")
+    return result
+
+
+Packet = tuple[int, int]
+
+
+class NAT:
+    def __init__(self, tape: Tape, computers: int):
+        # every packet received by the NAT
+        self.received: list[Packet] = []
+
+        self.network = Network(
+            (Machine(tape, name=f"M{address:02}") for address in range(computers)),
+            route=self.route,
+            output_size=3,
+            # computer with an empty incoming queue receives -1 ... and is then parked
+            idle_input=-1,
+        )
+        # each computer first asks for its network address
+        for address in range(computers):
+            self.network.send(address, [address])
+
+    def route(self, network: Network, _: int, packet: tuple[int, ...]) -> None:
+        address, x, y = packet
+        if address == NAT_ADDRESS:
+            self.received.append((x, y))
         else:
-            print(f"NAT:{len(queue):02} queue is empty and there's no NAT packet available")
-            return -1
+            network.send(address, (x, y))
+
+    def first_repeated_y(self) -> int:
+        last_delivered_y: int | None = None
+
+        while True:
+            # run until the network is idle
+            self.network.run()
+            # then wake it up by delivering the last received packet to address 0
+            x, y = self.received[-1]
+            if y == last_delivered_y:
+                return y
+            self.network.send(0, (x, y))
+            last_delivered_y = y
+
+
+def main(input_path: str = data_path(__file__, 'program.txt')) -> tuple[int, int]:
+    tape = load_tape(input_path)
+    result_1 = part_1(tape)
+    result_2 = part_2(tape)
+    return result_1, result_2
 
 
 if __name__ == '__main__':
-    print(run_network())
+    main()
@@ -1,8 +1,12 @@
+from copy import copy
+from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Callable, Generator, Iterable, Optional, Self
 
 from tqdm import tqdm
 
+from y2019.intcode_predecoded import PredecodedRun
+
 Tape = list[int]
 
 class OperationCode(Enum):
@@ -91,16 +95,22 @@ class Machine:
         *,
         debug: bool = False,
         progress: bool = False,
+        fast: bool = True,
     ):
         self.tape = list(tape)
         self.memory: Tape = []
         self.rbase = 0
         self.head = -1
         self.tick = -1
+        # suspension state of the predecoded engine (needed for resuming forked machines)
+        self.awaiting_input = False
+        self.halted = False
 
         self.name = name
         self.debug = debug
         self.progress = progress
+        # predecoded engine is used unless per-step logging or progress is requested
+        self.fast = fast
 
     def log(self, message: Any = ""):
         if self.debug:
@@ -114,13 +124,68 @@ class Machine:
         self.rbase = 0
         self.head = 0
         self.tick = 0
+        self.awaiting_input = False
+        self.halted = False
+
+    def uses_predecoded(self) -> bool:
+        return self.fast and not self.debug and not self.progress
 
-    def run_coroutine(self) -> RunCoroutine:
+    def snapshot(self) -> 'Snapshot':
+        """
+        Captures the state of a machine suspended on input or output (or halted).
+        Only supported with the predecoded engine, which keeps the state consistent between steps.
+        """
+        self._check_suspended("snapshot")
+        return Snapshot(
+            memory=list(self.memory),
+            head=self.head,
+            rbase=self.rbase,
+            tick=self.tick,
+            awaiting_input=self.awaiting_input,
+            halted=self.halted,
+        )
+
+    def restore(self, snapshot: 'Snapshot') -> None:
+        # a coroutine already running on this machine must not be used afterwards
+        self.memory = list(snapshot.memory)
+        self.head = snapshot.head
+        self.rbase = snapshot.rbase
+        self.tick = snapshot.tick
+        self.awaiting_input = snapshot.awaiting_input
+        self.halted = snapshot.halted
+
+    def fork(self) -> Self:
+        """
+        Independent copy of this machine in its current state, sharing the (never written) tape.
+        Run it with `run_coroutine(resume=True)` to continue where the original is.
+        """
+        self._check_suspended("fork")
+        forked = copy(self)
+        forked.memory = list(self.memory)
+        return forked
+
+    def _check_suspended(self, action: str) -> None:
+        if not self.uses_predecoded():
+            raise ValueError(f"{action} is only supported by the predecoded engine")
+        if self.head < 0:
+            raise ValueError("machine is not running")
+
+    def run_coroutine(self, resume: bool = False) -> RunCoroutine:
         """
         yields None -> asks for input (int) to be sent in
         yields int -> output
+
+        With `resume`, continues from the current state (e.g. of a forked or restored machine)
+        instead of restarting. If the machine was suspended asking for input, it asks again.
         """
-        self._restart()
+        if resume and not self.uses_predecoded():
+            raise ValueError("resuming is only supported by the predecoded engine")
+        if not resume or self.head < 0:
+            self._restart()
+
+        if self.uses_predecoded():
+            yield from PredecodedRun(self).run()
+            return
 
         if self.progress:
             progress = tqdm(
@@ -165,8 +230,8 @@ class Machine:
         except StopIteration:
             return list(self.memory)
 
-    def run_io(self) -> 'MachineIO':
-        return MachineIO(self.run_coroutine())
+    def run_io(self, resume: bool = False) -> 'MachineIO':
+        return MachineIO(self.run_coroutine(resume), machine=self)
 
     def run_output_only(self) -> Iterable[int]:
         return self.run_io().read()
@@ -387,6 +452,18 @@ class Machine:
                 raise ValueError(f"Unsupported opcode {other}")
 
 
+@dataclass(frozen=True)
+class Snapshot:
+    # copy-on-write pages don't pay off here: copying a list of a few thousand ints is a single
+    # C-level memcpy, while paged memory would slow down every read in the predecoded loop
+    memory: Tape
+    head: int
+    rbase: int
+    tick: int
+    awaiting_input: bool
+    halted: bool
+
+
 def load_tape(fn) -> Tape:
     return [int(v) for line in open(fn) for v in line.strip().split(',') if v]
 
@@ -398,9 +475,37 @@ class IOState(Enum):
 
 
 class MachineIO:
-    def __init__(self, coroutine: RunCoroutine):
+    def __init__(
+        self,
+        coroutine: RunCoroutine,
+        machine: Machine = None,
+        *,
+        pending_output: int = None,
+    ):
         self.co = coroutine
-        self.last_signal, self._stop = self._send()
+        self.machine = machine
+        if pending_output is None:
+            self.last_signal, self._stop = self._send()
+        else:
+            # output already produced by the machine, but not read yet
+            # -> the coroutine is started only after it is read
+            self.last_signal, self._stop = pending_output, None
+
+    def fork(self) -> 'MachineIO':
+        """
+        Independent copy of this IO and its machine, including pending output (if any).
+        Reads and writes on the fork don't affect the original and vice versa.
+        """
+        if self.machine is None:
+            raise ValueError("only IO bound to a machine can be forked")
+
+        machine = self.machine.fork()
+        if self.can_read():
+            return type(self)(
+                machine.run_coroutine(resume=True), machine=machine, pending_output=self.last_signal
+            )
+        else:
+            return machine.run_io(resume=True)
 
     def _send(self, sent_value: int = None) -> tuple[Optional[int], Optional[StopIteration]]:
         try:
@@ -700,3 +805,129 @@ def test_io2():
 
     io.write([666, 777])
     assert list(io.read()) == [666, 666, 777]
+
+
+def test_predecoded_self_modifying():
+    tape = [
+        3, 15,           # in -> [15]
+        1, 15, 16, 16,   # [15] + [16] -> [16]  (rewritten to multiply below)
+        4, 16,           # out <- [16]
+        1101, 0, 2, 2,   # 0 + 2 -> [2]  (ADD -> MULTIPLY)
+        1105, 1, 0,      # goto [0]
+        0, 1
+    ]
+
+    for fast in (True, False):
+        f = Machine(tape, fast=fast).as_function_scalar()
+        assert f(5) == 6
+        assert f(3) == 18
+        assert f(2) == 36
+
+
+def test_predecoded_matches_stepping():
+    tape = [
+        109, 20,              # R + 20 -> R
+        21101, 3, 4, 5,       # 3 + 4 -> [R+5]
+        1007, 25, 10, 26,     # [25] < 10 -> [26]
+        1008, 25, 7, 27,      # [25] = 7 -> [27]
+        204, 6, 204, 7,       # out <- [R+6], out <- [R+7]
+        99,
+    ]
+
+    fast_machine, slow_machine = Machine(tape), Machine(tape, fast=False)
+    assert list(fast_machine.run_output_only()) == list(slow_machine.run_output_only()) == [1, 1]
+    assert fast_machine.memory == slow_machine.memory
+    assert fast_machine.head == slow_machine.head
+    assert fast_machine.rbase == slow_machine.rbase
+    assert fast_machine.tick == slow_machine.tick
+
+
+def test_fork_pending_input():
+    m = Machine(name="accumulator", tape=[
+        3, 20,           # in -> [20]
+        1, 20, 21, 21,   # [20] + [21] -> [21]
+        4, 21,           # out <- [21]
+        1105, 1, 0,      # goto [0]
+    ])
+
+    io = m.run_io()
+    io.write([10])
+    assert list(io.read()) == [10]
+
+    forked = io.fork()
+    io.write([1])
+    forked.write([100])
+    assert list(io.read()) == [11]
+    assert list(forked.read()) == [110]
+    assert forked.machine.tick == io.machine.tick
+
+
+def test_fork_pending_output():
+    m = Machine(name="counter", tape=[
+        101, 1, 20, 20,  # [20] + 1 -> [20]
+        4, 20,           # out <- [20]
+        1105, 1, 0,      # goto [0]
+    ])
+
+    io = m.run_io()
+    assert io.read_single() == 1
+    forked = io.fork()
+    assert io.read_single() == 2
+    assert io.read_single() == 3
+    assert forked.read_single() == 2
+    assert forked.read_single() == 3
+
+
+def test_fork_halted():
+    io = Machine([104, 7, 99]).run_io()
+    assert list(io.read()) == [7]
+    assert not io.has_more()
+    assert not io.fork().has_more()
+
+
+def test_snapshot_restore():
+    m = Machine(name="doubler", tape=[
+        3, 20,             # in -> [20]
+        1002, 20, 2, 20,   # [20] * 2 -> [20]
+        4, 20,             # out <- [20]
+        99
+    ])
+
+    io = m.run_io()
+    snapshot = m.snapshot()
+    io.write([5])
+    assert list(io.read()) == [10]
+
+    m.restore(snapshot)
+    io = m.run_io(resume=True)
+    io.write([21])
+    assert list(io.read()) == [42]
+
+
+def test_fork_bfs_branching():
+    # reads a direction (1 or 2) and outputs the total; halts when the total reaches 3
+    m = Machine(name="walker", tape=[
+        3, 30,              # in -> [30]
+        1, 30, 31, 31,      # [30] + [31] -> [31]
+        4, 31,              # out <- [31]
+        1007, 31, 3, 32,    # [31] < 3 -> [32]
+        1005, 32, 0,        # if [32]: goto [0]
+        99,
+    ])
+
+    totals: list[tuple[int, ...]] = []
+    layer = [((), m.run_io())]
+    while layer:
+        next_layer = []
+        for path, io in layer:
+            for step in (1, 2):
+                branch = io.fork()
+                branch.write([step])
+                assert len(list(branch.read())) == 1
+                if branch.has_more():
+                    next_layer.append((path + (step,), branch))
+                else:
+                    totals.append(path + (step,))
+        layer = next_layer
+
+    assert sorted(totals) == [(1, 1, 1), (1, 1, 2), (1, 2), (2, 1), (2, 2)]
@@ -0,0 +1,148 @@
+from collections import deque
+from typing import Callable, Iterable
+
+from y2019.intcode import Machine, RunCoroutine
+
+
+class Network:
+    """
+    Runs many machines as cooperative tasks, each with its own input queue.
+
+    A machine asking for input is fed from its queue. If the queue is empty, it is fed
+    `idle_input` (once per idle period, if set), and then parked until something is sent to it.
+    Parked machines are never polled. Outputs of each machine are grouped into packets of
+    `output_size` values and passed to `route(network, address, packet)`.
+
+    `run()` returns once the network is idle, i.e. every machine is either parked with an empty
+    queue or halted.
+    """
+
+    def __init__(
+        self,
+        machines: Iterable[Machine],
+        route: Callable[['Network', int, tuple[int, ...]], None],
+        output_size: int = 1,
+        idle_input: int = None,
+    ):
+        self.route = route
+        self.output_size = output_size
+        self.idle_input = idle_input
+
+        self.coroutines: list[RunCoroutine] = [machine.run_coroutine() for machine in machines]
+        self.queues: list[deque[int]] = [deque() for _ in self.coroutines]
+        self.halted: list[bool] = [False] * len(self.coroutines)
+
+        self._signals: list[int | None] = [None] * len(self.coroutines)
+        self._outputs: list[list[int]] = [[] for _ in self.coroutines]
+        self._idle_fed: list[bool] = [False] * len(self.coroutines)
+        self._parked: set[int] = set()
+        self._ready: deque[int] = deque(range(len(self.coroutines)))
+
+        for address, co in enumerate(self.coroutines):
+            try:
+                self._signals[address] = next(co)
+            except StopIteration:
+                self.halted[address] = True
+
+    def __len__(self) -> int:
+        return len(self.coroutines)
+
+    def send(self, address: int, values: Iterable[int]) -> None:
+        self.queues[address].extend(values)
+        if address in self._parked:
+            self._parked.remove(address)
+            self._ready.append(address)
+
+    def is_idle(self) -> bool:
+        return not self._ready
+
+    def run(self) -> None:
+        while self._ready:
+            address = self._ready.popleft()
+            if not self.halted[address]:
+                self._run_machine(address)
+
+    def _run_machine(self, address: int) -> None:
+        co, queue, output = self.coroutines[address], self.queues[address], self._outputs[address]
+        signal = self._signals[address]
+
+        try:
+            while True:
+                if signal is not None:
+                    output.append(signal)
+                    if len(output) == self.output_size:
+                        packet = tuple(output)
+                        output.clear()
+                        self.route(self, address, packet)
+                    signal = next(co)
+
+                elif queue:
+                    self._idle_fed[address] = False
+                    signal = co.send(queue.popleft())
+
+                elif self.idle_input is not None and not self._idle_fed[address]:
+                    self._idle_fed[address] = True
+                    signal = co.send(self.idle_input)
+
+                else:
+                    # waiting for input -> park until something is sent
+                    self._signals[address] = None
+                    self._parked.add(address)
+                    return
+
+        except StopIteration:
+            self.halted[address] = True
+
+
+def test_network_ring():
+    # each machine adds its own number (received first) to the value and passes it on
+    tape = [
+        3, 30,            # in -> [30]
+        3, 31,            # in -> [31]
+        1, 30, 31, 31,    # [30] + [31] -> [31]
+        4, 31,            # out <- [31]
+        1105, 1, 2,       # goto [2]
+    ]
+    outputs: list[int] = []
+
+    def route(network: Network, address: int, packet: tuple[int, ...]) -> None:
+        if address == len(network) - 1:
+            outputs.extend(packet)
+            if len(outputs) == 3:
+                return
+        network.send((address + 1) % len(network), packet)
+
+    network = Network([Machine(tape) for _ in range(4)], route)
+    for address in range(4):
+        network.send(address, [address + 1])
+    network.send(0, [0])
+    network.run()
+
+    assert network.is_idle()
+    assert outputs == [10, 20, 30]
+    assert not any(network.halted)
+
+
+def test_network_idle_input():
+    # forwards received values to machine 0; reads -1 when idle
+    tape = [
+        3, 30,              # in -> [30]
+        1008, 30, -1, 31,   # [30] = -1 -> [31]
+        1005, 31, 0,        # if [31]: goto [0]
+        104, 0,             # out <- 0
+        4, 30,              # out <- [30]
+        1105, 1, 0,         # goto [0]
+    ]
+    received: list[tuple[int, ...]] = []
+
+    def route(_network: Network, address: int, packet: tuple[int, ...]) -> None:
+        received.append((address,) + packet)
+
+    network = Network([Machine(tape) for _ in range(3)], route, output_size=2, idle_input=-1)
+    network.run()
+    assert network.is_idle()
+    assert not received
+
+    network.send(2, [7, 8])
+    network.run()
+    assert received == [(2, 0, 7), (2, 0, 8)]
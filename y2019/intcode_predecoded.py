@@ -0,0 +1,154 @@
+from typing import Generator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from y2019.intcode import Machine
+
+
+# predecoded instruction: (opcode, mode1, param1, mode2, param2, mode3, param3, next_head)
+Decoded = tuple[int, int, int, int, int, int, int, int]
+
+VALUE_MODE, RELATIVE_MODE = 1, 2
+
+ARGCOUNTS = {1: 3, 2: 3, 3: 1, 4: 1, 5: 2, 6: 2, 7: 3, 8: 3, 9: 1, 99: 0}
+# instructions writing into their last parameter
+WRITING_OPCODES = {1, 2, 3, 7, 8}
+# missing parameters are decoded as zeros
+PADDINGS = {argcount: [0] * (3 - argcount) for argcount in set(ARGCOUNTS.values())}
+
+
+class PredecodedRun:
+    """
+    Fast engine equivalent to the `Machine._step` loop:
+
+      - each instruction is decoded only once into a tuple stored in a dispatch table keyed
+        by its address,
+      - writes into memory cells covered by a decoded instruction invalidate it
+        (self-modifying code),
+      - `head`, `rbase` and `tick` are kept in locals and synced back to the machine only when
+        suspending on input/output or halting.
+    """
+
+    def __init__(self, machine: 'Machine'):
+        self.machine = machine
+        self.memory = machine.memory
+        self.decoded: dict[int, Decoded] = {}
+        self.code_cells: set[int] = set()
+
+    # the opcodes are dispatched inline, so that nothing but input/output leaves the loop
+    # pylint: disable=too-many-branches,too-many-statements,too-many-locals
+    def run(self) -> Generator[int | None, int, None]:
+        machine, memory = self.machine, self.memory
+        decoded, code_cells, read, write = self.decoded, self.code_cells, self.read, self.write
+
+        if machine.halted:
+            return
+
+        head, rbase, tick = machine.head, machine.rbase, machine.tick
+        if machine.awaiting_input:
+            # resumed at the pending INPUT instruction -> it will be counted again
+            tick -= 1
+
+        while True:
+            if (instr := decoded.get(head)) is None:
+                instr = self.decode(head)
+
+            op, m1, p1, m2, p2, m3, p3, next_head = instr
+            tick += 1
+
+            if op in (1, 2, 7, 8):
+                # binary operation: reads a1 and a2, writes into a3
+                a1 = p1 if m1 == 0 else rbase + p1
+                v1 = p1 if m1 == 1 else memory[a1] if 0 <= a1 < len(memory) else read(a1)
+                a2 = p2 if m2 == 0 else rbase + p2
+                v2 = p2 if m2 == 1 else memory[a2] if 0 <= a2 < len(memory) else read(a2)
+                if op == 1:
+                    result = v1 + v2
+                elif op == 2:
+                    result = v1 * v2
+                elif op == 7:
+                    result = int(v1 < v2)
+                else:
+                    result = int(v1 == v2)
+                a3 = p3 if m3 == 0 else rbase + p3
+                if 0 <= a3 < len(memory) and a3 not in code_cells:
+                    memory[a3] = result
+                else:
+                    write(a3, result)
+                head = next_head
+
+            elif op in (5, 6):
+                # conditional jump: tests a1, jumps to a2
+                a1 = p1 if m1 == 0 else rbase + p1
+                v1 = p1 if m1 == 1 else memory[a1] if 0 <= a1 < len(memory) else read(a1)
+                if bool(v1) == (op == 5):
+                    a2 = p2 if m2 == 0 else rbase + p2
+                    head = p2 if m2 == 1 else memory[a2] if 0 <= a2 < len(memory) else read(a2)
+                else:
+                    head = next_head
+
+            elif op == 9:
+                # relative base adjustment by a1
+                a1 = p1 if m1 == 0 else rbase + p1
+                rbase += p1 if m1 == 1 else memory[a1] if 0 <= a1 < len(memory) else read(a1)
+                head = next_head
+
+            elif op == 3:
+                machine.head, machine.rbase, machine.tick = head, rbase, tick
+                machine.awaiting_input = True
+                value = yield None
+                machine.awaiting_input = False
+                write(p1 if m1 == 0 else rbase + p1, value)
+                head = next_head
+
+            elif op == 4:
+                a1 = p1 if m1 == 0 else rbase + p1
+                v1 = p1 if m1 == 1 else memory[a1] if 0 <= a1 < len(memory) else read(a1)
+                head = next_head
+                machine.head, machine.rbase, machine.tick = head, rbase, tick
+                yield v1
+
+            else:  # op == 99
+                machine.head, machine.rbase, machine.tick = next_head, rbase, tick
+                machine.halted = True
+                return
+
+    def decode(self, address: int) -> Decoded:
+        code = self.read(address)
+        opcode = code % 100
+        if (argcount := ARGCOUNTS.get(opcode)) is None:
+            raise KeyError(f"OperationCode with code={opcode} not found")
+
+        memory, next_head = self.memory, address + 1 + argcount
+        if next_head > len(memory):
+            self._extend_memory_to(next_head - 1)
+        p1, p2, p3 = memory[address + 1:next_head] + PADDINGS[argcount]
+        m1, m2, m3 = code // 100 % 10, code // 1000 % 10, code // 10000 % 10
+        if m1 > RELATIVE_MODE or m2 > RELATIVE_MODE or m3 > RELATIVE_MODE:
+            raise ValueError(f"unsupported modes in {code}")
+        written_mode = m3 if argcount == 3 else m1
+        if opcode in WRITING_OPCODES and written_mode == VALUE_MODE:
+            raise ValueError(f"unsupported mode {written_mode} for writing in {code}")
+
+        instr = self.decoded[address] = (opcode, m1, p1, m2, p2, m3, p3, next_head)
+        self.code_cells.update(range(address, next_head))
+        return instr
+
+    def read(self, address: int) -> int:
+        if address >= len(self.memory):
+            self._extend_memory_to(address)
+        elif address < 0:
+            raise AssertionError(f"negative address {address}")
+        return self.memory[address]
+
+    def write(self, address: int, value: int) -> None:
+        if address >= len(self.memory):
+            self._extend_memory_to(address)
+        elif address < 0:
+            raise AssertionError(f"negative address {address}")
+        self.memory[address] = value
+        if address in self.code_cells:
+            for start in range(address - 3, address + 1):
+                self.decoded.pop(start, None)
+
+    def _extend_memory_to(self, address: int) -> None:
+        self.memory.extend([0] * (1 + address - len(self.memory)))
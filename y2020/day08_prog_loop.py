@@ -5,8 +5,10 @@ https://adventofcode.com/2020/day/8
 """
 
 from dataclasses import dataclass
+from functools import partial
 from typing import Generator, Iterable
 
+from common.parallel import first_hit
 from meta.aoc_tools import data_path
 
 
@@ -101,7 +103,7 @@ def part_1(program: 'Program') -> int:
     return final_acc
 
 
-def part_2(program: 'Program') -> int:
+def part_2(program: 'Program', jobs: int = 1) -> int:
     """
     After some careful analysis, you believe that *exactly one instruction is corrupted*.
 
@@ -173,7 +175,7 @@ def part_2(program: 'Program') -> int:
         8
     """
 
-    final_acc, flipped_ip = program.repair()
+    final_acc, flipped_ip = program.repair(jobs=jobs)
 
     print(
         f"part 2: after modifying instruction at ip={flipped_ip}, "
@@ -360,36 +362,49 @@ class Program:
         else:
             return False
 
-    def repair(self) -> tuple[int, int]:
+    def repair(self, jobs: int = 1) -> tuple[int, int]:
         """
         Tries to "repair" to program by finding a single instruction which when flipped
         (`jmp`->`nop` and vice versa) causes the program to terminate.
 
         Returns final accumulator value of the repaired program and index of the flipped
-        instruction.
+        instruction. Flips are tried in order, possibly by a pool of `jobs` processes.
 
         This also assumes the program is "broken" in the first place (has endless loop).
         """
 
-        for flip_ip in range(len(self)):
-            # duplicate self
-            program_adjusted = type(self)(self)
-            # adjust one instruction
-            flipped = program_adjusted.flip_instruction(flip_ip)
-            # and let's see if it had the intended effect
-            if flipped:
-                final_acc, terminates = program_adjusted.run_safe()
-                if terminates:
-                    return final_acc, flip_ip
+        try:
+            flip_ip, final_acc = first_hit(
+                partial(_final_acc_after_flip, self),
+                range(len(self)),
+                jobs=jobs,
+                chunk_size=64,
+                description="flipping instructions",
+            )
+        except ValueError as no_hit:
+            raise ValueError("program cannot be repaired") from no_hit
 
-        else:
-            raise ValueError("program cannot be repaired")
+        return final_acc, flip_ip
+
+
+def _final_acc_after_flip(program: Program, flip_ip: int) -> int | None:
+    # duplicate program
+    program_adjusted = Program(program)
+    # adjust one instruction
+    flipped = program_adjusted.flip_instruction(flip_ip)
+    # and let's see if it had the intended effect
+    if flipped:
+        final_acc, terminates = program_adjusted.run_safe()
+        if terminates:
+            return final_acc
+
+    return None
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     program = Program.from_file(input_path)
     result_1 = part_1(program)
-    result_2 = part_2(program)
+    result_2 = part_2(program, jobs=jobs)
     return result_1, result_2
 
 
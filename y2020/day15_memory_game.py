@@ -4,6 +4,7 @@ Day 15: Rambunctious Recitation
 https://adventofcode.com/2020/day/15
 """
 
+from array import array
 from itertools import count, islice
 from typing import Iterator
 
@@ -154,12 +155,48 @@ def memory_game_it(starting_numbers: list[int]) -> Iterator[int]:
         last_seen_on[num] = turn
 
 
-def memory_game(numbers: list[int], turns: int) -> int:
+def memory_game(numbers: list[int], turns: int, fast: bool = True) -> int:
+    """
+    Returns the number spoken on the given turn:
+
+        >>> memory_game([0, 3, 6], turns=10, fast=False)
+        0
+        >>> memory_game([0, 3, 6], turns=10)
+        0
+        >>> memory_game([0, 3, 6], turns=2)
+        3
+
+    The fast engine keeps last-seen turns in a preallocated array instead of a dict.
+    """
+
     assert turns > 0
+
+    if fast:
+        return memory_game_fast(numbers, turns)
+
     game = islice(memory_game_it(numbers), turns)
     return last(tqdm(game, unit=" turns", total=turns, unit_scale=True, delay=1.0))
 
 
+def memory_game_fast(numbers: list[int], turns: int) -> int:
+    if turns <= len(numbers):
+        return numbers[turns - 1]
+
+    # spoken numbers are always smaller than the turn count (or one of the starting numbers);
+    # turns are stored one-based, so zero means "not spoken yet"
+    last_seen_on = array('I', bytes(4 * max(turns, max(numbers) + 1)))
+    for turn, num in enumerate(numbers[:-1], start=1):
+        last_seen_on[num] = turn
+
+    num = numbers[-1]
+    for turn in range(len(numbers), turns):
+        seen_on = last_seen_on[num]
+        last_seen_on[num] = turn
+        num = turn - seen_on if seen_on else 0
+
+    return num
+
+
 def load_numbers(fn: str) -> list[int]:
     return [
         int(v)
@@ -4,12 +4,12 @@ Day 17: Conway Cubes
 https://adventofcode.com/2020/day/17
 """
 
-from collections import Counter
 from itertools import product
 from typing import Iterable
 
 from common.iteration import single_value
 from common.rect import HyperCuboid
+from common.stencil import Cells, life_rule, moore_kernel, Stencil
 from meta.aoc_tools import data_path
 
 
@@ -344,13 +344,6 @@ def part_2(initial_state: set['Pos'], cycles: int = 6) -> int:
     return result
 
 
-def life_rule(active: bool, active_neighbors_count: int) -> bool:
-    if active:
-        return active_neighbors_count in (2, 3)
-    else:
-        return active_neighbors_count == 3
-
-
 # position with arbitrary number of dimensions
 Pos = tuple[int, ...]
 
@@ -359,17 +352,12 @@ def simulate(state: set[Pos], cycles: int, print_progress: bool = False):
     if print_progress:
         print_state(state, 0)
 
+    conway = Stencil(moore_kernel(state_dimensions(state)), life_rule, border='infinite')
+    cells = Cells.from_positions(state)
+
     for cycle in range(cycles):
-        active_neighbors = Counter(
-            npos
-            for pos in state
-            for npos in neighbors(pos)
-        )
-        state = {
-            pos
-            for pos, ns in active_neighbors.items()
-            if life_rule(pos in state, ns)
-        }
+        cells = conway.step(cells)
+        state = set(cells.positions())
 
         if print_progress:
             print_state(state, cycle + 1)
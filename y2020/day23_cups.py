@@ -4,6 +4,7 @@ Day 23: Crab Cups
 https://adventofcode.com/2020/day/23
 """
 
+from array import array
 from itertools import chain
 from typing import Iterable
 
@@ -211,7 +212,11 @@ class Cups:
             range(len(self) + 1, count + 1)
         ))
 
-    def play(self, moves: int, print_progress: bool = False):
+    def play(self, moves: int, print_progress: bool = False, fast: bool = True):
+        # array-based engine is used unless per-move logging is requested
+        if fast and not print_progress:
+            return self._play_fast(moves)
+
         for move in tqdm(range(moves), unit=" moves", unit_scale=True, delay=1.0):
             # pick three
             picked_1 = self.next[self.current]
@@ -242,6 +247,15 @@ class Cups:
 
         return self
 
+    def _play_fast(self, moves: int):
+        successors = array('I', bytes(4 * (max(self.next) + 1)))
+        for label, next_label in self.next.items():
+            successors[label] = next_label
+
+        self.current = play_successors(successors, self.current, moves)
+        self.next = {label: successors[label] for label in self.next}
+        return self
+
     def _print_state(self, move: int, final: bool = False):
         if not final:
             print(f"-- move {move + 1} --")
@@ -282,6 +296,36 @@ class Cups:
         return f'{type(self).__name__}({list(self)!r})'
 
 
+def play_successors(successors: array, current: int, moves: int) -> int:
+    """
+    Plays the cups game on a successor table (`successors[label]` is the label of the next cup,
+    labels are `1..len(successors)-1`) in place. Returns the label of the current cup afterward.
+
+        >>> succ = array('I', [0, 5, 3, 4, 1, 2])  # 1 -> 5 -> 2 -> 3 -> 4 -> 1
+        >>> play_successors(succ, current=1, moves=1)
+        4
+        >>> list(succ)  # 1 -> 4 -> 5 -> 2 -> 3 -> 1
+        [0, 4, 3, 1, 5, 2]
+    """
+
+    max_label = len(successors) - 1
+
+    for _ in range(moves):
+        picked_1 = successors[current]
+        picked_2 = successors[picked_1]
+        picked_3 = successors[picked_2]
+
+        destination = current - 1 or max_label
+        while destination in (picked_1, picked_2, picked_3):
+            destination = destination - 1 or max_label
+
+        successors[current] = current = successors[picked_3]
+        successors[picked_3] = successors[destination]
+        successors[destination] = picked_1
+
+    return current
+
+
 def main(input_path: str = data_path(__file__)) -> tuple[str, int]:
     cups = Cups.from_file(input_path)
     result_1 = part_1(cups)
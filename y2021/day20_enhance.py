@@ -9,6 +9,7 @@ from typing import Iterable, Self
 from tqdm import tqdm
 
 from common.rect import Rect
+from common.stencil import binary_window_kernel, Cells, Stencil
 from meta.aoc_tools import data_path
 
 
@@ -262,28 +263,26 @@ class Algorithm:
     def enhance(self, image: Image, runs: int = 1) -> Image:
         assert runs >= 0
 
-        neighbors = {
-            (dx - 1, dy - 1): 1 << (8 - (3 * dy + dx))
-            for dy in range(3)
-            for dx in range(3)
-        }
-
-        def new_lit(img: Image, pos: Pos) -> bool:
-            x, y = pos
-            total = sum(
-                q
-                for (dx, dy), q in neighbors.items()
-                if img[x + dx, y + dy]
-            )
-            return self[total]
+        # each pixel of the 3x3 window is one bit of the index into the algorithm;
+        # infinite background gets enhanced as well (and can be flipping between dark and lit)
+        stencil = Stencil(
+            kernel=binary_window_kernel(3),
+            rule=lambda _, index: int(self[index]),
+            border='infinite',
+        )
+        cells = Cells.from_positions(
+            image.lit,
+            state=int(not image.inverted),
+            background=int(image.inverted),
+        )
 
         for _ in tqdm(range(runs), desc="enhancing", unit='runs', delay=1.0):
-            image = type(image)(
-                pixels=((pos, new_lit(image, pos)) for pos, lit in image.pixel_rows(context=1)),
-                others=self[511 if image.inverted else 0]
-            )
+            cells = stencil.step(cells)
 
-        return image
+        return type(image)(
+            pixels=(((x, y), bool(state)) for (x, y), state in cells.items()),
+            others=bool(cells.background),
+        )
 
 
 Input = tuple[Algorithm, Image]
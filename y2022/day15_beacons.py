@@ -7,9 +7,6 @@ https://adventofcode.com/2022/day/15
 import itertools
 from typing import Iterable
 
-from tqdm import tqdm
-
-from common.iteration import ilen
 from common.maths import sgn
 from common.rect import Rect
 from common.text import parse_line
@@ -152,7 +149,9 @@ def part_1(sensors: list['Sensor'], y: int = 2_000_000) -> int:
     In this example, in the row where `y=10`, there are **26** positions where a beacon cannot be
     present.
 
-        >>> ilen(excluded_positions(ss, y=10))
+        >>> excluded_ranges(ss, y=10)
+        [range(-2, 2), range(3, 25)]
+        >>> sum(len(xs) for xs in excluded_ranges(ss, y=10))
         26
 
     Consult the report from the sensors you just deployed.
@@ -163,7 +162,7 @@ def part_1(sensors: list['Sensor'], y: int = 2_000_000) -> int:
         26
     """
 
-    result = ilen(excluded_positions(sensors, y))
+    result = sum(len(xs) for xs in excluded_ranges(sensors, y))
 
     print(f"part 1: at y={y}, there are {result} positions that cannot contain a beacon")
     return result
@@ -233,6 +232,33 @@ class Sensor:
     def is_within_reach(self, pos) -> bool:
         return manhattan_distance(self.pos, pos) <= self.reach
 
+    def range_at_row(self, y: int) -> range:
+        """
+        X coordinates within reach at the given row (possibly empty):
+
+            >>> sensor = Sensor(pos=(8, 7), beacon_pos=(2, 10))
+            >>> sensor.range_at_row(7), sensor.range_at_row(10), sensor.range_at_row(-3)
+            (range(-1, 18), range(2, 15), range(0, 0))
+        """
+        x, sy = self.pos
+        half_width = self.reach - abs(y - sy)
+        if half_width < 0:
+            return range(0)
+        return range(x - half_width, x + half_width + 1)
+
+    def range_at_diagonal(self, c: int, rising: bool) -> range:
+        """
+        X coordinates within reach on the diagonal `x - y = c` (`rising`) or `x + y = c`.
+        In rotated coordinates `u = x + y`, `v = x - y`, the reach is a square `|u - su| <= reach`,
+        `|v - sv| <= reach`, so the diagonal crosses it along a single interval.
+        """
+        x, y = self.pos
+        across, along = (x - y, x + y) if rising else (x + y, x - y)
+        if abs(c - across) > self.reach:
+            return range(0)
+        # on the diagonal, `along` coordinate is `2x - c`
+        return range(-((self.reach - along - c) // 2), (along + self.reach + c) // 2 + 1)
+
     @classmethod
     def from_line(cls, line: str):
         # Sensor at x=2, y=18: closest beacon is at x=-2, y=15
@@ -241,26 +267,89 @@ class Sensor:
         return cls((int(s_x), int(s_y)), (int(b_x), int(b_y)))
 
 
-def excluded_positions(sensors: list[Sensor], y: int) -> Iterable[Pos]:
-    bounds = Rect.with_all(
-        pos
-        for sensor in sensors
-        for pos in sensor.bounds.corners()
-    )
-    assert y in bounds.range_y()
+def merged_ranges(ranges: Iterable[range]) -> list[range]:
+    """
+    Sorted disjoint ranges covering the same values, touching ranges are joined too:
 
-    relevant_beacons = {sensor.beacon_pos for sensor in sensors if sensor.beacon_pos[1] == y}
-    relevant_sensors = [sensor for sensor in sensors if y in sensor.bounds.range_y()]
+        >>> merged_ranges([range(5, 8), range(0, 3), range(2, 4), range(4, 5), range(10, 10)])
+        [range(0, 8)]
+        >>> merged_ranges([range(6, 9), range(0, 3), range(1, 2)])
+        [range(0, 3), range(6, 9)]
+    """
+
+    merged: list[range] = []
+    for current in sorted((r for r in ranges if r), key=lambda r: r.start):
+        if merged and current.start <= merged[-1].stop:
+            last = merged[-1]
+            merged[-1] = range(last.start, max(last.stop, current.stop))
+        else:
+            merged.append(current)
+    return merged
 
-    return (
-        pos
-        for x in tqdm(bounds.range_x(), delay=1.0, unit=' pos', unit_scale=True)
-        if (pos := (x, y)) not in relevant_beacons
-        if any(sensor.is_within_reach(pos) for sensor in relevant_sensors)
-    )
 
+def excluded_ranges(sensors: list[Sensor], y: int) -> list[range]:
+    # interval sweep: O(S log S) in the number of sensors, regardless of how wide the row is
+    covered = merged_ranges(sensor.range_at_row(y) for sensor in sensors)
+    beacons_x = sorted({b_x for b_x, b_y in (sensor.beacon_pos for sensor in sensors) if b_y == y})
+
+    def without_beacons(xs: range) -> Iterable[range]:
+        start = xs.start
+        for beacon_x in beacons_x:
+            if beacon_x in xs:
+                yield range(start, beacon_x)
+                start = beacon_x + 1
+        yield range(start, xs.stop)
+
+    return [piece for xs in covered for piece in without_beacons(xs) if piece]
+
+
+def find_beacon(sensors: list[Sensor], bounds: Rect, fast: bool = True) -> Pos:
+    if fast:
+        return _find_beacon_on_diagonals(sensors, bounds)
+    return _find_beacon_in_canyons(sensors, bounds)
+
+
+def _find_beacon_on_diagonals(sensors: list[Sensor], bounds: Rect) -> Pos:
+    """
+    An uncovered position with a covered neighbor lies on a diagonal running along the edge of
+    some sensor's reach, just outside of it. There are only four such diagonals per sensor, each
+    searched for a gap by merging the intervals the sensors cover on it.
+
+        >>> ss = sensors_from_file(data_path(__file__, 'example.txt'))
+        >>> _find_beacon_on_diagonals(ss, Rect.at_origin(20, 20))
+        (14, 11)
+        >>> _find_beacon_on_diagonals(ss, Rect.at_origin(10, 10))
+        Traceback (most recent call last):
+        ...
+        ValueError: no uncovered position within bounds
+    """
 
-def find_beacon(sensors: list[Sensor], bounds: Rect) -> Pos:
+    for sensor in sensors:
+        x, y = sensor.pos
+        for rising, across in ((True, x - y), (False, x + y)):
+            for c in (across - sensor.reach - 1, across + sensor.reach + 1):
+                # x coordinates of the diagonal within bounds
+                if rising:  # y = x - c
+                    xs_start, xs_stop = bounds.top_y + c, bounds.bottom_y + c + 1
+                else:  # y = c - x
+                    xs_start, xs_stop = c - bounds.bottom_y, c - bounds.top_y + 1
+                xs_start = max(xs_start, bounds.left_x)
+                xs_stop = min(xs_stop, bounds.right_x + 1)
+                if xs_start >= xs_stop:
+                    continue
+
+                gap_x = xs_start
+                for covered in merged_ranges(s.range_at_diagonal(c, rising) for s in sensors):
+                    if covered.start > gap_x:
+                        break
+                    gap_x = max(gap_x, covered.stop)
+                if gap_x < xs_stop:
+                    return gap_x, (gap_x - c if rising else c - gap_x)
+
+    raise ValueError('no uncovered position within bounds')
+
+
+def _find_beacon_in_canyons(sensors: list[Sensor], bounds: Rect) -> Pos:
     """
     Assumption: The beacon must be bordered by two pairs of scanned "diamonds", where each pair of
     these sensor-diamonds must be exactly one position apart:
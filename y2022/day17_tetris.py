@@ -5,12 +5,12 @@ https://adventofcode.com/2022/day/17
 """
 
 import itertools
-from collections import defaultdict
 from enum import IntEnum
 from typing import Iterable, Iterator, Literal, Self
 
 from tqdm import tqdm
 
+from common.iteration import metric_at
 from common.rect import Rect
 from common.utils import ro
 from meta.aoc_tools import data_path
@@ -578,6 +578,24 @@ class State:
     def height(self) -> int:
         return self.bounds.height if self.rocks else 0
 
+    def top_profile(self, max_depth: int = 64) -> tuple[int, ...]:
+        """
+        Depth of the topmost rock in each column, counted from the top of the tower.
+        Columns without a rock within `max_depth` rows get `max_depth`.
+
+            >>> State([(0, 0), (1, 0), (1, 1), (3, 2)], 0, 0, width=5).top_profile(max_depth=10)
+            (2, 1, 10, 0, 10)
+        """
+
+        top_y = self.height - 1
+        return tuple(
+            next(
+                (depth for depth in range(max_depth) if (x, top_y - depth) in self.rocks),
+                max_depth
+            )
+            for x in range(self.width)
+        )
+
     def can_place_shape_at(self, shape: Shape, pos: Pos) -> bool:
         x_left, y_bottom = pos
 
@@ -704,54 +722,151 @@ def play(moves: list[Move], room_width: int = 7, logging: LogLevel = '') -> Iter
                 print(state.str_with_shape(shape, (shape_x, shape_y)))
 
 
-def final_height(moves: list[Move], target_shapes_count: int) -> int:
-    states_by_last_indexes: defaultdict[tuple[int, int], list[State]] = defaultdict(list)
-    optimized_height_delta = 0
-
-    for state in tqdm(play(moves), delay=1.0, unit=' shapes'):
-        if state.shapes_count >= target_shapes_count:
-            return state.height + optimized_height_delta
-
-        # optimization by finding cycles (periods) in the states:
-        if optimized_height_delta:
-            # (optimization already done, we are just iterating through the remainder)
-            continue
-
-        # remember states by what shape and what move was used last time
-        last_shape_index = state.shapes_count % len(SHAPES)
-        last_move_index = state.moves_count % len(moves)
-        key = (last_shape_index, last_move_index)
-        similar_states = states_by_last_indexes[key]
-        similar_states.append(state)
-
-        # if there are now at least three similar states available ...
-        if len(similar_states) < 3:
-            continue
-
-        # ... we'll check if the height delta is the same among these three:
-        state_1, state_2, state_3 = similar_states[-3:]
-        height_per_cycle = state_3.height - state_2.height
-        if height_per_cycle != state_2.height - state_1.height:
-            continue
-        cycle_length = state_3.shapes_count - state_2.shapes_count
-        if cycle_length != state_2.shapes_count - state_1.shapes_count:
-            continue
-
-        # if so, we assume that we found a cycle and extrapolate the rest of simulation:
-        shapes_remaining = target_shapes_count - state.shapes_count
-        full_cycles_remaining = shapes_remaining // cycle_length
-        optimized_height_delta = full_cycles_remaining * height_per_cycle
-
-        # do we still need to run the remainder of the shapes?
-        if shapes_remaining % cycle_length == 0:
-            # no remainder -> we are done
-            return state.height + optimized_height_delta
-        else:
-            # otherwise adjust the target shapes count
-            target_shapes_count -= full_cycles_remaining * cycle_length
-            # ... and continue calculating the remainder
-
-    assert False
+class Chamber:
+    """
+    Bitboard engine: the tower is a `bytearray` with one row per byte, the leftmost column being
+    the highest bit. A falling shape is a single int with one byte per row, so jets are just bit
+    shifts and collisions are checked by one `&` against the same rows of the tower.
+
+        >>> ms = moves_from_file(data_path(__file__, 'example.txt'))
+        >>> chamber = Chamber(ms)
+        >>> [chamber.drop_shape() for _ in range(11)]
+        [1, 4, 6, 7, 9, 10, 13, 15, 17, 17, 18]
+        >>> print(chamber)  # doctest: +ELLIPSIS
+        |···####|
+        |····#··|
+        |····#··|
+        ...
+        |··####·|
+        +-------+
+        >>> chamber.fingerprint(top_rows_count=4)
+        (1, 16, b'\\x06\\x04\\x04\\x0f')
+    """
+
+    def __init__(self, moves: list[Move], width: int = 7):
+        assert width <= 8
+        self.width = width
+        self.rows = bytearray()
+        self.shapes_count = 0
+        self.moves_count = 0
+        self.jets_left = [move == Move.LEFT for move in moves]
+        # shapes as they appear: left edge two units away from the left wall
+        self.shapes = [
+            (sum(1 << (8 * y + width - 3 - x) for x, y in shape.rocks), shape.height)
+            for shape in SHAPES
+        ]
+        self.left_wall = sum(1 << (8 * y + width - 1) for y in range(4))
+        self.right_wall = sum(1 << (8 * y) for y in range(4))
+
+    @property
+    def height(self) -> int:
+        return len(self.rows)
+
+    def drop_shape(self) -> int:
+        """Lets the next shape fall until it comes to rest. Returns the new height of the tower."""
+
+        shape, shape_height = self.shapes[self.shapes_count % len(self.shapes)]
+        rows, jets_left = self.rows, self.jets_left
+        y = len(rows) + 3
+
+        while True:
+            # jet of gas pushes the shape
+            jet_left = jets_left[self.moves_count % len(jets_left)]
+            self.moves_count += 1
+            if jet_left:
+                pushed = shape << 1 if not shape & self.left_wall else shape
+            else:
+                pushed = shape >> 1 if not shape & self.right_wall else shape
+            if not pushed & int.from_bytes(rows[y:y + 4], 'little'):
+                shape = pushed
+
+            # fall one unit down
+            if y == 0 or shape & int.from_bytes(rows[y - 1:y + 3], 'little'):
+                break
+            y -= 1
+
+        # come to rest
+        if y + shape_height > len(rows):
+            rows.extend(bytes(y + shape_height - len(rows)))
+        rested = int.from_bytes(rows[y:y + shape_height], 'little') | shape
+        rows[y:y + shape_height] = rested.to_bytes(shape_height, 'little')
+        self.shapes_count += 1
+        return len(rows)
+
+    def drops(self) -> Iterator[Self]:
+        """Yields the chamber itself after each shape comes to rest."""
+        while True:
+            self.drop_shape()
+            yield self
+
+    def fingerprint(self, top_rows_count: int = 64) -> tuple[int, int, bytes]:
+        """Next shape, next jet and the top rows of the tower - all that determines the future."""
+        return (
+            self.shapes_count % len(self.shapes),
+            self.moves_count % len(self.jets_left),
+            bytes(self.rows[-top_rows_count:]),
+        )
+
+    def __str__(self) -> str:
+        lines = (
+            "|" + "".join(
+                "#" if row & (1 << (self.width - 1 - x)) else "·"
+                for x in range(self.width)
+            ) + "|"
+            for row in reversed(self.rows)
+        )
+        floor = "+" + "-" * self.width + "+"
+        return "\n".join(itertools.chain(lines, [floor]))
+
+
+def final_height(
+    moves: list[Move],
+    target_shapes_count: int,
+    fast: bool = True,
+    extrapolate: bool = True,
+) -> int:
+    """
+    Both engines can skip the repeating part of the simulation, but only the bitboard one (`fast`)
+    can reasonably simulate millions of shapes directly, e.g. to validate the extrapolation:
+
+        >>> ms = moves_from_file(data_path(__file__, 'example.txt'))
+        >>> final_height(ms, 100_000), final_height(ms, 100_000, extrapolate=False)
+        (151434, 151434)
+        >>> final_height(ms, 2022, fast=False)
+        3068
+    """
+
+    if fast:
+        chamber = Chamber(moves)
+        if not extrapolate:
+            for _ in tqdm(range(target_shapes_count), delay=1.0, unit=' shapes'):
+                chamber.drop_shape()
+            return chamber.height
+
+        return metric_at(
+            chamber.drops(),
+            step=target_shapes_count - 1,  # first state is after one shape
+            key=Chamber.fingerprint,
+            metric=lambda chamber_: chamber_.height,
+        )
+
+    # tower grows by the same height each cycle, once the falling shape, the jet of gas and the
+    # surface of the tower all repeat
+    def state_key(state: State) -> tuple[int, int, tuple[int, ...]]:
+        shape_index = state.shapes_count % len(SHAPES)
+        move_index = state.moves_count % len(moves)
+        return shape_index, move_index, state.top_profile()
+
+    states = tqdm(play(moves), delay=1.0, unit=' shapes')
+    if not extrapolate:
+        return next(itertools.islice(states, target_shapes_count - 1, None)).height
+
+    return metric_at(
+        states,
+        step=target_shapes_count - 1,
+        key=state_key,
+        metric=lambda state: state.height,
+    )
 
 
 def moves_from_file(fn: str) -> list[Move]:
@@ -11,13 +11,12 @@ from dataclasses import dataclass
 from functools import cached_property
 from typing import Iterable, Self
 
-from tqdm import tqdm
-
+from common.parallel import parallel_map
 from common.text import line_groups, parse_line
 from meta.aoc_tools import data_path
 
 
-def part_1(blueprints: list['Blueprint'], minutes: int = 24) -> int:
+def part_1(blueprints: list['Blueprint'], minutes: int = 24, jobs: int = 1) -> int:
     r"""
     Your scans show that the lava did indeed form obsidian!
 
@@ -119,16 +118,25 @@ def part_1(blueprints: list['Blueprint'], minutes: int = 24) -> int:
         33
     """
 
-    result = sum(
-        blueprint.quality_level(minutes)
-        for blueprint in tqdm(blueprints, delay=1.0, unit=" blueprints", desc="part 1")
+    geodes = parallel_map(
+        functools.partial(_best_by_geodes, minutes=minutes),
+        blueprints,
+        jobs=jobs,
+        chunk_size=1,
+        description="part 1",
     )
+    result = sum(blueprint.number * best for blueprint, best in zip(blueprints, geodes))
 
     print(f"part 1: in {minutes} minutes, sum of blueprint quality levels is {result}")
     return result
 
 
-def part_2(blueprints: list['Blueprint'], minutes: int = 32, max_blueprints: int = 3) -> int:
+def part_2(
+    blueprints: list['Blueprint'],
+    minutes: int = 32,
+    max_blueprints: int = 3,
+    jobs: int = 1,
+) -> int:
     """
     While you were choosing the best blueprint, the elephants found some food on their own, so
     you're not in as much of a hurry; you figure you probably have **32 minutes** before the wind
@@ -154,8 +162,13 @@ def part_2(blueprints: list['Blueprint'], minutes: int = 32, max_blueprints: int
 
     remaining_blueprints = blueprints[:max_blueprints]
     result = math.prod(
-        blueprint.best_by_geodes(minutes)
-        for blueprint in tqdm(remaining_blueprints, delay=1.0, unit=" blueprints", desc="part 2")
+        parallel_map(
+            functools.partial(_best_by_geodes, minutes=minutes),
+            remaining_blueprints,
+            jobs=jobs,
+            chunk_size=1,
+            description="part 2",
+        )
     )
 
     print(
@@ -392,7 +405,111 @@ class Blueprint:
             yield self.create_nothing(state)
 
     @functools.lru_cache()
-    def best_by_geodes(self, minutes: int) -> int:
+    def best_by_geodes(self, minutes: int, fast: bool = True) -> int:
+        if fast:
+            return self._best_by_geodes_branching(minutes)
+        return self._best_by_geodes_layered(minutes)
+
+    def _best_by_geodes_branching(self, minutes: int) -> int:
+        # DFS branch-and-bound: each branch jumps straight to the minute when its next robot is
+        # built; geodes are credited for all remaining minutes once a geode robot is built
+        max_ore, max_clay, max_obsid = self.max_ore_cost, self.max_clay_cost, self.max_obsid_cost
+        geode_ore, geode_obsid = self.geode_robot_ore_cost, self.geode_robot_obsid_cost
+        obsid_ore, obsid_clay = self.obsid_robot_ore_cost, self.obsid_robot_clay_cost
+        clay_ore, ore_ore = self.clay_robot_ore_cost, self.ore_robot_ore_cost
+        best = 0
+
+        def upper_bound(minutes_left: int, stock_obsid: int, robots_obsid: int) -> int:
+            # optimistic: ore and clay are free, a new obsidian robot arrives every minute,
+            # and a geode robot is built whenever there is enough obsidian for it
+            bound = 0
+            for left in range(minutes_left - 1, 0, -1):
+                if stock_obsid >= geode_obsid:
+                    stock_obsid -= geode_obsid
+                    bound += left
+                stock_obsid += robots_obsid
+                robots_obsid += 1
+            return bound
+
+        def wait_for(cost: int, stock: int, robots: int) -> int:
+            # minutes until `cost` can be paid (`robots` must be non-zero unless already affordable)
+            return 0 if stock >= cost else -((stock - cost) // robots)
+
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        def branch(
+            minutes_left: int,
+            stock_ore: int, stock_clay: int, stock_obsid: int,
+            robots_ore: int, robots_clay: int, robots_obsid: int,
+            geodes: int,
+        ) -> None:
+            nonlocal best
+            best = max(best, geodes)
+            if geodes + upper_bound(minutes_left, stock_obsid, robots_obsid) <= best:
+                return
+
+            def after(wait: int) -> tuple[int, int, int, int]:
+                # minutes left and stocks once the robot started after `wait` minutes is built
+                elapsed = wait + 1
+                return (
+                    minutes_left - elapsed,
+                    stock_ore + robots_ore * elapsed,
+                    stock_clay + robots_clay * elapsed,
+                    stock_obsid + robots_obsid * elapsed,
+                )
+
+            # geode robot
+            if robots_obsid:
+                wait = max(
+                    wait_for(geode_ore, stock_ore, robots_ore),
+                    wait_for(geode_obsid, stock_obsid, robots_obsid),
+                )
+                left, ore, clay, obsid = after(wait)
+                if left > 0:
+                    branch(
+                        left, ore - geode_ore, clay, obsid - geode_obsid,
+                        robots_ore, robots_clay, robots_obsid,
+                        geodes + left,
+                    )
+
+            # obsidian robot (never more than can be spent in a minute)
+            if robots_clay and robots_obsid < max_obsid:
+                wait = max(
+                    wait_for(obsid_ore, stock_ore, robots_ore),
+                    wait_for(obsid_clay, stock_clay, robots_clay),
+                )
+                left, ore, clay, obsid = after(wait)
+                if left > 2:
+                    branch(
+                        left, ore - obsid_ore, clay - obsid_clay, obsid,
+                        robots_ore, robots_clay, robots_obsid + 1,
+                        geodes,
+                    )
+
+            # clay robot
+            if robots_clay < max_clay:
+                left, ore, clay, obsid = after(wait_for(clay_ore, stock_ore, robots_ore))
+                if left > 4:
+                    branch(
+                        left, ore - clay_ore, clay, obsid,
+                        robots_ore, robots_clay + 1, robots_obsid,
+                        geodes,
+                    )
+
+            # ore robot
+            if robots_ore < max_ore:
+                left, ore, clay, obsid = after(wait_for(ore_ore, stock_ore, robots_ore))
+                if left > 2:
+                    branch(
+                        left, ore - ore_ore, clay, obsid,
+                        robots_ore + 1, robots_clay, robots_obsid,
+                        geodes,
+                    )
+
+        branch(minutes, 0, 0, 0, 1, 0, 0, 0)
+        return best
+
+    def _best_by_geodes_layered(self, minutes: int) -> int:
+        # BFS through all distinct states, minute by minute
         layer = {State(minutes_remaining=minutes)}
         visited: set[State] = set()
 
@@ -413,6 +530,11 @@ class Blueprint:
         return self.number * self.best_by_geodes(minutes)
 
 
+def _best_by_geodes(blueprint: Blueprint, minutes: int) -> int:
+    # module-level so that it can be sent to worker processes
+    return blueprint.best_by_geodes(minutes)
+
+
 def blueprints_from_file(fn: str) -> list[Blueprint]:
     return list(blueprints_from_lines(open(fn)))
 
@@ -426,10 +548,10 @@ def blueprints_from_lines(lines: Iterable[str]) -> Iterable[Blueprint]:
     return (Blueprint.from_line(line.strip()) for line in lines)
 
 
-def main(input_path: str = data_path(__file__)) -> tuple[int, int]:
+def main(input_path: str = data_path(__file__), jobs: int = 1) -> tuple[int, int]:
     blueprints = blueprints_from_file(input_path)
-    result_1 = part_1(blueprints)
-    result_2 = part_2(blueprints)
+    result_1 = part_1(blueprints, jobs=jobs)
+    result_2 = part_2(blueprints, jobs=jobs)
     return result_1, result_2
 
 
@@ -8,7 +8,7 @@ from enum import Enum
 from functools import lru_cache
 from typing import Iterable, Self
 
-from common.graph import shortest_path
+from common.graph import a_star, manhattan_distance
 from common.iteration import dgroupby_pairs
 from common.maths import mod1
 from common.rect import Rect
@@ -412,10 +412,12 @@ class Map:
                 if npos not in blizzards
             )
 
-        _, path = shortest_path(
+        _, path = a_star(
             start=(start, minute_offset),
             target=lambda pos_minute: pos_minute[0] == target,
             edges=neighbors,
+            # every minute moves at most one step closer
+            heuristic=lambda pos_minute: manhattan_distance(pos_minute[0], target),
             description=description,
         )
         return path
@@ -4,12 +4,13 @@ Day 14: Parabolic Reflector Dish
 https://adventofcode.com/2023/day/14
 """
 
+from functools import lru_cache
 from typing import Iterable, Self
 
 from common.file import relative_path
 from common.heading import Heading
-from common.iteration import detect_cycle, dgroupby_pairs_set
-from common.rect import Rect
+from common.grid import DenseGrid
+from common.iteration import iterate, state_at
 
 
 def part_1(map_: 'Map') -> int:
@@ -184,49 +185,24 @@ Pos = tuple[int, int]
 SPIN_CYCLE_HEADINGS = [Heading.NORTH, Heading.WEST, Heading.SOUTH, Heading.EAST]
 
 
+# slices of grid cells along which rocks roll, ordered from the edge they roll towards
+Lanes = dict[Heading, list[slice]]
+
+
 class Map:
-    def __init__(self, rocks: Iterable[Pos], walls: Iterable[Pos]):
-        self.rocks = set(rocks)
-        self.walls = set(walls)
-        self.bounds = Rect.with_all(self.rocks | self.walls)
+    def __init__(self, grid: DenseGrid, lanes: Lanes | None = None):
+        # '.' = empty, 'O' = rounded rock, '#' = cube-shaped rock
+        self.grid = grid
+        # lanes depend only on the shape of the grid -> shared by all tilted maps
+        self.lanes = lanes if lanes is not None else rolling_lanes(grid)
 
     def tilted(self, heading: Heading) -> Self:
-        def tilt_key(pos: Pos):
-            x, y = pos
-            match heading:
-                case Heading.NORTH:
-                    # y ASC
-                    return y, x
-                case Heading.SOUTH:
-                    # y DESC
-                    return -y, x
-                case Heading.WEST:
-                    # x ASC
-                    return x, y
-                case Heading.EAST:
-                    # x DESC
-                    return -x, y
-                case _:
-                    raise ValueError(heading)
+        grid = self.grid.copy()
+        cells = grid.cells
+        for lane in self.lanes[heading]:
+            cells[lane] = rolled(bytes(cells[lane]))
 
-        def tilt_positions(init_pos: Pos) -> Iterable[Pos]:
-            pos = init_pos
-            while True:
-                yield pos
-                pos = heading.move(pos)
-
-        new_rocks: set[Pos] = set()
-        for rock in sorted(self.rocks, key=tilt_key):
-            new_pos = next(
-                heading.move(pos, -1)
-                for pos in tilt_positions(rock)
-                if pos in self.walls
-                or pos in new_rocks
-                or pos not in self.bounds
-            )
-            new_rocks.add(new_pos)
-
-        return type(self)(rocks=new_rocks, walls=self.walls)
+        return type(self)(grid, self.lanes)
 
     def spun(self) -> Self:
         map_ = self
@@ -239,57 +215,42 @@ class Map:
             x, y = pos
             match heading:
                 case Heading.NORTH:
-                    return self.bounds.height - y
+                    return self.grid.height - y
                 case Heading.SOUTH:
                     return y + 1
                 case Heading.WEST:
-                    return self.bounds.width - x
+                    return self.grid.width - x
                 case Heading.EAST:
                     return x + 1
                 case _:
                     raise ValueError(heading)
 
-        return sum(single_load(rock) for rock in self.rocks)
+        return sum(single_load(rock) for rock in self.grid.find_all('O'))
 
     def __str__(self) -> str:
         return format(self)
 
     def __format__(self, format_spec: str) -> str:
-        def char(pos: Pos) -> str:
-            if pos in self.rocks:
-                return 'O'
-            elif pos in self.walls:
-                return '#'
-            else:
-                return '·'
-
-        bounds = self.bounds
-        canvas = {pos: char(pos) for pos in bounds}
+        lines = (row.replace('.', '·') for row in self.grid.rows())
 
         if not format_spec:
-            pass
+            return '\n'.join(lines)
         elif format_spec == 'loads:N':
-            bounds = bounds.grow_by(right_x=2)
-            canvas.update(
-                ((bounds.right_x, y), format(self.bounds.height - y, "2"))
-                for y in bounds.range_y()
+            return '\n'.join(
+                f"{line} {self.grid.height - y:2}"
+                for y, line in enumerate(lines)
             )
         else:
             raise ValueError("unsupported format specifier")
 
-        return '\n'.join(
-            ''.join(canvas.get((x, y), ' ') for x in bounds.range_x())
-            for y in bounds.range_y()
-        )
-
     def __eq__(self, other) -> bool:
         if not isinstance(other, type(self)):
             return False
 
-        return self.rocks == other.rocks and self.walls == other.walls
+        return self.grid == other.grid
 
     def __hash__(self) -> int:
-        return hash(tuple(sorted(self.rocks)))
+        return hash(self.grid)
 
     @classmethod
     def from_file(cls, fn: str) -> Self:
@@ -301,18 +262,57 @@ class Map:
 
     @classmethod
     def from_lines(cls, lines: Iterable[str]) -> Self:
-        tile_positions = dgroupby_pairs_set(
-            (tile, (x, y))
-            for y, line in enumerate(lines)
-            for x, tile in enumerate(line.strip())
-        )
-        return cls(rocks=tile_positions['O'], walls=tile_positions['#'])
+        return cls(DenseGrid.from_lines(line.replace('·', '.') for line in lines))
+
+
+@lru_cache(maxsize=None)
+def rolled(lane: bytes) -> bytes:
+    # rocks roll towards the start of the lane, until stopped by a cube-shaped rock;
+    # the spin cycle soon repeats the same lanes, so the results are cached
+    return b'#'.join(
+        (segment.count(b'O') * b'O').ljust(len(segment), b'.')
+        for segment in lane.split(b'#')
+    )
+
+
+def rolling_lanes(grid: DenseGrid) -> Lanes:
+    """
+    Lanes start at the cells with no neighbor towards the heading, and continue away from it
+    through the neighbors table:
+
+        >>> lanes = rolling_lanes(DenseGrid(3, 2))
+        >>> lanes[Heading.NORTH]
+        [slice(0, 6, 3), slice(1, 7, 3), slice(2, 8, 3)]
+        >>> lanes[Heading.EAST]
+        [slice(2, None, -1), slice(5, 2, -1)]
+    """
+
+    neighbors = grid.neighbors_table(diagonal=False)
+    north, west, east, south = grid.neighbor_offsets(diagonal=False)
+
+    def lane(start: int, step: int) -> slice:
+        index = start
+        while index + step in neighbors[index]:
+            index += step
+        stop = index + step
+        return slice(start, stop if stop >= 0 else None, step)
+
+    return {
+        heading: [
+            lane(start, -offset)
+            for start in range(len(neighbors))
+            if start + offset not in neighbors[start]
+        ]
+        for heading, offset in [
+            (Heading.NORTH, north), (Heading.WEST, west),
+            (Heading.EAST, east), (Heading.SOUTH, south),
+        ]
+    }
 
 
 def spun_optimized(map_: Map, spins: int) -> 'Map':
-    pre_cycle, cycle = detect_cycle(map_, Map.spun)
-    spins_remaining = (spins - len(pre_cycle)) % len(cycle)
-    return cycle[spins_remaining]
+    # only hashes of the spun maps are kept while looking for the cycle
+    return state_at(iterate(Map.spun, map_), spins, key=hash)
 
 
 def main(input_fn: str = 'data/14-input.txt') -> tuple[int, int]:
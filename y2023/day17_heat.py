@@ -9,7 +9,7 @@ from typing import Iterable, Self
 
 from common.canvas import Canvas
 from common.file import relative_path
-from common.graph import shortest_path
+from common.graph import a_star, manhattan_distance
 from common.heading import Heading
 from common.rect import Rect
 
@@ -259,7 +259,13 @@ def minimize_heat_loss(map_: Map, ultra: bool = False) -> tuple[int, Path]:
         # is at the target position
         return state.pos == map_.target_pos
 
-    return shortest_path(State.initial(map_.start_pos), is_target, next_states)
+    # each step loses at least 1 heat
+    return a_star(
+        start=State.initial(map_.start_pos),
+        target=is_target,
+        edges=next_states,
+        heuristic=lambda state: manhattan_distance(state.pos, map_.target_pos),
+    )
 
 
 def draw_path(map_: Map, path: Path) -> None:
@@ -5,14 +5,14 @@ https://adventofcode.com/2024/day/6
 """
 
 from dataclasses import dataclass
+from functools import partial
 from typing import Generator, Iterable, Iterator, Self
 
-from tqdm import tqdm
-
 from common.canvas import Canvas
 from common.file import relative_path
 from common.heading import Heading
 from common.iteration import exhaust
+from common.parallel import parallel_map
 from common.rect import Rect
 
 
@@ -159,7 +159,7 @@ def part_1(map_: 'Map') -> int:
     return result
 
 
-def part_2(map_: 'Map') -> int:
+def part_2(map_: 'Map', jobs: int = 1) -> int:
     """
     While The Historians begin working around the guard's patrol route, you borrow their fancy
     device and step outside the lab. From the safety of a supply closet, you time travel through
@@ -290,7 +290,7 @@ def part_2(map_: 'Map') -> int:
         6
     """
 
-    result = sum(1 for _ in map_.plan_loops())
+    result = sum(1 for _ in map_.plan_loops(jobs=jobs))
 
     print(f"part 2: the new obstruction can be placed at {result} different positions")
     return result
@@ -352,12 +352,27 @@ class Map:
     def is_guard_looped(self) -> bool:
         return exhaust(self.trace_guard_path())
 
-    def plan_loops(self) -> Iterable[Pos]:
+    def plan_loops(self, jobs: int = 1) -> Iterable[Pos]:
+        # candidate obstructions are independent of each other, so they can be tested in parallel
+        candidates = list(self._obstruction_candidates())
+        looped = parallel_map(
+            partial(_is_looped_with_obstruction, self.obstructions),
+            candidates,
+            jobs=jobs,
+            chunk_size=64,
+            description="placing obstructions",
+        )
+
+        for (_, obstruction_pos), is_looped in zip(candidates, looped):
+            if is_looped:
+                # if so, then we have one winner!
+                yield obstruction_pos
+
+    def _obstruction_candidates(self) -> Iterable[tuple[Guard, Pos]]:
         tested_positions: set[Pos] = set()
 
         # follow the guard in the unmodified map
-        original_path = list(self.trace_guard_path())
-        for guard in tqdm(original_path, desc="placing obstructions", unit=" positions", delay=1.0):
+        for guard in self.trace_guard_path():
 
             # only consider positions where the guard doesn't face an existing obstruction
             if (facing_pos := guard.next_pos()) in self.obstructions:
@@ -367,11 +382,7 @@ class Map:
                 continue
 
             # try placing an obstruction in front of her
-            adjusted_map = type(self)(guard, self.obstructions | {facing_pos})
-            # ... and check if it now results in a loop
-            if adjusted_map.is_guard_looped():
-                # if so, then we have one winner!
-                yield facing_pos
+            yield guard, facing_pos
 
             # the position is now marked as tested and won't be tested again
             # (otherwise the guard would have already passed it and would re-directed elsewhere)
@@ -497,10 +508,17 @@ class Map:
         )
 
 
-def main(input_fn: str = 'data/06-input.txt') -> tuple[int, int]:
+def _is_looped_with_obstruction(obstructions: set[Pos], candidate: tuple[Guard, Pos]) -> bool:
+    # module-level, so that it can be sent to worker processes
+    guard, obstruction_pos = candidate
+    # ... and check if it now results in a loop
+    return Map(guard, obstructions | {obstruction_pos}).is_guard_looped()
+
+
+def main(input_fn: str = 'data/06-input.txt', jobs: int = 1) -> tuple[int, int]:
     map_ = Map.from_file(input_fn)
     result_1 = part_1(map_)
-    result_2 = part_2(map_)
+    result_2 = part_2(map_, jobs=jobs)
     return result_1, result_2
 
 